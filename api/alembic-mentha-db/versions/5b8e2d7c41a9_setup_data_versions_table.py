@@ -0,0 +1,33 @@
+"""setup_data_versions_table
+
+Revision ID: 5b8e2d7c41a9
+Revises: fe4f19e14d1a
+Create Date: 2025-06-02 09:12:44.310527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.storage.schema import DATA_VERSIONS_TABLE
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e2d7c41a9"
+down_revision: Union[str, None] = "fe4f19e14d1a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        DATA_VERSIONS_TABLE,
+        sa.Column("owner", sa.String(256), primary_key=True),
+        sa.Column("version", sa.BigInteger, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table(DATA_VERSIONS_TABLE)
@@ -1,49 +1,137 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.loop_monitor import LoopMonitor
 from app.routes.account import AccountRouter
+from app.routes.admin import AdminToken
 from app.routes.budget import BudgetRouter
+from app.routes.cache import CacheBackend, ResultCache
 from app.routes.category import CategoryRouter
+from app.routes.conditional import ConditionalGet
 from app.routes.institution import InstitutionRouter
+from app.routes.memory import MemoryRouter
+from app.routes.metrics import MetricsEndpoint, RequestMetrics
+from app.routes.profiling import RequestProfiling
+from app.routes.query_budget import QueryBudgetMode, QueryBudgets, query_budget
 from app.routes.rule import RuleRouter
+from app.routes.server_timing import ServerTiming
+from app.routes.tracing import RequestTracing
 from app.routes.transaction import TransactionRouter
 from app.routes.trend import TrendRouter
+from app.routes.unit_of_work import ReadYourWrites, RequestUnitOfWork
 from app.storage.db import MenthaDB
 
 
-def create_app(db: MenthaDB) -> FastAPI:
-    # Closes down db connections whenever the app exits:
+def create_app(
+    db: MenthaDB,
+    cache_backend: CacheBackend | None = None,
+    loop_monitor: LoopMonitor | None = None,
+    server_timing: bool = False,
+    profile_dir: str | None = None,
+    memory_diagnostics: bool = False,
+    admin_token: str | None = None,
+    query_budgets: QueryBudgetMode = "log",
+) -> FastAPI:
+    # Waits for the db before serving, rather than blocking at import, and closes
+    # down db connections whenever the app exits:
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        await db.wait_until_ready_async()
+        # Watches for handlers blocking the event loop while the app runs:
+        if loop_monitor is not None:
+            loop_monitor.start()
         yield
+        if loop_monitor is not None:
+            await loop_monitor.stop()
         await db.dispose_async()
 
-    app = FastAPI(title="Mentha App API", lifespan=lifespan)
+    app = FastAPI(
+        title="Mentha App API",
+        lifespan=lifespan,
+        # Gives each request a single db connection and transaction:
+        dependencies=[Depends(RequestUnitOfWork(db))],
+    )
 
+    allow_origins = ["http://localhost:3000"]
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["http://localhost:3000"],
+        allow_origins=allow_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
+    )
+    # Tells clients that wrote when their reads can go back to replicas:
+    app.add_middleware(ReadYourWrites)
+    # Catches routes going over their query budgets, e.g. with N+1 queries:
+    app.add_middleware(QueryBudgets, mode=query_budgets)
+    if server_timing:
+        app.add_middleware(ServerTiming, allow_origins=allow_origins)
+    # Lets single requests be profiled on demand, for debugging:
+    if profile_dir is not None:
+        app.add_middleware(RequestProfiling, directory=profile_dir)
+    # Added last so they're outermost, and cover everything the app does:
+    app.add_middleware(RequestMetrics)
+    app.add_middleware(RequestTracing)
+    app.add_api_route(
+        "/metrics",
+        MetricsEndpoint().get_metrics,
+        summary="Get Metrics",
+        tags=["metrics"],
+        methods=["GET"],
+        openapi_extra=query_budget(0),
+    )
+
+    if memory_diagnostics:
+        # The admin endpoints are only served to clients with the admin token:
+        if admin_token is None:
+            raise ValueError("memory_diagnostics needs an admin_token.")
+        app.include_router(
+            MemoryRouter().create_fastapi_router(),
+            prefix="/admin/memory",
+            dependencies=[Depends(AdminToken(admin_token))],
+        )
+
+    # Answers repeat GETs of by-owner reports with a 304 until the owner's data
+    # changes:
+    conditional_get = [Depends(ConditionalGet(db.versions))]
+    # Shares expensive report results between requests until the owner's data
+    # changes. The default backend is per worker; pass a shared one to share
+    # results between workers too:
+    cache = ResultCache(db.versions, cache_backend)
+    app.add_api_route(
+        "/cache/stats",
+        cache.get_stats,
+        summary="Get Report Cache Stats",
+        tags=["cache"],
+        methods=["GET"],
+        openapi_extra=query_budget(0),
     )
 
-    account_router = AccountRouter(db.accounts, db.institutions)
+    account_router = AccountRouter(db.accounts)
     app.include_router(account_router.create_fastapi_router(), prefix="/accounts")
 
-    budget_router = BudgetRouter(db)
-    app.include_router(budget_router.create_fastapi_router(), prefix="/budgets")
+    budget_router = BudgetRouter(db, cache)
+    app.include_router(
+        budget_router.create_fastapi_router(),
+        prefix="/budgets",
+        dependencies=conditional_get,
+    )
 
     category_router = CategoryRouter(db.categories)
-    app.include_router(category_router.create_fastapi_router(), prefix="/categories")
+    app.include_router(
+        category_router.create_fastapi_router(),
+        prefix="/categories",
+        dependencies=conditional_get,
+    )
 
     institution_router = InstitutionRouter(db.institutions)
     app.include_router(
         institution_router.create_fastapi_router(), prefix="/institutions"
     )
 
-    rule_router = RuleRouter(db.rules, db.categories)
+    rule_router = RuleRouter(db.rules)
     app.include_router(rule_router.create_fastapi_router(), prefix="/rules")
 
     transaction_router = TransactionRouter(db)
@@ -51,7 +139,11 @@ def create_app(db: MenthaDB) -> FastAPI:
         transaction_router.create_fastapi_router(), prefix="/transactions"
     )
 
-    trend_router = TrendRouter(db)
-    app.include_router(trend_router.create_fastapi_router(), prefix="/trends")
+    trend_router = TrendRouter(db, cache)
+    app.include_router(
+        trend_router.create_fastapi_router(),
+        prefix="/trends",
+        dependencies=conditional_get,
+    )
 
     return app
@@ -44,6 +44,10 @@ class BudgetReport(BaseModel):
     anticipatedNet: float = Field(default=0)
 
 
+class BudgetReportByMonth(BudgetReport):
+    month: date
+
+
 class BudgetInput(InputModel):
     category: UUID
     amt: float
@@ -4,6 +4,8 @@ from typing import Any, Callable, Generic, Literal, Optional, TypeVar
 from uuid import UUID
 from pydantic import BaseModel, Field
 
+from app import server_timing, tracing
+
 
 DomainModelT = TypeVar("DomainModelT", bound="DomainModel")
 DomainModelT2 = TypeVar("DomainModelT2", bound="DomainModel")
@@ -45,8 +47,12 @@ class PagedResultsModel(BaseModel, Generic[DomainModelT]):
     def transform(
         self, tf: Callable[[list[DomainModelT]], list[DomainModelT2]]
     ) -> PagedResultsModel[DomainModelT2]:
+        with tracing.span("transform", rows=len(self.results)), server_timing.timed(
+            "transform"
+        ):
+            results = tf(self.results)
         return PagedResultsModel(
-            results=tf(self.results),
+            results=results,
             hitCount=self.hitCount,
             totalHitCount=self.totalHitCount,
             page=self.page,
@@ -56,6 +62,22 @@ class PagedResultsModel(BaseModel, Generic[DomainModelT]):
         )
 
 
+BulkStatus = Literal["created", "updated", "unchanged", "deleted", "notFound"]
+
+
+class BulkInput(BaseModel, Generic[InputModelT]):
+    create: list[InputModelT] = Field(default_factory=list)
+    update: list[InputModelT] = Field(
+        default_factory=list, description="Each update must include its id."
+    )
+    delete: list[UUID] = Field(default_factory=list)
+
+
+class BulkResult(BaseModel):
+    id: UUID
+    status: BulkStatus
+
+
 SortDirection = Literal["asc", "desc"]
 FilterOperator = Literal["=", ">", "<", ">=", "<=", "like"]
 
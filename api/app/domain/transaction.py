@@ -1,16 +1,21 @@
 from datetime import date, datetime
 import re
-from typing import Generic, Literal, Optional, TypeVar
+from typing import Any, Generic, Literal, Optional, TypeVar
 from uuid import UUID
 
+from pydantic import BaseModel
+
 from app.domain.category import UNCATEGORIZED, Category
-from app.domain.core import DomainModel, InputModel
+from app.domain.core import DomainModel, InputModel, PagedResultsModel
 from app.storage.ofx import OFXTransaction
 
 TRANSACTION_TABLE = "transactions"
 
 CategoryT = TypeVar("CategoryT", UUID, Category)
 TransactionType = Literal["credit", "debit"]
+# expanded embeds each Category, compact lists them once alongside transactions with
+# category ids, and columnar does the same with one array per transaction field:
+TransactionListFormat = Literal["expanded", "compact", "columnar"]
 
 
 class Transaction(DomainModel, Generic[CategoryT]):
@@ -24,6 +29,21 @@ class Transaction(DomainModel, Generic[CategoryT]):
     owner: UUID
 
 
+class CompactTransactionResults(PagedResultsModel[Transaction[UUID]]):
+    categories: list[Category]
+
+
+class ColumnarTransactionResults(BaseModel):
+    results: dict[str, list[Any]]
+    categories: list[Category]
+    hitCount: int
+    totalHitCount: int
+    page: int
+    pageSize: int | None
+    hasNext: bool
+    hasPrev: bool
+
+
 class TransactionInput(InputModel):
     fitId: str
     amt: float
@@ -52,6 +72,70 @@ def decode_transaction_input_model(
     )
 
 
+def _dedupe_categories(transactions: list[Transaction[Category]]) -> list[Category]:
+    return list({trn.category.id: trn.category for trn in transactions}.values())
+
+
+def compact_transaction_results(
+    expanded: PagedResultsModel[Transaction[Category]],
+) -> CompactTransactionResults:
+    """
+    Args:
+        expanded (PagedResultsModel[Transaction[Category]]): A page of transactions
+            with their categories embedded.
+
+    Returns:
+        CompactTransactionResults: The same page, with each transaction's category
+        replaced by its id and each category listed once in categories.
+    """
+    return CompactTransactionResults(
+        # The expanded transactions are already valid, so skip validating them again:
+        results=[
+            Transaction[UUID].model_construct(
+                **{**trn.__dict__, "category": trn.category.id}
+            )
+            for trn in expanded.results
+        ],
+        categories=_dedupe_categories(expanded.results),
+        hitCount=expanded.hitCount,
+        totalHitCount=expanded.totalHitCount,
+        page=expanded.page,
+        pageSize=expanded.pageSize,
+        hasNext=expanded.hasNext,
+        hasPrev=expanded.hasPrev,
+    )
+
+
+def columnar_transaction_results(
+    expanded: PagedResultsModel[Transaction[Category]],
+) -> ColumnarTransactionResults:
+    """
+    Args:
+        expanded (PagedResultsModel[Transaction[Category]]): A page of transactions
+            with their categories embedded.
+
+    Returns:
+        ColumnarTransactionResults: The same page, with results as one list of
+        values per Transaction field in the same order, using category ids, and
+        each category listed once in categories.
+    """
+    columns = {field: list[Any]() for field in Transaction.model_fields}
+    for trn in expanded.results:
+        for field, col in columns.items():
+            col.append(getattr(trn, field))
+    columns["category"] = [cat.id for cat in columns["category"]]
+    return ColumnarTransactionResults(
+        results=columns,
+        categories=_dedupe_categories(expanded.results),
+        hitCount=expanded.hitCount,
+        totalHitCount=expanded.totalHitCount,
+        page=expanded.page,
+        pageSize=expanded.pageSize,
+        hasNext=expanded.hasNext,
+        hasPrev=expanded.hasPrev,
+    )
+
+
 def parse_transaction_fit_id(fit_id: str, pat: str | None = None) -> str:
     """
     Checks the passed fit_id to see if it matches the passed regex pattern (if any).
@@ -0,0 +1,178 @@
+"""
+Watches the event loop for stalls, where CPU-bound work in a handler keeps every
+other request waiting. A sampler task measures how late the loop wakes it up,
+and each callback that runs past a threshold is logged and counted against the
+request, or else the task, that was running it.
+
+Callbacks are timed by asyncio's debug mode, which warns of any callback that
+runs for longer than the loop's slow_callback_duration. Debug mode also adds
+checks that slow the loop down, so this is only for debugging. It isn't
+available on uvloop, which uvicorn uses whenever it's installed (as it is by
+uvicorn[standard]), so run uvicorn with --loop asyncio, or gunicorn with
+uvicorn.workers.UvicornH11Worker, to time callbacks.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextvars import Context, ContextVar
+
+from starlette.types import Scope
+
+from app.metrics import Histogram
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LOOP_LAG_SECONDS = Histogram(
+    "mentha_event_loop_lag_seconds",
+    "How late the event loop ran a periodic sampler, versus when it was due.",
+    buckets=LAG_BUCKETS,
+)
+SLOW_CALLBACK_SECONDS = Histogram(
+    "mentha_event_loop_slow_callback_seconds",
+    "Event loop callbacks that blocked the loop past the slow callback threshold, "
+    "by the route, or else the task, that ran them.",
+    ["source"],
+    buckets=LAG_BUCKETS,
+)
+
+logger = logging.getLogger(__name__)
+_asyncio_logger = logging.getLogger("asyncio")
+
+# The ASGI scope of the request a callback runs for, set by RequestMetrics:
+current_request: ContextVar[Scope | None] = ContextVar("current_request", default=None)
+
+# What asyncio logs in debug mode for each slow callback:
+_SLOW_CALLBACK_MSG = "Executing %s took %.3f seconds"
+
+
+def _handle_context(handle: asyncio.Handle) -> Context | None:
+    """
+    Returns:
+        Context | None: The context the handle runs its callback in.
+    """
+    # Handles only expose their context publicly from Python 3.12:
+    get_context = getattr(handle, "get_context", None)
+    context = get_context() if get_context is not None else None
+    if context is None:
+        context = getattr(handle, "_context", None)
+    return context if isinstance(context, Context) else None
+
+
+def _handle_callback(handle: asyncio.Handle) -> object:
+    """
+    Returns:
+        object: The callback the handle runs, which asyncio doesn't expose
+        publicly.
+    """
+    return getattr(handle, "_callback", None)
+
+
+def _source(handle: asyncio.Handle) -> str:
+    context = _handle_context(handle)
+    scope = context.get(current_request) if context is not None else None
+    if scope is not None:
+        # The route is only set once the request has been routed:
+        route = getattr(scope.get("route"), "path", "unmatched")
+        return f"{scope['method']} {route}"
+    callback = _handle_callback(handle)
+    # Task steps are bound to their task, and named after its coroutine:
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return f"task {getattr(coro, '__qualname__', type(coro).__qualname__)}"
+    return getattr(callback, "__qualname__", type(callback).__qualname__)
+
+
+def _is_uvloop(loop: asyncio.AbstractEventLoop) -> bool:
+    return type(loop).__module__.split(".")[0] == "uvloop"
+
+
+class LoopMonitor:
+    def __init__(
+        self, interval: float = 0.1, slow_callback_threshold: float = 0.1
+    ) -> None:
+        """
+        Args:
+            interval (float, optional): Seconds between lag samples. Defaults to
+                0.1.
+            slow_callback_threshold (float, optional): Seconds a callback can run
+                for before it's reported. Defaults to 0.1.
+        """
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        # The loop's debug settings from before the monitor started:
+        self._prev_debug: tuple[bool, float] | None = None
+
+    def start(self) -> None:
+        """
+        Starts sampling the running loop's lag and, unless it's uvloop, puts it in
+        debug mode to time its callbacks.
+        """
+        if self._loop is not None:
+            raise RuntimeError("This LoopMonitor is already running.")
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._task = loop.create_task(self._sample())
+        if _is_uvloop(loop):
+            logger.warning(
+                "Slow callbacks can't be timed on uvloop; run uvicorn with "
+                "--loop asyncio to time them. Only loop lag will be sampled."
+            )
+            return
+        self._prev_debug = (loop.get_debug(), loop.slow_callback_duration)
+        loop.slow_callback_duration = self.slow_callback_threshold
+        loop.set_debug(True)
+        _asyncio_logger.addFilter(self._filter)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._loop is not None and self._prev_debug is not None:
+            _asyncio_logger.removeFilter(self._filter)
+            debug, self._loop.slow_callback_duration = self._prev_debug
+            self._loop.set_debug(debug)
+            self._prev_debug = None
+        self._loop = None
+
+    def _filter(self, record: logging.LogRecord) -> bool:
+        """
+        Replaces debug mode's warnings of slow callbacks on this monitor's loop with
+        reports that say what they were run for.
+        """
+        if record.msg != _SLOW_CALLBACK_MSG:
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+        # The loop logs the warning while the handle is still current:
+        handle = getattr(loop, "_current_handle", None)
+        if loop is not self._loop or not isinstance(handle, asyncio.Handle):
+            return True
+        seconds = record.args[1] if isinstance(record.args, tuple) else None
+        if not isinstance(seconds, float):
+            return True
+        self.report_slow_callback(handle, seconds)
+        return False
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            LOOP_LAG_SECONDS.observe(max(loop.time() - due, 0.0))
+
+    def report_slow_callback(self, handle: asyncio.Handle, seconds: float) -> None:
+        source = _source(handle)
+        SLOW_CALLBACK_SECONDS.labels(source).observe(seconds)
+        logger.warning(
+            "Event loop blocked for %.3fs by %s (%r).", seconds, source, handle
+        )
@@ -1,14 +1,65 @@
 import os
 
 from app.core import create_app
-from app.storage.db import MenthaDB, MenthaDBConfig
+from app.loop_monitor import LoopMonitor
+from app.storage.db import MenthaDB, MenthaDBAsyncConfig, MenthaDBConfig
+from app.storage.slow_queries import SlowQueryLogConfig
+from app.tracing import configure_tracing, exporter_from_setting
+
+# Either "console" or the path of a file to write OTLP/JSON spans to:
+if traces := os.environ.get("MENTHA_TRACES"):
+    configure_tracing(
+        exporter_from_setting(traces),
+        sample_ratio=float(os.environ.get("MENTHA_TRACE_SAMPLE_RATIO", "1.0")),
+    )
+
+slow_query_log = None
+# The path of a JSONL file to log statements slower than MENTHA_SLOW_QUERY_MS to:
+if slow_query_path := os.environ.get("MENTHA_SLOW_QUERY_LOG"):
+    slow_query_log = SlowQueryLogConfig(
+        slow_query_path,
+        threshold_ms=float(os.environ.get("MENTHA_SLOW_QUERY_MS", "200")),
+        # Only set outside production, since EXPLAIN ANALYZE reruns statements:
+        explain_sample_ratio=float(
+            os.environ.get("MENTHA_SLOW_QUERY_EXPLAIN_RATIO", "0.0")
+        ),
+    )
 
 db = MenthaDB(
     MenthaDBConfig(
         user=os.environ["DB_USER"],
         pwd=os.environ["DB_PWD"],
         host=os.environ["DB_URL"],
-    )
+        # Comma separated hosts of read replicas to spread reads across:
+        replica_hosts=tuple(
+            host.strip()
+            for host in os.environ.get("MENTHA_DB_REPLICAS", "").split(",")
+            if host.strip()
+        ),
+    ),
+    MenthaDBAsyncConfig(),
+    slow_query_log=slow_query_log,
 )
 
-app = create_app(db)
+loop_monitor = None
+# Milliseconds a callback can block the event loop for before it's logged. Only
+# set while debugging, since it runs the loop in debug mode (and needs uvicorn's
+# --loop asyncio rather than uvloop):
+if slow_callback_ms := os.environ.get("MENTHA_SLOW_CALLBACK_MS"):
+    loop_monitor = LoopMonitor(slow_callback_threshold=float(slow_callback_ms) / 1000)
+
+app = create_app(
+    db,
+    loop_monitor=loop_monitor,
+    # Adds a Server-Timing header with a breakdown of each response's time:
+    server_timing=os.environ.get("MENTHA_SERVER_TIMING", "") == "1",
+    # Where requests sent with an X-Mentha-Profile header save their profiles.
+    # Only set while debugging, since any client can ask to be profiled:
+    profile_dir=os.environ.get("MENTHA_PROFILE_DIR"),
+    # Mounts the tracemalloc endpoints under /admin/memory. Like profiling, this is
+    # only for debugging, since tracing slows down every allocation:
+    memory_diagnostics=os.environ.get("MENTHA_MEMORY_DIAGNOSTICS", "") == "1",
+    # Clients of the admin endpoints have to send this in an X-Mentha-Admin-Token
+    # header:
+    admin_token=os.environ.get("MENTHA_ADMIN_TOKEN"),
+)
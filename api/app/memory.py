@@ -0,0 +1,105 @@
+"""
+Memory diagnostics with tracemalloc: tracing can be started and stopped while the
+app runs, and snapshots of what's allocated are kept so the call sites holding
+the most memory, or gaining the most between two snapshots, can be listed.
+"""
+from __future__ import annotations
+
+import tracemalloc
+from collections import OrderedDict
+from typing import Literal
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# Leaves out allocations made by tracemalloc itself and the import machinery:
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class SnapshotNotFoundError(KeyError):
+    def __init__(self, id: int) -> None:
+        self.id = id
+        super().__init__(f"No snapshot with id {id}.")
+
+
+class MemoryDiagnostics:
+    def __init__(self, max_snapshots: int = 10) -> None:
+        """
+        Args:
+            max_snapshots (int, optional): Snapshots kept before the oldest are
+                dropped, since each holds every traced allocation. Defaults to 10.
+        """
+        self._max_snapshots = max_snapshots
+        self._snapshots = OrderedDict[int, tracemalloc.Snapshot]()
+        self._next_id = 1
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    @property
+    def snapshot_ids(self) -> list[int]:
+        return list(self._snapshots)
+
+    def start(self, frames: int = 1) -> None:
+        """
+        Starts tracing allocations, keeping the passed number of frames of each
+        one's traceback. More frames find the callers behind an allocation, but
+        slow down allocating and use more memory. Does nothing if already tracing.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """
+        Stops tracing, and frees the traces. Snapshots already taken are kept.
+        """
+        tracemalloc.stop()
+
+    def snapshot(self) -> int:
+        """
+        Returns:
+            int: The id of a new snapshot of the traced allocations.
+
+        Raises:
+            RuntimeError: If allocations aren't being traced.
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory allocations aren't being traced.")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        id = self._next_id
+        self._next_id += 1
+        self._snapshots[id] = snapshot
+        while len(self._snapshots) > self._max_snapshots:
+            self._snapshots.popitem(last=False)
+        return id
+
+    def _get(self, id: int) -> tracemalloc.Snapshot:
+        snapshot = self._snapshots.get(id)
+        if snapshot is None:
+            raise SnapshotNotFoundError(id)
+        return snapshot
+
+    def top(
+        self, id: int, limit: int = 20, group_by: GroupBy = "lineno"
+    ) -> list[tracemalloc.Statistic]:
+        """
+        Returns:
+            list[tracemalloc.Statistic]: The call sites holding the most memory in
+            the snapshot, largest first.
+        """
+        return self._get(id).statistics(group_by)[:limit]
+
+    def diff(
+        self, id: int, base_id: int, limit: int = 20, group_by: GroupBy = "lineno"
+    ) -> list[tracemalloc.StatisticDiff]:
+        """
+        Returns:
+            list[tracemalloc.StatisticDiff]: The call sites whose memory changed
+            most from the base snapshot to the snapshot, largest change first.
+        """
+        return self._get(id).compare_to(self._get(base_id), group_by)[:limit]
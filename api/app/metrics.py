@@ -0,0 +1,252 @@
+"""
+Minimal in-process metrics, rendered in the Prometheus text exposition format so
+any Prometheus-compatible scraper can read them without running another service.
+
+Metrics are declared at module level next to the code they measure and register
+with REGISTRY. Updates are plain attribute writes with no locking, since they're
+made from the event loop thread, so they're cheap enough for hot paths.
+
+Values are kept per process, so with several gunicorn workers each scrape of
+/metrics only covers the worker that answered it. Scrape each worker on its own,
+or run a single worker per container, to see them all.
+"""
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Generic, Iterator, Sequence, TypeVar
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+ChildT = TypeVar("ChildT")
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric[Any]] = {}
+
+    def register(self, metric: Metric[ChildT]) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Metric[Any] | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: Every registered metric in the Prometheus text exposition format.
+        """
+        lines = list[str]()
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric(ABC, Generic[ChildT]):
+    """
+    A named metric with one child per distinct set of label values. Children are
+    created on first use and kept, so callers on hot paths can hold on to the one
+    returned by labels.
+    """
+
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Registry | None = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = dict[tuple[str, ...], ChildT]()
+        if registry is not None:
+            registry.register(self)
+
+    @abstractmethod
+    def _new_child(self) -> ChildT:
+        return NotImplemented
+
+    def labels(self, *values: object) -> ChildT:
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} takes labels {self.labelnames}, got {key}."
+                )
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _unlabelled(self) -> ChildT:
+        return self.labels()
+
+    @abstractmethod
+    def _samples(
+        self, labels: tuple[str, ...], child: ChildT
+    ) -> Iterator[tuple[str, str, float]]:
+        return NotImplemented
+
+    def render(self) -> Iterator[str]:
+        doc = self.documentation.replace("\\", r"\\").replace("\n", r"\n")
+        yield f"# HELP {self.name} {doc}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, child in list(self._children.items()):
+            for suffix, label_str, value in self._samples(labels, child):
+                yield f"{self.name}{suffix}{label_str} {_format_value(value)}"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be increased.")
+        self.value += amount
+
+
+class Counter(Metric[_CounterChild]):
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+    def _samples(
+        self, labels: tuple[str, ...], child: _CounterChild
+    ) -> Iterator[tuple[str, str, float]]:
+        yield "_total", _format_labels(self.labelnames, labels), child.value
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Gauge(Metric[_GaugeChild]):
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._unlabelled().dec(amount)
+
+    def _samples(
+        self, labels: tuple[str, ...], child: _GaugeChild
+    ) -> Iterator[tuple[str, str, float]]:
+        yield "", _format_labels(self.labelnames, labels), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        # Counts per bucket, not cumulative, with a last bucket for +Inf:
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self._bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric[_HistogramChild]):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Registry | None = REGISTRY,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self._bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._bounds)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def _samples(
+        self, labels: tuple[str, ...], child: _HistogramChild
+    ) -> Iterator[tuple[str, str, float]]:
+        names = (*self.labelnames, "le")
+        cumulative = 0
+        for bound, bucket_count in zip(
+            (*self._bounds, math.inf), list(child.bucket_counts)
+        ):
+            cumulative += bucket_count
+            le = _format_value(bound)
+            yield "_bucket", _format_labels(names, (*labels, le)), cumulative
+        label_str = _format_labels(self.labelnames, labels)
+        yield "_sum", label_str, child.sum
+        yield "_count", label_str, child.count
@@ -0,0 +1,109 @@
+"""
+Profilers for single requests: cProfile's deterministic profiler, whose stats
+load with pstats or snakeviz, and a sampling profiler, whose profiles load in
+speedscope (https://www.speedscope.app).
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from types import FrameType
+from typing import Any
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# A function's qualified name, file and first line:
+Frame = tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """
+    Records the stack of a thread at a fixed interval from a thread of its own,
+    so the profiled code isn't slowed down by tracing every call. Stacks are
+    sampled on wall-clock time, so waits like those on the db show up too. While
+    the thread is busy running Python code, samples can only be taken as often as
+    it hands over the GIL, every 5ms by default (see sys.setswitchinterval).
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        """
+        Args:
+            interval (float, optional): Seconds between samples. Defaults to 0.001.
+        """
+        self._interval = interval
+        self._frames = dict[Frame, int]()
+        self._samples = list[list[int]]()
+        self._weights = list[float]()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._duration = 0.0
+
+    def start(self, thread_id: int | None = None) -> None:
+        """
+        Starts sampling the passed thread, or else the calling thread.
+        """
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, args=(target,), name="mentha-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, thread_id: int) -> None:
+        start = last = time.perf_counter()
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                self._samples.append(self._stack(frame))
+                self._weights.append(now - last)
+            last = now
+        self._duration = time.perf_counter() - start
+
+    def _stack(self, frame: FrameType | None) -> list[int]:
+        stack = list[int]()
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+            index = self._frames.get(key)
+            if index is None:
+                index = self._frames[key] = len(self._frames)
+            stack.append(index)
+            frame = frame.f_back
+        # Speedscope stacks start from the root:
+        stack.reverse()
+        return stack
+
+    def to_speedscope(self, name: str) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: The samples as a speedscope file, to be saved as JSON.
+        """
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "mentha-api",
+            "shared": {
+                "frames": [
+                    {"name": qualname, "file": file, "line": line}
+                    for qualname, file, line in self._frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self._duration,
+                    "samples": self._samples,
+                    "weights": self._weights,
+                }
+            ],
+        }
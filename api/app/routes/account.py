@@ -7,21 +7,17 @@ from app.domain.account import (
     AccountInput,
     decode_account_input_model,
 )
-from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.core import BulkInput, BulkResult, PagedResultsModel, QueryModel
 from app.domain.institution import Institution
 from app.routes.router import BasicRouter, ByOwnerMethods
 from app.routes.utils import preprocess_filters
-from app.storage.db import IsIn, MenthaTable
+from app.storage.db import MenthaTable
 
 
 class AccountRouter(
     BasicRouter[Account[UUID], AccountInput], ByOwnerMethods[Account[Institution]]
 ):
-    def __init__(
-        self,
-        account_table: MenthaTable[Account[UUID]],
-        institution_table: MenthaTable[Institution],
-    ) -> None:
+    def __init__(self, account_table: MenthaTable[Account[UUID]]) -> None:
         super().__init__(
             singular_name="account",
             plural_name="accounts",
@@ -29,7 +25,6 @@ class AccountRouter(
             input_model_decoder=decode_account_input_model,
             table=account_table,
         )
-        self._inst_table = institution_table
 
     def create_fastapi_router(self) -> APIRouter:
         router = super().create_fastapi_router()
@@ -39,6 +34,9 @@ class AccountRouter(
     async def add(self, input: AccountInput) -> UUID:
         return await super().add(input)
 
+    async def bulk(self, input: BulkInput[AccountInput]) -> list[BulkResult]:
+        return await super().bulk(input)
+
     async def update(self, id: UUID, input: AccountInput) -> Account[UUID]:
         return await super().update(id, input)
 
@@ -50,26 +48,11 @@ class AccountRouter(
     async def get_by_owner(
         self, ownerId: UUID, query: QueryModel, page: int = 1, pageSize: int = 50
     ) -> PagedResultsModel[Account[Institution]]:
-        raw_results = await self._table.query_async(
+        return await self._table.query_joined_async(
+            Account[Institution],
             page=page,
             page_size=pageSize,
             sorts=query.sorts,
             owner=ownerId,
             **preprocess_filters(query.filters)
         )
-        inst_result = await self._inst_table.query_async(
-            id=IsIn([row.institution for row in raw_results.results])
-        )
-        institutions = {inst.id: inst for inst in inst_result.results}
-
-        def _transform(acct: Account[UUID]) -> Account[Institution]:
-            return Account(
-                id=acct.id,
-                fitId=acct.fitId,
-                accountType=acct.accountType,
-                name=acct.name,
-                institution=institutions[acct.institution],
-                owner=acct.owner,
-            )
-
-        return raw_results.broadcast_transform(_transform)
@@ -0,0 +1,37 @@
+import secrets
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+from fastapi.security import APIKeyHeader
+
+ADMIN_TOKEN_HEADER = "X-Mentha-Admin-Token"
+
+# Not auto_error, so a missing token is a 401 rather than APIKeyHeader's 403:
+_admin_token_header = APIKeyHeader(
+    name=ADMIN_TOKEN_HEADER,
+    scheme_name="AdminToken",
+    description="The token the app was created with for its admin endpoints.",
+    auto_error=False,
+)
+
+
+class AdminToken:
+    """
+    FastAPI dependency that only lets through requests sending the admin token in an
+    X-Mentha-Admin-Token header. Requests without one get a 401, and requests with
+    any other token a 403.
+    """
+
+    def __init__(self, token: str) -> None:
+        if not token:
+            raise ValueError("The admin token can't be empty.")
+        self._token = token.encode()
+
+    async def __call__(
+        self, token: Annotated[str | None, Depends(_admin_token_header)]
+    ) -> None:
+        if token is None:
+            raise HTTPException(401, f"Missing {ADMIN_TOKEN_HEADER} header.")
+        # Compared in constant time, so the token can't be guessed from timings:
+        if not secrets.compare_digest(token.encode(), self._token):
+            raise HTTPException(403, "Invalid admin token.")
@@ -1,30 +1,42 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Annotated, Sequence, TypeVar
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
+from app import server_timing
 from app.domain.budget import (
     AllocatedBudget,
     Budget,
     BudgetInput,
     BudgetReport,
+    BudgetReportByMonth,
     decode_budget_input_model,
     get_anticipated_net_val,
 )
-from app.domain.category import INCOME, TRANSFER, UNCATEGORIZED, Category
-from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.category import INCOME, UNCATEGORIZED, Category
+from app.domain.core import BulkInput, BulkResult, PagedResultsModel, QueryModel
+from app.routes.cache import ResultCache
+from app.routes.query_budget import query_budget
 from app.routes.router import BasicRouter
 from app.routes.utils import (
-    calculate_accumulated_budget,
+    DateQueryParam,
+    calculate_accumulated_budgets,
+    gen_month_list,
     gen_month_range,
-    get_categories_by_id,
-    summarize_transactions_by_category,
 )
-from app.storage.db import Between, MenthaDB, SimpleOp
+from app.storage.db import MenthaDB
+from app.storage.reports import (
+    BudgetReportRow,
+    query_budget_range_rows,
+    query_budget_report_rows,
+)
+
+BudgetReportT = TypeVar("BudgetReportT", bound=BudgetReport)
 
 
 class BudgetRouter(BasicRouter[Budget[UUID], BudgetInput]):
-    def __init__(self, mentha_db: MenthaDB) -> None:
+    def __init__(self, mentha_db: MenthaDB, cache: ResultCache | None = None) -> None:
         super().__init__(
             singular_name="budget",
             plural_name="budgets",
@@ -33,20 +45,32 @@ class BudgetRouter(BasicRouter[Budget[UUID], BudgetInput]):
             table=mentha_db.budgets,
         )
         self._db = mentha_db
+        self._cache = cache or ResultCache(mentha_db.versions)
 
     def create_fastapi_router(self) -> APIRouter:
         router = super().create_fastapi_router()
+        router.add_api_route(
+            "/by-owner/{ownerId}/range",
+            self.get_allocated_budgets_by_range,
+            summary="Get Allocated Budgets For Each Month In a Range",
+            methods=["GET"],
+            openapi_extra=query_budget(3),
+        )
         router.add_api_route(
             "/by-owner/{ownerId}/{year}/{month}",
             self.get_allocated_budgets_by_month,
             summary="Get Allocated Budgets By Year and Month",
             methods=["GET"],
+            openapi_extra=query_budget(2),
         )
         return router
 
     async def add(self, input: BudgetInput) -> UUID:
         return await super().add(input)
 
+    async def bulk(self, input: BulkInput[BudgetInput]) -> list[BulkResult]:
+        return await super().bulk(input)
+
     async def update(self, id: UUID, input: BudgetInput) -> Budget[UUID]:
         return await super().update(id, input)
 
@@ -61,33 +85,102 @@ class BudgetRouter(BasicRouter[Budget[UUID], BudgetInput]):
         year: int,
         month: int,
     ) -> BudgetReport:
-        result = BudgetReport()
+        start_m, end_m = gen_month_range(year, month)
+
+        async def _calculate() -> BudgetReport:
+            rows = await query_budget_report_rows(self._db, ownerId, start_m, end_m)
+            with server_timing.timed("transform"):
+                budget_amts = self._calculate_budget_amts(rows, [start_m])
+                return self._assemble_report(
+                    BudgetReport(), ownerId, start_m, rows, budget_amts[0]
+                )
+
+        return await self._cache.get_or_compute(
+            ownerId, ("budget-report", start_m), _calculate
+        )
+
+    async def get_allocated_budgets_by_range(
+        self,
+        ownerId: UUID,
+        startDt: Annotated[date, DateQueryParam],
+        endDt: Annotated[date, DateQueryParam],
+    ) -> list[BudgetReportByMonth]:
+        if endDt < startDt:
+            raise HTTPException(400, "endDt must not be before startDt.")
+        months = gen_month_list(startDt, endDt)
+        _, end = gen_month_range(months[-1].year, months[-1].month)
+        rows_by_month = await query_budget_range_rows(self._db, ownerId, months, end)
+        with server_timing.timed("transform"):
+            # Every month has a row for each of the owner's budgets:
+            budget_amts = self._calculate_budget_amts(rows_by_month[months[0]], months)
+            return [
+                self._assemble_report(
+                    BudgetReportByMonth(month=month.date()),
+                    ownerId,
+                    month,
+                    rows_by_month[month],
+                    amts,
+                )
+                for month, amts in zip(months, budget_amts)
+            ]
+
+    @staticmethod
+    def _calculate_budget_amts(
+        rows: list[BudgetReportRow], months: Sequence[datetime]
+    ) -> list[dict[UUID, tuple[float, float]]]:
+        budgets = [row.budget for row in rows if row.budget]
+        amts = calculate_accumulated_budgets(
+            [bgt.amt for bgt in budgets],
+            [bgt.period for bgt in budgets],
+            [bgt.createDate for bgt in budgets],
+            months,
+        )
+        return [
+            {bgt.id: bgt_amts[i] for bgt, bgt_amts in zip(budgets, amts)}
+            for i in range(len(months))
+        ]
+
+    def _assemble_report(
+        self,
+        result: BudgetReportT,
+        ownerId: UUID,
+        month: datetime,
+        rows: list[BudgetReportRow],
+        budget_amts: dict[UUID, tuple[float, float]],
+    ) -> BudgetReportT:
         total_income_budget = 0
         total_expense_budget = 0
         actual_income = 0
         actual_expenses = 0
         anticipated_net = 0
-        raw_results = await self._table.page_through_query_async(
-            [],
-            owner=ownerId,
-        )
-        categories = await get_categories_by_id(self._db.categories)
-        income_cat_ids = [
-            cat.id
-            for cat in categories.values()
-            if cat.id == INCOME.id or cat.parentCategory == INCOME.id
-        ]
-        start_m, end_m = gen_month_range(year, month)
-        transactions = await self._db.transactions.page_through_query_async(
-            [],
-            owner=ownerId,
-            date=Between(start_m, end_m),
-            category=SimpleOp(TRANSFER.id, "!="),
-        )
-        sum_trans = summarize_transactions_by_category(transactions)
-        for bgt in raw_results:
-            tf_bgt = self._transform(bgt, categories, sum_trans, start_m)
-            if tf_bgt.category.id in income_cat_ids:
+        allocated_cats = set[UUID]()
+        for row in sorted(rows, key=self._row_sort_key):
+            category = row.category or UNCATEGORIZED
+            if row.budget is None:
+                # Spending in categories that have no budget:
+                actual_expenses += abs(row.total)
+                anticipated_net += row.total
+                result.other.append(
+                    AllocatedBudget(
+                        id=uuid4(),
+                        category=category,
+                        amt=0,
+                        monthAmt=0,
+                        accumulatedAmt=0,
+                        allocatedAmt=round(abs(row.total), 2),
+                        period=1,
+                        createDate=month.date(),
+                        owner=ownerId,
+                    )
+                )
+                continue
+            # A category's transactions are only allocated to its first budget:
+            total = 0 if row.budget.category in allocated_cats else row.total
+            allocated_cats.add(row.budget.category)
+            tf_bgt = self._transform(
+                row.budget, category, total, budget_amts[row.budget.id]
+            )
+            if category.id == INCOME.id or category.parentCategory == INCOME.id:
                 total_income_budget += tf_bgt.monthAmt
                 actual_income += tf_bgt.allocatedAmt
                 anticipated_net += get_anticipated_net_val(tf_bgt)
@@ -97,52 +190,35 @@ class BudgetRouter(BasicRouter[Budget[UUID], BudgetInput]):
                 actual_expenses += tf_bgt.allocatedAmt
                 anticipated_net -= get_anticipated_net_val(tf_bgt)
                 result.budgets.append(tf_bgt)
-            if bgt.category in sum_trans:
-                sum_trans.pop(bgt.category)
-        for cat_id, amt in sum_trans.items():
-            actual_expenses += abs(amt)
-            anticipated_net += amt
-            result.other.append(
-                AllocatedBudget(
-                    id=uuid4(),
-                    category=categories.get(cat_id, UNCATEGORIZED),
-                    amt=0,
-                    monthAmt=0,
-                    accumulatedAmt=0,
-                    allocatedAmt=round(abs(amt), 2),
-                    period=1,
-                    createDate=date(year, month, 1),
-                    owner=ownerId,
-                )
-            )
         result.budgetedExpenses = round(total_expense_budget, 2)
         result.budgetedIncome = round(total_income_budget, 2)
         result.actualExpenses = round(actual_expenses, 2)
         result.actualIncome = round(actual_income, 2)
         result.anticipatedNet = round(anticipated_net, 2)
-        result.income.sort(key=lambda bgt: bgt.category.name)
-        result.budgets.sort(key=lambda bgt: bgt.category.name)
-        result.other.sort(key=lambda bgt: bgt.category.name)
+        # Row order from the db isn't guaranteed, so ties on name are broken by
+        # category id to keep reports stable between calls:
+        for budgets in (result.income, result.budgets, result.other):
+            budgets.sort(key=lambda bgt: (bgt.category.name, str(bgt.category.id)))
         return result
 
+    @staticmethod
+    def _row_sort_key(row: BudgetReportRow) -> tuple[bool, date, str]:
+        if row.budget is None:
+            return True, date.max, ""
+        return False, row.budget.createDate, str(row.budget.id)
+
     @staticmethod
     def _transform(
         bgt: Budget[UUID],
-        categories: dict[UUID, Category],
-        summarized_transactions: dict[UUID, float],
-        to_date: date,
+        category: Category,
+        allocated_amt: float,
+        amts: tuple[float, float],
     ) -> AllocatedBudget:
-        allocated_amt = summarized_transactions.get(bgt.category, 0)
         allocated_amt = abs(allocated_amt)
-        amt, accumulated_amt = calculate_accumulated_budget(
-            bgt.amt,
-            period=bgt.period,
-            create_date=bgt.createDate,
-            compare_date=to_date,
-        )
+        amt, accumulated_amt = amts
         return AllocatedBudget(
             id=bgt.id,
-            category=categories[bgt.category],
+            category=category,
             amt=bgt.amt,
             monthAmt=round(amt, 2),
             accumulatedAmt=round(accumulated_amt, 2),
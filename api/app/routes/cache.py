@@ -0,0 +1,154 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.storage.versions import DataVersions
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    compute_seconds: float
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: Hashable) -> CacheEntry | None:
+        return NotImplemented
+
+    @abstractmethod
+    async def set(self, key: Hashable, entry: CacheEntry) -> None:
+        pass
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    In-process cache that evicts the least recently used entry once max_size
+    entries are stored.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        self._max_size = max_size
+        self._entries = OrderedDict[Hashable, CacheEntry]()
+
+    async def get(self, key: Hashable) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: Hashable, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    coalesced: int
+    hitRatio: float
+    computeSeconds: float
+    savedSeconds: float
+
+
+class ResultCache:
+    """
+    Caches the results of expensive by-owner computations. Keys include the owner's
+    data version, so any write for the owner makes their old entries unreachable.
+    Versions are stored in the db, so every worker keys an owner's results the same
+    way, and a backend shared between workers lets them hit each other's entries.
+    Concurrent calls with the same key share a single computation.
+    """
+
+    def __init__(
+        self, versions: DataVersions, backend: CacheBackend | None = None
+    ) -> None:
+        self._versions = versions
+        self._backend = backend or LRUCacheBackend()
+        self._inflight = dict[Hashable, asyncio.Future[CacheEntry]]()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._compute_seconds = 0.0
+        self._saved_seconds = 0.0
+
+    async def get_or_compute(
+        self,
+        owner: UUID,
+        key: tuple[Hashable, ...],
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Args:
+            owner (UUID): The owner whose data the result is computed from.
+            key (tuple[Hashable, ...]): Identifies the computation and its
+                arguments, e.g. ("net-income", start, end).
+            compute (Callable[[], Awaitable[T]]): Computes the result on a miss.
+
+        Returns:
+            T: The cached or freshly computed result.
+        """
+        # The version must be read before computing; a write that lands mid-compute
+        # then leaves the result under a key that will never be looked up again.
+        full_key = (await self._versions.get_async(owner), owner, *key)
+        entry = await self._backend.get(full_key)
+        if entry is not None:
+            self._hits += 1
+            self._saved_seconds += entry.compute_seconds
+            return entry.value
+
+        while (inflight := self._inflight.get(full_key)) is not None:
+            try:
+                entry = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not inflight.cancelled() or (task and task.cancelling()):
+                    raise
+                # The request computing the result went away, so try again:
+                continue
+            self._coalesced += 1
+            self._saved_seconds += entry.compute_seconds
+            return entry.value
+
+        self._misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            start = perf_counter()
+            value = await compute()
+            entry = CacheEntry(value, perf_counter() - start)
+            self._compute_seconds += entry.compute_seconds
+            await self._backend.set(full_key, entry)
+            future.set_result(entry)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marks the exception retrieved in case nothing else was waiting:
+            future.exception()
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def get_stats(self) -> CacheStats:
+        total = self._hits + self._coalesced + self._misses
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            coalesced=self._coalesced,
+            hitRatio=(self._hits + self._coalesced) / total if total else 0,
+            computeSeconds=self._compute_seconds,
+            savedSeconds=self._saved_seconds,
+        )
@@ -9,8 +9,9 @@ from app.domain.category import (
     PrimaryCategory,
     decode_category_input_model,
 )
-from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.core import BulkInput, BulkResult, PagedResultsModel, QueryModel
 from app.routes import utils
+from app.routes.query_budget import query_budget
 from app.routes.router import BasicRouter, ByOwnerMethods
 from app.storage.db import MenthaTable
 
@@ -36,11 +37,13 @@ class CategoryRouter(
             "/by-owner/{ownerId}/all",
             self.get_primary_by_owner,
             summary="Get Categories By Owner (All)",
+            openapi_extra=query_budget(2),
         )
         router.add_api_route(
             "/by-owner/{ownerId}/flat",
             self.get_all_by_owner_flat,
             summary="Get Categories By Owner (Flattened)",
+            openapi_extra=query_budget(2),
         )
 
         return router
@@ -48,6 +51,9 @@ class CategoryRouter(
     async def add(self, input: CategoryInput) -> UUID:
         return await super().add(input)
 
+    async def bulk(self, input: BulkInput[CategoryInput]) -> list[BulkResult]:
+        return await super().bulk(input)
+
     async def update(self, id: UUID, input: CategoryInput) -> Category:
         return await super().update(id, input)
 
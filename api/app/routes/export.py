@@ -0,0 +1,95 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterable, AsyncIterator, Literal
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+# Records fetched from the db's cursor at a time while exporting:
+EXPORT_BATCH_SIZE = 500
+
+
+async def _batch_lines(
+    lines: AsyncIterable[bytes], chunk_size: int
+) -> AsyncIterator[bytes]:
+    # Joins lines into chunks so the response isn't sent one record at a time:
+    chunk = list[bytes]()
+    size = 0
+    async for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b"".join(chunk)
+            chunk.clear()
+            size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+async def _encode_ndjson(records: AsyncIterable[BaseModel]) -> AsyncIterator[bytes]:
+    async for record in records:
+        yield to_json(record) + b"\n"
+
+
+async def _encode_csv(
+    records: AsyncIterable[BaseModel], fields: list[str]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n")
+    writer.writeheader()
+    async for record in records:
+        writer.writerow(record.model_dump(mode="json"))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+async def gzip_stream(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Args:
+        chunks (AsyncIterable[bytes]): The bytes to compress.
+
+    Yields:
+        bytes: The chunks gzip compressed as they arrive, as a single gzip member.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_records(
+    records: AsyncIterable[BaseModel],
+    format: ExportFormat,
+    fields: list[str],
+    chunk_size: int = 64 * 1024,
+) -> AsyncIterator[bytes]:
+    """
+    Encodes records one at a time as they arrive, so the whole export never needs
+    to be in memory.
+
+    Args:
+        records (AsyncIterable[BaseModel]): The records to export.
+        format (ExportFormat): ndjson for one json object per line, or csv.
+        fields (list[str]): The fields of each record, used as the csv header.
+        chunk_size (int, optional): Approximate size of each yielded chunk in
+            bytes. Defaults to 64KiB.
+
+    Returns:
+        AsyncIterator[bytes]: The encoded records.
+    """
+    if format == "csv":
+        lines = _encode_csv(records, fields)
+    else:
+        lines = _encode_ndjson(records)
+    return _batch_lines(lines, chunk_size)
@@ -1,5 +1,5 @@
 from uuid import UUID
-from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.core import BulkInput, BulkResult, PagedResultsModel, QueryModel
 from app.domain.institution import (
     Institution,
     InstitutionInput,
@@ -26,6 +26,9 @@ class InstitutionRouter(BasicRouter[Institution, InstitutionInput]):
     async def add(self, input: InstitutionInput) -> UUID:
         return await super().add(input)
 
+    async def bulk(self, input: BulkInput[InstitutionInput]) -> list[BulkResult]:
+        return await super().bulk(input)
+
     async def update(self, id: UUID, input: InstitutionInput) -> Institution:
         return await super().update(id, input)
 
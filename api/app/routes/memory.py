@@ -0,0 +1,160 @@
+import tracemalloc
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from app.memory import GroupBy, MemoryDiagnostics, SnapshotNotFoundError
+from app.routes.query_budget import query_budget
+
+LimitQueryParam = Query(ge=1, le=500, description="Number of call sites to list.")
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool
+    tracedBytes: int
+    peakBytes: int
+    snapshots: list[int]
+
+
+class MemorySnapshot(BaseModel):
+    id: int
+
+
+class AllocationSite(BaseModel):
+    # Most recent call last:
+    traceback: list[str]
+    sizeBytes: int
+    count: int
+    sizeDiffBytes: int | None = None
+    countDiff: int | None = None
+
+
+def _format_traceback(traceback: tracemalloc.Traceback) -> list[str]:
+    return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+
+class MemoryRouter:
+    """
+    Admin endpoints for finding what's holding memory, with tracemalloc. Only
+    mounted when the app is created with memory_diagnostics, since tracing slows
+    down every allocation while it's on.
+    """
+
+    def __init__(self, diagnostics: MemoryDiagnostics | None = None) -> None:
+        self._diagnostics = diagnostics or MemoryDiagnostics()
+
+    def create_fastapi_router(self) -> APIRouter:
+        router = APIRouter(prefix="", tags=["admin"])
+        router.add_api_route(
+            "",
+            self.get_status,
+            summary="Get Memory Tracing Status",
+            methods=["GET"],
+            openapi_extra=query_budget(0),
+        )
+        router.add_api_route(
+            "/start",
+            self.start,
+            summary="Start Tracing Memory Allocations",
+            methods=["POST"],
+            openapi_extra=query_budget(0),
+        )
+        router.add_api_route(
+            "/stop",
+            self.stop,
+            summary="Stop Tracing Memory Allocations",
+            methods=["POST"],
+            openapi_extra=query_budget(0),
+        )
+        router.add_api_route(
+            "/snapshots",
+            self.take_snapshot,
+            summary="Take a Snapshot of Traced Memory Allocations",
+            methods=["POST"],
+            openapi_extra=query_budget(0),
+        )
+        router.add_api_route(
+            "/snapshots/{id}/top",
+            self.get_top_allocations,
+            summary="Get the Call Sites Holding the Most Memory in a Snapshot",
+            methods=["GET"],
+            openapi_extra=query_budget(0),
+        )
+        router.add_api_route(
+            "/snapshots/{id}/diff/{baseId}",
+            self.get_allocation_diff,
+            summary="Get the Call Sites Whose Memory Changed Most Between Snapshots",
+            methods=["GET"],
+            openapi_extra=query_budget(0),
+        )
+        return router
+
+    async def get_status(self) -> MemoryStatus:
+        traced, peak = tracemalloc.get_traced_memory()
+        return MemoryStatus(
+            tracing=self._diagnostics.tracing,
+            tracedBytes=traced,
+            peakBytes=peak,
+            snapshots=self._diagnostics.snapshot_ids,
+        )
+
+    async def start(
+        self,
+        frames: Annotated[
+            int, Query(ge=1, le=100, description="Frames kept per allocation.")
+        ] = 1,
+    ) -> MemoryStatus:
+        self._diagnostics.start(frames)
+        return await self.get_status()
+
+    async def stop(self) -> MemoryStatus:
+        self._diagnostics.stop()
+        return await self.get_status()
+
+    async def take_snapshot(self) -> MemorySnapshot:
+        try:
+            return MemorySnapshot(id=self._diagnostics.snapshot())
+        except RuntimeError as e:
+            raise HTTPException(409, str(e))
+
+    async def get_top_allocations(
+        self,
+        id: int,
+        limit: Annotated[int, LimitQueryParam] = 20,
+        groupBy: GroupBy = "lineno",
+    ) -> list[AllocationSite]:
+        try:
+            stats = self._diagnostics.top(id, limit, groupBy)
+        except SnapshotNotFoundError as e:
+            raise HTTPException(404, f"No snapshot found with id {e.id}.")
+        return [
+            AllocationSite(
+                traceback=_format_traceback(stat.traceback),
+                sizeBytes=stat.size,
+                count=stat.count,
+            )
+            for stat in stats
+        ]
+
+    async def get_allocation_diff(
+        self,
+        id: int,
+        baseId: int,
+        limit: Annotated[int, LimitQueryParam] = 20,
+        groupBy: GroupBy = "lineno",
+    ) -> list[AllocationSite]:
+        try:
+            stats = self._diagnostics.diff(id, baseId, limit, groupBy)
+        except SnapshotNotFoundError as e:
+            raise HTTPException(404, f"No snapshot found with id {e.id}.")
+        return [
+            AllocationSite(
+                traceback=_format_traceback(stat.traceback),
+                sizeBytes=stat.size,
+                count=stat.count,
+                sizeDiffBytes=stat.size_diff,
+                countDiff=stat.count_diff,
+            )
+            for stat in stats
+        ]
@@ -0,0 +1,87 @@
+import tracemalloc
+from time import perf_counter
+
+from fastapi import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.loop_monitor import current_request
+from app.metrics import REGISTRY, Histogram, Registry
+
+EXPOSITION_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_SECONDS = Histogram(
+    "mentha_http_request_duration_seconds",
+    "Time taken to handle HTTP requests, by route.",
+    ["method", "route", "status"],
+)
+REQUEST_MEMORY_PEAK_BYTES = Histogram(
+    "mentha_http_request_memory_peak_bytes",
+    "Peak memory traced while handling HTTP requests, above what was traced when "
+    "they started, by route. Only recorded while tracemalloc is tracing. Requests "
+    "handled at the same time share the process's peak, so it's an upper bound.",
+    ["method", "route"],
+    buckets=[2**n for n in range(16, 32, 2)],
+)
+
+# Requests being handled, across apps, since tracemalloc's peak is process-wide:
+_in_flight = 0
+
+
+class RequestMetrics:
+    """
+    ASGI middleware recording each request's latency under its route's path
+    template, e.g. /categories/{id}, rather than the requested path, so ids don't
+    create a new series per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self._app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _in_flight
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        start = perf_counter()
+        status = 500
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # The peak can only be reset without hiding that of another request
+            # when none are being handled:
+            if _in_flight == 0:
+                tracemalloc.reset_peak()
+            start_bytes, _ = tracemalloc.get_traced_memory()
+        _in_flight += 1
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        # Lets stalls of the event loop be blamed on the request's route. It's left
+        # set, since servers run each request in a task of its own, so a stall in
+        # the step that finishes the request is still blamed on it:
+        current_request.set(scope)
+        try:
+            await self._app(scope, receive, _send)
+        finally:
+            _in_flight -= 1
+            # FastAPI sets the matched route on the scope while routing:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route, status).observe(
+                perf_counter() - start
+            )
+            if tracing and tracemalloc.is_tracing():
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                REQUEST_MEMORY_PEAK_BYTES.labels(scope["method"], route).observe(
+                    max(peak_bytes - start_bytes, 0)
+                )
+
+
+class MetricsEndpoint:
+    def __init__(self, registry: Registry = REGISTRY) -> None:
+        self._registry = registry
+
+    async def get_metrics(self) -> Response:
+        return Response(self._registry.render(), media_type=EXPOSITION_MEDIA_TYPE)
@@ -0,0 +1,80 @@
+import cProfile
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.profiling import SamplingProfiler
+
+PROFILE_HEADER = b"x-mentha-profile"
+PROFILE_FILE_HEADER = "X-Mentha-Profile-File"
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.]+")
+
+
+class RequestProfiling:
+    """
+    ASGI middleware profiling requests sent with an X-Mentha-Profile header, and
+    saving the profile to a file in the passed directory, whose path is returned
+    in an X-Mentha-Profile-File header:
+
+    - "cprofile" uses cProfile, and saves its stats for pstats or snakeviz.
+    - "sample" uses the sampling profiler, and saves a speedscope JSON file.
+
+    Both profile the event loop thread, so they also pick up other requests
+    handled at the same time, and only one request is profiled at a time. Other
+    requests with the header are handled without being profiled.
+    """
+
+    def __init__(self, app: ASGIApp, directory: Path | str) -> None:
+        self._app = app
+        self._directory = Path(directory)
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        mode = dict(scope["headers"]).get(PROFILE_HEADER, b"").decode("latin-1")
+        if mode not in ("cprofile", "sample") or not self._lock.acquire(blocking=False):
+            await self._app(scope, receive, send)
+            return
+        try:
+            await self._profile(mode, scope, receive, send)
+        finally:
+            self._lock.release()
+
+    async def _profile(
+        self, mode: str, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        name = f"{scope['method']} {scope['path']}"
+        stem = _UNSAFE_FILENAME_CHARS.sub("-", f"{time.time_ns()}-{name}")
+        suffix = ".prof" if mode == "cprofile" else ".speedscope.json"
+        path = self._directory.joinpath(stem + suffix).resolve()
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_FILE_HEADER, str(path))
+            await send(message)
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        if mode == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self._app(scope, receive, _send)
+            finally:
+                profile.disable()
+                profile.dump_stats(path)
+        else:
+            sampler = SamplingProfiler()
+            sampler.start()
+            try:
+                await self._app(scope, receive, _send)
+            finally:
+                sampler.stop()
+                path.write_text(json.dumps(sampler.to_speedscope(name)))
@@ -0,0 +1,71 @@
+import logging
+from typing import Any, Literal
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.metrics import Histogram
+from app.storage.query_count import count_queries
+
+QUERY_BUDGET_KEY = "x-query-budget"
+
+QueryBudgetMode = Literal["log", "raise"]
+
+REQUEST_QUERIES = Histogram(
+    "mentha_http_request_db_queries",
+    "Statements executed on the db while handling HTTP requests, by route.",
+    ["method", "route"],
+    buckets=[1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceededError(Exception):
+    pass
+
+
+def query_budget(max_queries: int) -> dict[str, Any]:
+    """
+    Declares the most statements a route should execute per request, which the
+    QueryBudgets middleware checks. Pass it as the route's openapi_extra, which
+    also documents the budget:
+
+        router.add_api_route("/{id}", ..., openapi_extra=query_budget(1))
+    """
+    return {QUERY_BUDGET_KEY: max_queries}
+
+
+class QueryBudgets:
+    """
+    ASGI middleware counting the statements each request executes, including in
+    its background tasks, and checking them against its route's query budget.
+    Requests over budget are logged, or raise in "raise" mode, for tests.
+    """
+
+    def __init__(self, app: ASGIApp, mode: QueryBudgetMode = "log") -> None:
+        self._app = app
+        self._mode = mode
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        with count_queries() as count:
+            await self._app(scope, receive, send)
+        route = scope.get("route")
+        label = f"{scope['method']} {getattr(route, 'path', 'unmatched')}"
+        count.add_request(label)
+        if route is None:
+            return
+        REQUEST_QUERIES.labels(scope["method"], route.path).observe(count.count)
+        budget = (getattr(route, "openapi_extra", None) or {}).get(QUERY_BUDGET_KEY)
+        if budget is None or count.count <= budget:
+            return
+        statement, repeats = count.most_repeated() or ("", 0)
+        msg = (
+            f"{label} executed {count.count} statements, over its budget of "
+            f"{budget}. The most repeated, {repeats} times, was: {statement}"
+        )
+        if self._mode == "raise":
+            raise QueryBudgetExceededError(msg)
+        logger.warning(msg)
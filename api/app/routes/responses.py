@@ -0,0 +1,72 @@
+import functools
+import inspect
+from typing import Any, Awaitable, Callable
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from app import server_timing, tracing
+
+_RESPONSE_PARAM = "__response"
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    Renders its content straight to JSON bytes with pydantic-core, which serializes
+    domain models (and the ids, dates and nested models on them) without first
+    converting them to dicts of json-compatible values.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def model_json_endpoint(
+    endpoint: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Response]]:
+    """
+    Wraps a route endpoint so its result is returned as a ModelJSONResponse.
+    FastAPI passes returned Responses through as is, which skips re-validating the
+    result against the response model and encoding it again. The endpoint's
+    signature is kept, so its parameters and documented response model don't
+    change.
+
+    Args:
+        endpoint (Callable[..., Awaitable[Any]]): The endpoint to wrap.
+
+    Returns:
+        Callable[..., Awaitable[Response]]: The wrapped endpoint.
+    """
+    signature = inspect.signature(endpoint, eval_str=True)
+    name = endpoint.__qualname__
+
+    @functools.wraps(endpoint)
+    async def _endpoint(*args: Any, **kwargs: Any) -> Response:
+        sub_response: Response = kwargs.pop(_RESPONSE_PARAM)
+        with tracing.span(name):
+            result = await endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        with tracing.span("serialize"), server_timing.timed("serialize"):
+            response = ModelJSONResponse(
+                result, status_code=sub_response.status_code or 200
+            )
+        # FastAPI only copies headers set by dependencies onto responses it builds:
+        response.headers.raw.extend(sub_response.headers.raw)
+        return response
+
+    # Has FastAPI inject the Response that dependencies write their headers to:
+    setattr(
+        _endpoint,
+        "__signature__",
+        signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter(
+                    _RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response
+                ),
+            ]
+        ),
+    )
+    return _endpoint
@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Callable, Generic
+from typing import Any, Awaitable, Callable, Generic
 from uuid import UUID, uuid4
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 
-from app.domain.core import DomainModelT, InputModelT, PagedResultsModel, QueryModel
+from app.domain.core import (
+    BulkInput,
+    BulkResult,
+    BulkStatus,
+    DomainModelT,
+    InputModelT,
+    PagedResultsModel,
+    QueryModel,
+)
+from app.routes.query_budget import query_budget
+from app.routes.responses import model_json_endpoint
+from app.routes.unit_of_work import read_only
 from app.storage.db import MenthaTable
 
 
@@ -42,28 +53,39 @@ class BasicRouter(Router, Generic[DomainModelT, InputModelT], ABC):
 
         router.add_api_route(
             "/{id}",
-            self.get,
+            model_json_endpoint(self.get),
             summary=f"Get {self._singular.title()}",
             response_model=self._model,
+            openapi_extra=query_budget(1),
         )
         router.add_api_route(
             "/{id}",
-            self.update,
+            model_json_endpoint(self.update),
             summary=f"Update {self._singular.title()}",
             response_model=self._model,
             methods=["PUT"],
+            openapi_extra=query_budget(2),
         )
         router.add_api_route(
             "/{id}",
             self.delete,
             summary=f"Delete {self._singular.title()}",
             methods=["DELETE"],
+            openapi_extra=query_budget(2),
         )
         router.add_api_route(
             "/query",
-            self.get_all,
+            model_json_endpoint(self.get_all),
             summary=f"Get All {self._plural.title()}",
             methods=["POST"],
+            openapi_extra={**query_budget(2), **read_only()},
+        )
+        router.add_api_route(
+            "/bulk",
+            model_json_endpoint(self.bulk),
+            summary=f"Bulk Add, Update And Delete {self._plural.title()}",
+            methods=["POST"],
+            openapi_extra=query_budget(5),
         )
         router.add_api_route(
             "/",
@@ -71,6 +93,7 @@ class BasicRouter(Router, Generic[DomainModelT, InputModelT], ABC):
             summary=f"Add {self._singular.title()}",
             response_model=UUID,
             methods=["POST"],
+            openapi_extra=query_budget(2),
         )
         return router
 
@@ -94,6 +117,52 @@ class BasicRouter(Router, Generic[DomainModelT, InputModelT], ABC):
         await self._table.insert_async(new)
         return new.id
 
+    async def bulk(self, input: BulkInput[InputModelT]) -> list[BulkResult]:
+        """
+        Creates, updates and deletes any number of records in a single db
+        transaction.
+
+        You must override this method and change the InputModelT TypeVar, above,
+        to the appropriate input model for your BasicRouter, otherwise, you will
+        get errors before application startup.
+
+        Args:
+            input (BulkInput[InputModelT]): The InputModels to create records from
+                or update records with, and the ids of records to delete.
+
+        Raises:
+            HTTPException: If any update is missing its id.
+
+        Returns:
+            list[BulkResult]: The outcome for each item in input, in the order
+            creates, updates, deletes.
+        """
+        updates = list[DomainModelT]()
+        for update in input.update:
+            if update.id is None:
+                raise HTTPException(422, "Every update must include an id.")
+            updates.append(self._decode_input(update.id, update))
+        written = await self._table.bulk_write_async(
+            inserts=[self._decode_input(uuid4(), create) for create in input.create],
+            updates=updates,
+            deletes=input.delete,
+        )
+
+        updated, unchanged = set(written.updated), set(written.unchanged)
+        deleted = set(written.deleted)
+        results = [BulkResult(id=id, status="created") for id in written.inserted]
+        for model in updates:
+            if model.id in updated:
+                results.append(BulkResult(id=model.id, status="updated"))
+            elif model.id in unchanged:
+                results.append(BulkResult(id=model.id, status="unchanged"))
+            else:
+                results.append(BulkResult(id=model.id, status="notFound"))
+        for id in input.delete:
+            status: BulkStatus = "deleted" if id in deleted else "notFound"
+            results.append(BulkResult(id=id, status=status))
+        return results
+
     async def get(self, id: UUID) -> DomainModelT:
         result = await self._table.get_async(id)
         if result is None:
@@ -137,21 +206,23 @@ class BasicRouter(Router, Generic[DomainModelT, InputModelT], ABC):
 
         Raises:
             NotFoundException: If the passed id cannot be found.
+            HTTPException: If the table has a version column and the record's
+                version no longer matches the input's.
 
         Returns:
             DomainModelT: The updated model.
         """
-        current = await self._table.get_async(id)
-        if not current:
+        # Only edits if changes were actually made, in a single round trip:
+        update = await self._table.update_if_changed_async(
+            self._decode_input(id, input)
+        )
+        if update.record is None:
             raise NotFoundException(id)
-
-        result = self._decode_input(id, input)
-
-        # Only edit if changes were actually made:
-        if current != result:
-            await self._table.update_async(result)
-
-        return result
+        elif update.status == "conflict":
+            raise HTTPException(
+                409, f"Record {id} was changed by another request, reload it."
+            )
+        return update.record
 
     async def delete(self, id: UUID) -> JSONResponse:
         await self._table.delete_async(id)
@@ -164,12 +235,24 @@ class ByOwnerMethods(Generic[DomainModelT], ABC):
     ) -> APIRouter:
         router.add_api_route(
             "/by-owner/{ownerId}",
-            self.get_by_owner,
+            model_json_endpoint(self.by_owner_endpoint()),
             summary=f"Get {plural_name.title()} By Owner",
             methods=["POST"],
+            openapi_extra={**query_budget(2), **read_only()},
         )
         return router
 
+    def by_owner_endpoint(self) -> Callable[..., Awaitable[Any]]:
+        """
+        Override to serve the by-owner route with an endpoint that takes more
+        parameters than get_by_owner, like a response format, and calls it.
+
+        Returns:
+            Callable[..., Awaitable[Any]]: The by-owner route's endpoint. Defaults
+            to get_by_owner.
+        """
+        return self.get_by_owner
+
     @abstractmethod
     async def get_by_owner(
         self,
@@ -3,19 +3,15 @@ from uuid import UUID
 from fastapi import APIRouter
 
 from app.domain.category import Category
-from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.core import BulkInput, BulkResult, PagedResultsModel, QueryModel
 from app.domain.rule import Rule, RuleInput, decode_rule_input_model
 from app.routes.router import BasicRouter, ByOwnerMethods
-from app.routes.utils import preprocess_filters, get_categories_by_id
+from app.routes.utils import preprocess_filters
 from app.storage.db import MenthaTable
 
 
 class RuleRouter(BasicRouter[Rule[UUID], RuleInput], ByOwnerMethods[Rule[Category]]):
-    def __init__(
-        self,
-        rule_table: MenthaTable[Rule[UUID]],
-        category_table: MenthaTable[Category],
-    ) -> None:
+    def __init__(self, rule_table: MenthaTable[Rule[UUID]]) -> None:
         super().__init__(
             singular_name="rule",
             plural_name="rules",
@@ -23,7 +19,6 @@ class RuleRouter(BasicRouter[Rule[UUID], RuleInput], ByOwnerMethods[Rule[Categor
             input_model_decoder=decode_rule_input_model,
             table=rule_table,
         )
-        self._cat_table = category_table
 
     def create_fastapi_router(self) -> APIRouter:
         router = super().create_fastapi_router()
@@ -33,6 +28,9 @@ class RuleRouter(BasicRouter[Rule[UUID], RuleInput], ByOwnerMethods[Rule[Categor
     async def add(self, input: RuleInput) -> UUID:
         return await super().add(input)
 
+    async def bulk(self, input: BulkInput[RuleInput]) -> list[BulkResult]:
+        return await super().bulk(input)
+
     async def update(self, id: UUID, input: RuleInput) -> Rule[UUID]:
         return await super().update(id, input)
 
@@ -44,26 +42,11 @@ class RuleRouter(BasicRouter[Rule[UUID], RuleInput], ByOwnerMethods[Rule[Categor
     async def get_by_owner(
         self, ownerId: UUID, query: QueryModel, page: int = 1, pageSize: int = 50
     ) -> PagedResultsModel[Rule[Category]]:
-        raw_results = await self._table.query_async(
+        return await self._table.query_joined_async(
+            Rule[Category],
             page=page,
             page_size=pageSize,
             sorts=query.sorts,
             owner=ownerId,
             **preprocess_filters(query.filters)
         )
-        categories = await get_categories_by_id(
-            self._cat_table, [row.resultCategory for row in raw_results.results]
-        )
-
-        def _transform(rule: Rule[UUID]) -> Rule[Category]:
-            return Rule(
-                id=rule.id,
-                priority=rule.priority,
-                resultCategory=categories[rule.resultCategory],
-                owner=rule.owner,
-                matchName=rule.matchName,
-                matchAmt=rule.matchAmt,
-                matchType=rule.matchType,
-            )
-
-        return raw_results.broadcast_transform(_transform)
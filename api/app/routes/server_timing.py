@@ -0,0 +1,48 @@
+from time import perf_counter
+from typing import Sequence
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import server_timing
+
+
+class ServerTiming:
+    """
+    ASGI middleware adding a Server-Timing header to each response, with the time
+    spent in each phase timed while handling the request, and the total time taken
+    until the response started. Browser dev tools show it alongside the request.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Sequence[str] = ()) -> None:
+        """
+        Args:
+            allow_origins (Sequence[str], optional): Cross-origin pages that can
+                read the header from scripts, through the Resource Timing API.
+                Defaults to ().
+        """
+        self._app = app
+        self._allow_origins = ", ".join(allow_origins)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        start = perf_counter()
+        timings, token = server_timing.start()
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing.format_header(timings, perf_counter() - start),
+                )
+                if self._allow_origins:
+                    headers.append("Timing-Allow-Origin", self._allow_origins)
+            await send(message)
+
+        try:
+            await self._app(scope, receive, _send)
+        finally:
+            server_timing.stop(token)
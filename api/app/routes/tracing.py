@@ -0,0 +1,44 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import tracing
+
+
+class RequestTracing:
+    """
+    ASGI middleware running each request in a server span, continuing the trace
+    of a W3C traceparent header if the request has one. The span is named after
+    the route's path template once it's matched, e.g. GET /categories/{id}.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self._app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1")
+        method = scope["method"]
+        with tracing.span(
+            method,
+            kind="server",
+            parent=tracing.parse_traceparent(traceparent),
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        ) as span:
+
+            async def _send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    span.set_attribute("http.response.status_code", status)
+                    if status >= 500:
+                        span.set_status("error")
+                await send(message)
+
+            try:
+                await self._app(scope, receive, _send)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None and span.recording:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
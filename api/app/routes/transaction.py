@@ -1,20 +1,42 @@
+from typing import Any, Awaitable, Callable
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.domain.category import UNCATEGORIZED, Category
-from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.core import (
+    BulkInput,
+    BulkResult,
+    PagedResultsModel,
+    QueryModel,
+    SortModel,
+)
 from app.domain.rule import check_rule_against_transaction
 from app.domain.transaction import (
+    ColumnarTransactionResults,
+    CompactTransactionResults,
     Transaction,
     TransactionInput,
+    TransactionListFormat,
+    columnar_transaction_results,
+    compact_transaction_results,
     decode_transaction_input_model,
 )
+from app.routes.export import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    encode_records,
+    gzip_stream,
+)
+from app.routes.query_budget import query_budget
 from app.routes.router import BasicRouter, ByOwnerMethods
-from app.routes.utils import get_categories_by_id, preprocess_filters
+from app.routes.unit_of_work import read_only
+from app.routes.utils import preprocess_filters
 from app.storage.db import MenthaDB
 from app.storage.importer import Importer
+from app.storage.unit_of_work import detached
 
 
 class TransactionRouter(
@@ -36,17 +58,27 @@ class TransactionRouter(
 
         self.apply_methods_to_fastapi_router(router, self._plural)
 
+        router.add_api_route(
+            "/export/{ownerId}",
+            self.export_transactions,
+            summary="Export Transactions For Owner",
+            methods=["POST"],
+            response_class=StreamingResponse,
+            openapi_extra={**query_budget(1), **read_only()},
+        )
         router.add_api_route(
             "/import/{ownerId}",
             self.import_transactions,
             summary="Import Transactions For Owner",
             methods=["POST"],
+            openapi_extra=query_budget(11),
         )
         router.add_api_route(
             "/apply-rules/{ownerId}",
             self.apply_rules,
             summary="Apply Rules to Owned Transactions",
             methods=["PUT"],
+            openapi_extra=query_budget(6),
         )
 
         return router
@@ -54,6 +86,9 @@ class TransactionRouter(
     async def add(self, input: TransactionInput) -> UUID:
         return await super().add(input)
 
+    async def bulk(self, input: BulkInput[TransactionInput]) -> list[BulkResult]:
+        return await super().bulk(input)
+
     async def update(self, id: UUID, input: TransactionInput) -> Transaction[UUID]:
         return await super().update(id, input)
 
@@ -62,26 +97,85 @@ class TransactionRouter(
     ) -> PagedResultsModel[Transaction[UUID]]:
         return await super().get_all(query, page, pageSize)
 
+    def by_owner_endpoint(self) -> Callable[..., Awaitable[Any]]:
+        return self.get_by_owner_in_format
+
     async def get_by_owner(
-        self,
-        ownerId: UUID,
-        query: QueryModel,
-        page: int = 1,
-        pageSize: int = 50,
+        self, ownerId: UUID, query: QueryModel, page: int = 1, pageSize: int = 50
     ) -> PagedResultsModel[Transaction[Category]]:
-        raw_results = await self._table.query_async(
+        return await self._table.query_joined_async(
+            Transaction[Category],
             page=page,
             page_size=pageSize,
             sorts=query.sorts,
             owner=ownerId,
             **preprocess_filters(query.filters),
         )
-        categories = await get_categories_by_id(
-            self._db.categories, [row.category for row in raw_results.results]
-        )
 
-        return raw_results.broadcast_transform(
-            lambda tran: self._transform(tran, categories)
+    async def get_by_owner_in_format(
+        self,
+        ownerId: UUID,
+        query: QueryModel,
+        page: int = 1,
+        pageSize: int = 50,
+        format: TransactionListFormat = "expanded",
+    ) -> (
+        PagedResultsModel[Transaction[Category]]
+        | CompactTransactionResults
+        | ColumnarTransactionResults
+    ):
+        """
+        Args:
+            format (TransactionListFormat, optional): The shape of the results.
+                expanded embeds each transaction's Category. compact returns
+                transactions with category ids and lists each of their categories
+                once, which shrinks large pages. columnar is like compact, but
+                results are one array of values per transaction field. Defaults to
+                expanded.
+        """
+        results = await self.get_by_owner(ownerId, query, page, pageSize)
+        if format == "compact":
+            return compact_transaction_results(results)
+        elif format == "columnar":
+            return columnar_transaction_results(results)
+        return results
+
+    async def export_transactions(
+        self,
+        ownerId: UUID,
+        query: QueryModel,
+        format: ExportFormat = "ndjson",
+        gzip: bool = False,
+    ) -> StreamingResponse:
+        """
+        Streams every transaction for the owner that matches the query's filters,
+        as they're read from the db.
+
+        Args:
+            format (ExportFormat, optional): ndjson or csv. Defaults to ndjson.
+            gzip (bool, optional): Whether to gzip the export as it's streamed.
+                Defaults to False.
+        """
+        filters = preprocess_filters(query.filters)
+        # Picks the db to read from now, while the request's unit of work is open,
+        # since the response is only streamed after it closes:
+        transactions = self._table.stream_async(
+            sorts=query.sorts or [SortModel(field="date"), SortModel(field="id")],
+            batch_size=EXPORT_BATCH_SIZE,
+            owner=ownerId,
+            **filters,
+        )
+        content = encode_records(
+            transactions, format, fields=list(Transaction.model_fields)
+        )
+        headers = {
+            "Content-Disposition": f'attachment; filename="transactions.{format}"'
+        }
+        if gzip:
+            content = gzip_stream(content)
+            headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(
+            content, media_type=EXPORT_MEDIA_TYPES[format], headers=headers
         )
 
     async def import_transactions(self, ownerId: UUID) -> JSONResponse:
@@ -105,40 +199,22 @@ class TransactionRouter(
             params["category"] = UNCATEGORIZED.id
 
         async def _execute() -> None:
-            pg = 1
-            while True:
+            # Background tasks outlive the request, so never share its unit of work:
+            with detached():
                 to_update = list[Transaction[UUID]]()
-                transactions = await self._table.query_async(
-                    page=pg, page_size=100, sorts=[], **params
+                transactions = await self._table.page_through_query_async(
+                    sorts=None, **params
                 )
-                for trn in transactions.results:
+                for trn in transactions:
                     for rule in rules.results:
                         new_cat = check_rule_against_transaction(rule, trn)
                         if new_cat:
                             trn.category = new_cat
                             to_update.append(trn)
                             break
-                for trn in to_update:
-                    await self._table.update_async(trn)
-                if not transactions.hasNext:
-                    break
-                else:
-                    pg += 1
+                # One executemany for every matched transaction, rather than an
+                # UPDATE per transaction:
+                if to_update:
+                    await self._table.bulk_write_async(updates=to_update)
 
         background_tasks.add_task(_execute)
-
-    @staticmethod
-    def _transform(
-        tran: Transaction[UUID], categories: dict[UUID, Category]
-    ) -> Transaction[Category]:
-        return Transaction[Category](
-            id=tran.id,
-            fitId=tran.fitId,
-            amt=tran.amt,
-            type=tran.type,
-            date=tran.date,
-            name=tran.name,
-            category=categories[tran.category],
-            account=tran.account,
-            owner=tran.owner,
-        )
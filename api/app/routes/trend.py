@@ -3,9 +3,12 @@ from typing import Annotated, Any
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException
+from app import server_timing
 from app.domain.category import SYSTEM_CATEGORIES_BY_ID, TRANSFER, Category
 
 from app.domain.trend import CategorySpendingByMonth, NetIncomeByMonth
+from app.routes.cache import ResultCache
+from app.routes.query_budget import query_budget
 from app.routes.utils import (
     DateQueryParam,
     gen_dt_range,
@@ -17,8 +20,9 @@ from app.storage.db import Between, MenthaDB, SimpleOp
 
 
 class TrendRouter:
-    def __init__(self, db: MenthaDB) -> None:
+    def __init__(self, db: MenthaDB, cache: ResultCache | None = None) -> None:
         self._db = db
+        self._cache = cache or ResultCache(db.versions)
 
     def create_fastapi_router(self) -> APIRouter:
         router = APIRouter(prefix="", tags=["trends"])
@@ -28,6 +32,7 @@ class TrendRouter:
             summary="Get Net Income For the Specified Period",
             description="Results will be broken down by month.",
             methods=["GET"],
+            openapi_extra=query_budget(2),
         )
         router.add_api_route(
             "/category-spend/{ownerId}",
@@ -35,6 +40,7 @@ class TrendRouter:
             summary="Get Category Spending For the Specified Period and Category",
             description="Results will be broken down by month.",
             methods=["GET"],
+            openapi_extra=query_budget(3),
         )
         return router
 
@@ -45,12 +51,21 @@ class TrendRouter:
         endDt: Annotated[date | None, DateQueryParam] = None,
     ) -> list[NetIncomeByMonth]:
         start, end = gen_dt_range(startDt, endDt)
-        transactions = await self._db.transactions.page_through_query_async(
-            owner=ownerId,
-            date=Between(start, end),
-            category=SimpleOp(TRANSFER.id, "!="),
+
+        async def _calculate() -> list[NetIncomeByMonth]:
+            transactions = await self._db.transactions.page_through_query_async(
+                owner=ownerId,
+                date=Between(start, end),
+                category=SimpleOp(TRANSFER.id, "!="),
+            )
+            with server_timing.timed("transform"):
+                return summarize_transactions_by_month(
+                    transactions, summarizer_net_income
+                )
+
+        return await self._cache.get_or_compute(
+            ownerId, ("net-income", start, end), _calculate
         )
-        return summarize_transactions_by_month(transactions, summarizer_net_income)
 
     async def calculate_category_spending(
         self,
@@ -59,26 +74,32 @@ class TrendRouter:
         startDt: Annotated[date | None, DateQueryParam] = None,
         endDt: Annotated[date | None, DateQueryParam] = None,
     ) -> list[CategorySpendingByMonth[Category]]:
-        if category in SYSTEM_CATEGORIES_BY_ID:
-            cat = SYSTEM_CATEGORIES_BY_ID[category]
-        else:
-            cat = await self._db.categories.get_async(category)
-            if not cat:
-                raise HTTPException(404, f"Category {category} not found.")
-        query_args = dict[str, Any](owner=ownerId, category=category)
-        if startDt and endDt:
-            query_args["date"] = Between(startDt, endDt)
-        transactions = await self._db.transactions.page_through_query_async(
-            sorts=None, **query_args
-        )
-        raw_summary = summarize_transactions_by_month(
-            transactions, summarizer_category_spending
-        )
-        result = list[CategorySpendingByMonth[Category]]()
-        for summary in raw_summary:
-            result.append(
-                CategorySpendingByMonth[Category](
-                    date=summary.date, category=cat, amt=abs(summary.amt)
-                )
+        async def _calculate() -> list[CategorySpendingByMonth[Category]]:
+            if category in SYSTEM_CATEGORIES_BY_ID:
+                cat = SYSTEM_CATEGORIES_BY_ID[category]
+            else:
+                cat = await self._db.categories.get_async(category)
+                if not cat:
+                    raise HTTPException(404, f"Category {category} not found.")
+            query_args = dict[str, Any](owner=ownerId, category=category)
+            if startDt and endDt:
+                query_args["date"] = Between(startDt, endDt)
+            transactions = await self._db.transactions.page_through_query_async(
+                sorts=None, **query_args
             )
-        return result
+            with server_timing.timed("transform"):
+                raw_summary = summarize_transactions_by_month(
+                    transactions, summarizer_category_spending
+                )
+            result = list[CategorySpendingByMonth[Category]]()
+            for summary in raw_summary:
+                result.append(
+                    CategorySpendingByMonth[Category](
+                        date=summary.date, category=cat, amt=abs(summary.amt)
+                    )
+                )
+            return result
+
+        return await self._cache.get_or_compute(
+            ownerId, ("category-spend", category, startDt, endDt), _calculate
+        )
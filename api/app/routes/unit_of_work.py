@@ -0,0 +1,126 @@
+import time
+from contextlib import nullcontext
+from math import ceil
+from typing import Any, AsyncIterator
+
+from fastapi import Request, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.storage.db import MenthaDB
+from app.storage.replicas import read_your_writes
+
+READ_ONLY_KEY = "x-mentha-read-only"
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+WRITTEN_AT_COOKIE = "mentha-written-at"
+
+
+def read_only() -> dict[str, Any]:
+    """
+    Marks a route that isn't a GET as only reading, like the POST routes that take
+    a query as their body, so RequestUnitOfWork runs it like a GET. Merge it into
+    the route's openapi_extra:
+
+        router.add_api_route(
+            "/query", ..., openapi_extra={**query_budget(2), **read_only()}
+        )
+    """
+    return {READ_ONLY_KEY: True}
+
+
+def is_read_only(scope: Scope) -> bool:
+    """
+    Returns:
+        bool: Whether the routed request is a GET (or HEAD), or for a route marked
+        read_only.
+    """
+    extra = getattr(scope.get("route"), "openapi_extra", None) or {}
+    return scope["method"] in ("GET", "HEAD") or bool(extra.get(READ_ONLY_KEY))
+
+
+class RequestUnitOfWork:
+    """
+    FastAPI dependency that runs each request in a unit of work, so every
+    MenthaTable call it makes shares one connection and transaction, which
+    commits before the response is sent. Read only requests are run at
+    REPEATABLE READ, so all of their queries see the same snapshot; others keep
+    the default isolation level so concurrent writes don't fail to serialize.
+
+    Read only requests also run on a read replica if there are any. Requests with
+    an X-Read-Your-Writes header, or a mentha-written-at cookie (set by
+    ReadYourWrites) from within replica_lag seconds, read from the primary
+    instead, so they can't see (or cache) data from before their client's writes.
+
+    Background tasks run after the unit of work has closed, and use their own
+    connections.
+    """
+
+    def __init__(self, db: MenthaDB, replica_lag: float = 5.0) -> None:
+        self._db = db
+        self._replica_lag = replica_lag
+
+    def _reads_primary(self, request: Request) -> bool:
+        if READ_YOUR_WRITES_HEADER in request.headers:
+            return True
+        try:
+            written_at = float(request.cookies[WRITTEN_AT_COOKIE])
+        except (KeyError, ValueError):
+            return False
+        return time.time() - written_at < self._replica_lag
+
+    async def __call__(self, request: Request) -> AsyncIterator[None]:
+        read_only = is_read_only(request.scope)
+        isolation_level = "REPEATABLE READ" if read_only else None
+        reads = (
+            read_your_writes()
+            if read_only and self._reads_primary(request)
+            else nullcontext()
+        )
+        with reads:
+            async with self._db.unit_of_work(isolation_level, read_only):
+                yield
+
+
+class ReadYourWrites:
+    """
+    ASGI middleware that sets a mentha-written-at cookie on the responses of
+    successful requests that may have written, holding the time they committed.
+    RequestUnitOfWork sends the client's reads to the primary until replicas have
+    had replica_lag seconds to catch up, so clients read their own writes whichever
+    worker serves them. Clients that don't keep cookies can send an
+    X-Read-Your-Writes header instead.
+    """
+
+    def __init__(self, app: ASGIApp, replica_lag: float = 5.0) -> None:
+        self._app = app
+        self._replica_lag = replica_lag
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+
+        async def _send(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and "route" in scope
+                and not is_read_only(scope)
+            ):
+                # The request's unit of work has committed by the time it responds:
+                cookie = Response()
+                cookie.set_cookie(
+                    WRITTEN_AT_COOKIE,
+                    f"{time.time():.3f}",
+                    max_age=ceil(self._replica_lag),
+                    httponly=True,
+                    samesite="lax",
+                )
+                headers = [
+                    header
+                    for header in cookie.raw_headers
+                    if header[0] == b"set-cookie"
+                ]
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self._app(scope, receive, _send)
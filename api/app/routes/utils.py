@@ -1,22 +1,26 @@
 import re
+from calendar import monthrange
 from datetime import date, datetime, timedelta
-from typing import Any, Callable, Iterable, Optional, TypeVar, cast, overload
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+    overload,
+)
 from uuid import UUID
 
 from dateutil.relativedelta import relativedelta
 from fastapi import Query
 
 from app.constants import DT_FORMAT
-from app.domain.category import (
-    SYSTEM_CATEGORIES,
-    Category,
-    PrimaryCategory,
-    Subcategory,
-)
+from app.domain.category import Category, PrimaryCategory, Subcategory
 from app.domain.core import FilterModel
 from app.domain.transaction import Transaction
 from app.domain.trend import CategorySpendingByMonth, NetIncomeByMonth, TrendByMonth
-from app.storage.db import IsIn, MenthaTable
 
 TrendByMonthT = TypeVar("TrendByMonthT", bound=TrendByMonth)
 CategoryT = TypeVar("CategoryT", UUID, Category)
@@ -24,6 +28,17 @@ CategoryT = TypeVar("CategoryT", UUID, Category)
 DateQueryParam = Query(description="Date in YYYY-MM-DD format.")
 
 
+def _accumulate_budget(
+    base_amt: float, period: int, month_diff: int
+) -> tuple[float, float]:
+    this_month = base_amt / period
+    total_periods = (month_diff % period) if month_diff > period else month_diff
+    total = this_month * (total_periods + 1)
+    if total == base_amt:
+        this_month = total
+    return this_month, total
+
+
 def assemble_primary_categories(raw: list[Category]) -> list[PrimaryCategory]:
     primaries = list[Category]()
     subcategories = dict[UUID, list[Subcategory]]()
@@ -74,22 +89,88 @@ def calculate_accumulated_budget(
         specified by the compare_date
     """
     if period == 1:
-        this_month = base_amt
-        total = base_amt
-    else:
-        this_month = base_amt / period
-        month_diff = relativedelta(compare_date, create_date).months
-        total_periods = (month_diff % period) if month_diff > period else month_diff
-        total = this_month * (total_periods + 1)
-        if total == base_amt:
-            this_month = total
-    return this_month, total
+        return base_amt, base_amt
+    month_diff = relativedelta(compare_date, create_date).months
+    return _accumulate_budget(base_amt, period, month_diff)
+
+
+def _month_diffs(
+    create_date: date,
+    compare_idxs: Sequence[int],
+    compare_days: Sequence[int],
+    compare_month_lens: Sequence[int],
+) -> list[int]:
+    """
+    Returns:
+        list[int]: relativedelta(compare_date, create_date).months for each compare
+        date, worked out from its month index (year * 12 + month), day and length
+        of its month, without building a relativedelta for each.
+    """
+    create_idx = create_date.year * 12 + create_date.month
+    diffs = list[int]()
+    for idx, day, month_len in zip(compare_idxs, compare_days, compare_month_lens):
+        diff = idx - create_idx
+        # relativedelta only counts a month once the day of the month is reached,
+        # with create days past the end of a month counting as its last day:
+        anniversary = min(create_date.day, month_len)
+        if diff > 0 and day < anniversary:
+            diff -= 1
+        elif diff < 0 and day > anniversary:
+            diff += 1
+        # And drops whole years:
+        diffs.append(diff % 12 if diff >= 0 else -(-diff % 12))
+    return diffs
+
+
+def calculate_accumulated_budgets(
+    base_amts: Sequence[float],
+    periods: Sequence[int],
+    create_dates: Sequence[date],
+    compare_dates: Sequence[date],
+) -> list[list[tuple[float, float]]]:
+    """
+    Runs calculate_accumulated_budget for every combination of Budget and
+    compare_date at once. Month differences are computed with integer arithmetic,
+    once for each distinct createDate, rather than a relativedelta per
+    combination.
+
+    Args:
+        base_amts (Sequence[float]): The amount specified in each Budget.
+        periods (Sequence[int]): Each Budget's period.
+        create_dates (Sequence[date]): Each Budget's createDate.
+        compare_dates (Sequence[date]): The dates to compare against each
+            Budget's createDate.
+
+    Returns:
+        list[list[tuple[float, float]]]: For each Budget, the result of
+        calculate_accumulated_budget for each compare_date, in the order passed.
+    """
+    compare_idxs = [dt.year * 12 + dt.month for dt in compare_dates]
+    compare_days = [dt.day for dt in compare_dates]
+    month_lens = [monthrange(dt.year, dt.month)[1] for dt in compare_dates]
+    diffs_by_create_date = dict[date, list[int]]()
+    result = list[list[tuple[float, float]]]()
+    for base_amt, period, create_date in zip(base_amts, periods, create_dates):
+        if period == 1:
+            result.append([(base_amt, base_amt)] * len(compare_dates))
+            continue
+        diffs = diffs_by_create_date.get(create_date)
+        if diffs is None:
+            diffs = diffs_by_create_date[create_date] = _month_diffs(
+                create_date, compare_idxs, compare_days, month_lens
+            )
+        result.append([_accumulate_budget(base_amt, period, d) for d in diffs])
+    return result
 
 
 @overload
-def date_to_datetime(dt: date, ceil_time: bool = False) -> datetime: ...
+def date_to_datetime(dt: date, ceil_time: bool = False) -> datetime:
+    ...
+
+
 @overload
-def date_to_datetime(dt: None, ceil_time: bool = False) -> None: ...
+def date_to_datetime(dt: None, ceil_time: bool = False) -> None:
+    ...
 
 
 def date_to_datetime(dt: date | None, ceil_time: bool = False) -> datetime | None:
@@ -185,16 +266,6 @@ def gen_month_range(year: int, month: int) -> tuple[datetime, datetime]:
     return month_start, month_end
 
 
-async def get_categories_by_id(
-    category_table: MenthaTable[Category], ids: Iterable[UUID] | None = None
-) -> dict[UUID, Category]:
-    kwargs = dict[str, Any]()
-    if ids:
-        kwargs = {"id": IsIn([id for id in ids])}
-    cat_result = await category_table.page_through_query_async([], **kwargs)
-    return {cat.id: cat for cat in [*cat_result, *SYSTEM_CATEGORIES]}
-
-
 def get_next_month(dt: datetime) -> datetime:
     """
     Args:
@@ -0,0 +1,91 @@
+"""
+Accumulates the time a request spends in each phase of handling it, like db
+queries, row decoding, transforms and serialization, for the Server-Timing
+header the ServerTiming middleware adds to its response.
+
+Phases are only timed in requests the middleware handles, so timed() costs next
+to nothing when it isn't installed.
+"""
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, nullcontext
+from contextvars import ContextVar, Token
+from time import perf_counter
+from types import TracebackType
+
+# Seconds spent and times entered, by phase:
+Timings = dict[str, list[float]]
+
+_timings: ContextVar[Timings | None] = ContextVar("server_timings", default=None)
+
+_NOT_TIMED = nullcontext()
+
+
+class _Timed:
+    __slots__ = ("_timings", "_phase", "_start")
+
+    def __init__(self, timings: Timings, phase: str) -> None:
+        self._timings = timings
+        self._phase = phase
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        elapsed = perf_counter() - self._start
+        entry = self._timings.get(self._phase)
+        if entry is None:
+            self._timings[self._phase] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+
+
+def timed(phase: str) -> AbstractContextManager[None]:
+    """
+    Adds the time the block takes to the passed phase of the current request.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return _NOT_TIMED
+    return _Timed(timings, phase)
+
+
+def start() -> tuple[Timings, Token[Timings | None]]:
+    """
+    Starts accumulating timings for the current context.
+
+    Returns:
+        tuple[Timings, Token[Timings | None]]: The timings, and a token to stop
+        accumulating them with, by resetting the contextvar.
+    """
+    timings: Timings = {}
+    return timings, _timings.set(timings)
+
+
+def stop(token: Token[Timings | None]) -> None:
+    _timings.reset(token)
+
+
+def format_header(timings: Timings, total: float | None = None) -> str:
+    """
+    Returns:
+        str: The timings as a Server-Timing header value, in milliseconds, with
+        the number of times a phase was entered as its description when it's more
+        than once.
+    """
+    metrics = list[str]()
+    for phase, (seconds, count) in timings.items():
+        metric = f"{phase};dur={seconds * 1000:.3f}"
+        if count > 1:
+            metric += f';desc="{int(count)} calls"'
+        metrics.append(metric)
+    if total is not None:
+        metrics.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(metrics)
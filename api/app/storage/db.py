@@ -1,33 +1,94 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass, replace
+import asyncio
+import contextvars
+import functools
 import logging
 import re
+import threading
 from abc import ABC, abstractmethod
-from time import sleep
-from typing import Any, Generic, Literal, Sequence
+from time import perf_counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Generic,
+    Literal,
+    Mapping,
+    Sequence,
+    TypeVar,
+    cast,
+)
 from uuid import UUID
 
 import sqlalchemy as sa
 import sqlalchemy.ext.asyncio as sasync
 
 # These are imported separately to ease autocompletion of certain function overrides:
-from sqlalchemy import Column, CursorResult, Delete, MetaData, Select, Table, Update
-from sqlalchemy.engine import Engine
+from sqlalchemy import Column, CursorResult, Select, Table, Update
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.ext.asyncio import AsyncEngine
-
-from app.domain.account import ACCOUNT_TABLE, Account
-from app.domain.budget import BUDGET_TABLE, Budget
-from app.domain.category import CATEGORY_TABLE, Category
-from app.domain.core import DomainModelT, FilterModel, PagedResultsModel, SortModel
-from app.domain.institution import INSTITUTION_TABLE, Institution
-from app.domain.rule import RULE_TABLE, Rule
-from app.domain.transaction import TRANSACTION_TABLE, Transaction
-from app.storage import utils
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.sql.dml import ReturningDelete
+
+from app.domain.account import Account
+from app.domain.budget import Budget
+from app.domain.category import SYSTEM_CATEGORIES, Category
+from app.domain.core import (
+    DomainModel,
+    DomainModelT,
+    DomainModelT2,
+    FilterModel,
+    PagedResultsModel,
+    SortModel,
+)
+from app.domain.institution import Institution
+from app.domain.rule import Rule
+from app.domain.transaction import Transaction
+from app import server_timing, tracing
+from app.metrics import Histogram
+from app.storage import pool, query_count, schema, utils
+from app.storage.replicas import ReplicaSet
+from app.storage.slow_queries import SlowQueryLog, SlowQueryLogConfig
+from app.storage.unit_of_work import UnitOfWork, current_unit_of_work, unit_of_work
+from app.storage.versions import DataVersions
 
 MENTHA_DBNAME = "mentha-db"
 
+T = TypeVar("T")
+AsyncMethodT = TypeVar("AsyncMethodT", bound=Callable[..., Awaitable[Any]])
+# The models a query returns, which are expanded models for joined queries:
+ResultModelT = TypeVar("ResultModelT", bound=DomainModel)
+
+DB_OPERATION_SECONDS = Histogram(
+    "mentha_db_operation_seconds",
+    "Time taken by MenthaTable operations, by table and method.",
+    ["table", "method"],
+)
+
+_runners = threading.local()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Runs a coroutine to completion from sync code, like scripts and tests, on an
+    event loop kept for the calling thread. Reusing the loop lets pooled asyncpg
+    connections, which are bound to the loop that opened them, be reused too.
+
+    Raises:
+        RuntimeError: If called while an event loop is running in this thread, where
+            the coroutine should be awaited instead.
+    """
+    runner: asyncio.Runner | None = getattr(_runners, "runner", None)
+    if runner is None:
+        runner = _runners.runner = asyncio.Runner()
+    # Runs in a copy of the caller's context, so context managers like
+    # read_your_writes still apply:
+    return runner.run(coro, context=contextvars.copy_context())
+
 
 @dataclass
 class MenthaDBConfig:
@@ -35,6 +96,9 @@ class MenthaDBConfig:
     pwd: str
     host: str
     dbname: str = MENTHA_DBNAME
+    # Hosts of read replicas of the db at host, which async reads are spread
+    # across:
+    replica_hosts: tuple[str, ...] = ()
 
 
 @dataclass
@@ -42,6 +106,8 @@ class MenthaDBAsyncConfig:
     timeout_async: int = 30
     pool_size_async: int = 5
     max_overflow_async: int = 10
+    # Prepared statements asyncpg keeps per pooled connection:
+    statement_cache_size_async: int = 500
 
 
 class MenthaDB:
@@ -50,73 +116,100 @@ class MenthaDB:
         config: MenthaDBConfig,
         async_config: MenthaDBAsyncConfig | None = None,
         conn_attempts: int = 10,
+        slow_query_log: SlowQueryLogConfig | None = None,
     ) -> None:
         self._url = self.construct_db_url(config)
-        self._metadata = MetaData()
-        self._engine = sa.create_engine(self._url)
-        self._engine_async = sasync.create_async_engine(
-            self.construct_db_url(config, "async"),
-            # max_overflow=max_overflow_async,
-            # pool_size=pool_size_async,
-            # pool_timeout=timeout_async,
-            poolclass=sa.pool.NullPool,
+        self._engine_async = self._create_async_engine(config, async_config)
+        self._replicas = ReplicaSet(
+            self._engine_async,
+            [
+                self._create_async_engine(replace(config, host=host), async_config)
+                for host in config.replica_hosts
+            ],
         )
-        for i in range(conn_attempts):
-            try:
-                with self._engine.connect() as conn:
-                    conn.execute(sa.text("select 1"))
-                break
-            except OperationalError as e:
-                if i == conn_attempts - 1:
-                    msg = "Failed to connect to db."
-                    m = re.search(r"://.*?:(.*?)@", self._url)
-                    if m:
-                        start, end = m.span(1)
-                        clean_url = self._url[:start] + "*****" + self._url[end:]
-                        msg = f"Failed to connect to {clean_url}."
-                    raise TimeoutError(f"{msg} Error = {e}.")
-                if e.code != "e3q8":
-                    raise e
-                logging.info("Waiting for DB connection...")
-                sleep(1)
+        self._versions = DataVersions(self._replicas)
+        self._slow_query_log: SlowQueryLog | None = None
+        if slow_query_log is not None:
+            self._slow_query_log = SlowQueryLog(slow_query_log)
+            for engine in self._replicas.engines:
+                self._slow_query_log.attach(engine)
+        self._conn_attempts = conn_attempts
         self._accounts = self._setup_table(
             domain_model=Account[UUID],
-            table=ACCOUNT_TABLE,
+            table=schema.accounts,
         )
         self._budgets = self._setup_table(
             domain_model=Budget[UUID],
-            table=BUDGET_TABLE,
+            table=schema.budgets,
         )
         self._categories = self._setup_table(
             domain_model=Category,
-            table=CATEGORY_TABLE,
+            table=schema.categories,
         )
         self._institutions = self._setup_table(
             domain_model=Institution,
-            table=INSTITUTION_TABLE,
+            table=schema.institutions,
         )
         self._rules = self._setup_table(
             domain_model=Rule[UUID],
-            table=RULE_TABLE,
+            table=schema.rules,
         )
         self._transactions = self._setup_table(
             domain_model=Transaction[UUID],
-            table=TRANSACTION_TABLE,
+            table=schema.transactions,
+        )
+        # System categories aren't stored in the categories table, so they're
+        # unioned in as constant rows wherever a category is joined:
+        self._accounts.add_relationship("institution", self._institutions)
+        self._rules.add_relationship(
+            "result_category", self._categories, constants=SYSTEM_CATEGORIES
+        )
+        self._transactions.add_relationship(
+            "category", self._categories, constants=SYSTEM_CATEGORIES
         )
 
     def _setup_table(
         self,
         domain_model: type[DomainModelT],
-        table: str,
+        table: Table,
     ) -> MenthaTable[DomainModelT]:
         return MenthaTable(
             domain_model=domain_model,
             table=table,
-            metadata=self._metadata,
-            engine=self._engine,
-            async_engine=self._engine_async,
+            engine=self._engine_async,
+            versions=self._versions,
+            replicas=self._replicas,
         )
 
+    @classmethod
+    def _create_async_engine(
+        cls, config: MenthaDBConfig, async_config: MenthaDBAsyncConfig | None
+    ) -> AsyncEngine:
+        url = cls.construct_db_url(config, "async")
+        if async_config is None:
+            # asyncpg connections are bound to the event loop that opened them, so
+            # only callers running a single loop (like the app) should pool them:
+            engine = sasync.create_async_engine(url, poolclass=sa.pool.NullPool)
+        else:
+            # Pooled connections keep their prepared statements, so repeat queries
+            # skip parsing and planning:
+            engine = sasync.create_async_engine(
+                sa.make_url(url).update_query_dict(
+                    {
+                        "prepared_statement_cache_size": str(
+                            async_config.statement_cache_size_async
+                        )
+                    }
+                ),
+                pool_size=async_config.pool_size_async,
+                max_overflow=async_config.max_overflow_async,
+                pool_timeout=async_config.timeout_async,
+            )
+        pool.instrument_pool(engine)
+        query_count.instrument_engine(engine)
+        _trace_statements(engine)
+        return engine
+
     @staticmethod
     def construct_db_url(
         config: MenthaDBConfig,
@@ -129,16 +222,66 @@ class MenthaDB:
         dbname = config.dbname
         return f"postgresql+{driver}://{user}:{pwd}@{host}/{dbname}"
 
+    async def wait_until_ready_async(self) -> None:
+        """
+        Waits for the primary db to accept connections, retrying once a second up
+        to the conn_attempts passed to MenthaDB.
+
+        Raises:
+            TimeoutError: If the db still can't be connected to after the last
+                attempt.
+        """
+        for i in range(self._conn_attempts):
+            try:
+                async with self._engine_async.connect() as conn:
+                    await conn.execute(sa.text("select 1"))
+                return
+            except (OperationalError, OSError) as e:
+                if i == self._conn_attempts - 1:
+                    msg = "Failed to connect to db."
+                    m = re.search(r"://.*?:(.*?)@", self._url)
+                    if m:
+                        start, end = m.span(1)
+                        clean_url = self._url[:start] + "*****" + self._url[end:]
+                        msg = f"Failed to connect to {clean_url}."
+                    raise TimeoutError(f"{msg} Error = {e}.")
+                logging.info("Waiting for DB connection...")
+                await asyncio.sleep(1)
+
     def dispose(self) -> None:
-        self._engine.dispose()
+        run_sync(self.dispose_async())
 
     async def dispose_async(self) -> None:
-        await self._engine_async.dispose()
+        for engine in self._replicas.engines:
+            await engine.dispose()
+        if self._slow_query_log is not None:
+            self._slow_query_log.close()
+
+    def unit_of_work(
+        self, isolation_level: str | None = None, read_only: bool = False
+    ) -> AbstractAsyncContextManager[UnitOfWork]:
+        """
+        Args:
+            isolation_level (str | None, optional): The transaction isolation level.
+                Defaults to None, which uses the engine's.
+            read_only (bool, optional): Whether the unit of work will only read,
+                in which case it can run on a read replica. Defaults to False.
+
+        Returns:
+            AbstractAsyncContextManager[UnitOfWork]: A unit of work that every
+            MenthaTable async method uses while it's active.
+        """
+        engine = self._replicas.reader() if read_only else self._engine_async
+        return unit_of_work(engine, isolation_level)
 
     @property
     def url(self) -> str:
         return self._url
 
+    @property
+    def versions(self) -> DataVersions:
+        return self._versions
+
     @property
     def accounts(self) -> MenthaTable[Account[UUID]]:
         return self._accounts
@@ -166,7 +309,7 @@ class MenthaDB:
 
 class QueryOperation(ABC):
     def __init__(self, term: Any) -> None:
-        self.term = str(term) if isinstance(term, UUID) else term
+        self.term = term
 
     @abstractmethod
     def apply(self, select: Select[Any], column: Column[Any]) -> Select[Any]:
@@ -188,8 +331,6 @@ class SimpleOp(QueryOperation):
 
 class IsIn(QueryOperation):
     def __init__(self, term: Sequence[Any]) -> None:
-        if len(term) > 0 and isinstance(term[0], UUID):
-            term = [str(uuid) for uuid in term]
         unique_terms = {*term}
         super().__init__(unique_terms)
 
@@ -218,35 +359,225 @@ class Like(QueryOperation):
         return select.where(column.ilike(self.term))
 
 
+UpdateStatus = Literal["updated", "unchanged", "notFound", "conflict"]
+
+
+@dataclass
+class ConditionalUpdate(Generic[DomainModelT]):
+    """
+    The outcome of MenthaTable.update_if_changed_async. record is the record as
+    stored after the update, or None if it wasn't found.
+    """
+
+    status: UpdateStatus
+    record: DomainModelT | None
+
+
+@dataclass
+class BulkWriteResult:
+    inserted: list[UUID]
+    updated: list[UUID]
+    unchanged: list[UUID]
+    deleted: list[UUID]
+
+
+@dataclass
+class Relationship:
+    """
+    A foreign key style link from a column on one MenthaTable to the primary key
+    of another, used to load expanded models in a single JOINed query.
+    """
+
+    field: str
+    table: MenthaTable[Any]
+    constants: Sequence[DomainModel] = ()
+
+
+# Separates the relationship field from the column name in the labels of joined
+# columns (e.g. category__parent_category):
+REL_SEP = "__"
+# Prefixes the columns returned by conditional updates:
+UPDATED_PREFIX = f"updated{REL_SEP}"
+# Binds the id in the prebuilt get statement:
+GET_ID_PARAM = "get_id"
+# Binds each record's id in bulk updates, which can't reuse the column's own name:
+BULK_PK_PARAM = "_pk"
+
+
+def _instrumented(method: AsyncMethodT) -> AsyncMethodT:
+    # Records a MenthaTable method's latency under its name without _async, and
+    # runs it in a span:
+    name = method.__name__.removesuffix("_async")
+
+    @functools.wraps(method)
+    async def wrapper(self: MenthaTable[Any], *args: Any, **kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            with tracing.span(
+                f"MenthaTable.{name}",
+                attributes={"db.collection.name": self._table_name},
+            ) as span:
+                result = await method(self, *args, **kwargs)
+                if isinstance(result, PagedResultsModel):
+                    span.set_attribute("db.response.returned_rows", result.hitCount)
+                elif isinstance(result, list):
+                    span.set_attribute("db.response.returned_rows", len(result))
+                return result
+        finally:
+            DB_OPERATION_SECONDS.labels(self._table_name, name).observe(
+                perf_counter() - start
+            )
+
+    return cast(AsyncMethodT, wrapper)
+
+
+_STATEMENT_SPAN = "mentha_statement_span"
+
+
+def _trace_statements(engine: AsyncEngine) -> None:
+    # Runs each statement executed on the engine in a span of its own, with its
+    # SQL, which has placeholders in place of any parameter values:
+    def _before(conn: sa.Connection, cursor: Any, statement: str, *_: Any) -> None:
+        span = tracing.start_span(
+            "db.execute",
+            kind="client",
+            attributes={"db.system": "postgresql", "db.query.text": statement},
+        )
+        conn.info[_STATEMENT_SPAN] = span
+
+    def _after(conn: sa.Connection, cursor: Any, *_: Any) -> None:
+        span = conn.info.pop(_STATEMENT_SPAN, None)
+        if span is not None:
+            if cursor.rowcount >= 0:
+                span.set_attribute("db.response.returned_rows", cursor.rowcount)
+            span.end()
+
+    def _error(context: sa.engine.ExceptionContext) -> None:
+        conn = context.connection
+        span = conn.info.pop(_STATEMENT_SPAN, None) if conn is not None else None
+        if span is not None:
+            span.record_exception(context.original_exception)
+            span.end()
+
+    sa.event.listen(engine.sync_engine, "before_cursor_execute", _before)
+    sa.event.listen(engine.sync_engine, "after_cursor_execute", _after)
+    sa.event.listen(engine.sync_engine, "handle_error", _error)
+
+
 class MenthaTable(Generic[DomainModelT]):
     def __init__(
         self,
         domain_model: type[DomainModelT],
-        table: str,
-        metadata: MetaData,
-        engine: Engine,
-        async_engine: AsyncEngine,
+        table: Table,
+        engine: AsyncEngine,
+        versions: DataVersions | None = None,
+        version_column: str | None = None,
+        replicas: ReplicaSet | None = None,
     ) -> None:
+        """
+        Every method is async, with a sync counterpart for scripts and tests that
+        runs it to completion, so both share the same engine and code path.
+
+        Args:
+            table (Table): The table's definition. Columns holding UUIDs should be
+                schema.UUIDString, which binds them as strings.
+            replicas (ReplicaSet | None, optional): Engines to route async reads
+                to. Defaults to None, which reads from engine.
+            version_column (str | None, optional): An integer column used for
+                optimistic concurrency by update_if_changed_async, which only
+                updates records whose stored version matches the passed model's
+                and increments it. Defaults to None.
+        """
         self._domain = domain_model
-        self._table_name = table
+        self._table_name = table.name
         self._engine = engine
-        self._async_engine = async_engine
-        self._table = self._reflect_table(table, metadata, engine)
+        self._replicas = replicas or ReplicaSet(engine)
+        self._versions = versions or DataVersions(self._replicas)
+        self._table = table
+        self._relationships = dict[str, Relationship]()
 
         self._pk = "id"
+        # Statements that don't vary by call are built once. SQLAlchemy already
+        # caches the compiled SQL of every statement by its shape, but this also
+        # skips rebuilding them:
+        self._get_stmt = sa.select(self._table).where(
+            self._table.c[self._pk] == sa.bindparam(GET_ID_PARAM)
+        )
+        self._count_stmt = sa.select(sa.func.count(self._table.c[self._pk]))
+        self._joined_stmt: Select[Any] | None = None
+        self._version_col = (
+            utils.apply_snake_case(version_column) if version_column else None
+        )
 
     @property
     def tablename(self) -> str:
         return self._table_name
 
+    @property
+    def table(self) -> Table:
+        return self._table
+
     def dump_model(self, model: DomainModelT) -> dict[str, Any]:
         return utils.apply_snake_case(self._domain.model_dump(model))
 
-    def load_row(self, row: sa.RowMapping) -> DomainModelT:
+    def load_row(self, row: Mapping[str, Any] | sa.RowMapping) -> DomainModelT:
         return self._domain.model_validate(utils.apply_camelcase(dict(row)))
 
-    def _gen_get_stmt(self, id: UUID) -> Select[Any]:
-        return sa.select(self._table).where(self._table.c[self._pk] == str(id))
+    def _load_rows(self, result: CursorResult[Any]) -> list[DomainModelT]:
+        with tracing.span("MenthaTable.load_rows") as span, server_timing.timed(
+            "load-row"
+        ):
+            rows = [self.load_row(row) for row in result.mappings()]
+            span.set_attribute("rows", len(rows))
+        return rows
+
+    def add_relationship(
+        self,
+        field: str,
+        table: MenthaTable[Any],
+        constants: Sequence[DomainModel] = (),
+    ) -> None:
+        """
+        Declares that the passed field on this table references the primary key
+        of another table. Declared relationships are expanded by query_joined_async.
+
+        Args:
+            field (str): The field on this table holding the foreign id.
+            table (MenthaTable[Any]): The table the id belongs to.
+            constants (Sequence[DomainModel], optional): Models that aren't stored
+                in the related table but should be joinable as if they were, like
+                the system categories. Defaults to ().
+        """
+        field = utils.apply_snake_case(field)
+        self._relationships[field] = Relationship(field, table, constants)
+        self._joined_stmt = None
+
+    def selectable(self, constants: Sequence[DomainModel] = ()) -> sa.FromClause:
+        """
+        Args:
+            constants (Sequence[DomainModel], optional): Models to union into the
+                table's rows. Defaults to ().
+
+        Returns:
+            sa.FromClause: The table itself, or a subquery of the table unioned with
+            the passed constant models.
+        """
+        if not constants:
+            return self._table
+        const_selects = list[Select[Any]]()
+        for model in constants:
+            row = self.dump_model(model)  # type: ignore[arg-type]
+            const_selects.append(
+                sa.select(
+                    *[
+                        sa.literal(row[c.name], c.type).label(c.name)
+                        for c in self._table.c
+                    ]
+                )
+            )
+        return sa.union_all(sa.select(self._table), *const_selects).subquery(
+            self._table_name
+        )
 
     def _return_get_result(self, result: CursorResult[Any]) -> DomainModelT | None:
         row = result.mappings().one_or_none()
@@ -256,75 +587,247 @@ class MenthaTable(Generic[DomainModelT]):
             return None
 
     def get(self, id: UUID) -> DomainModelT | None:
-        get_stmt = self._gen_get_stmt(id)
-        with self._engine.connect() as conn:
-            result = conn.execute(get_stmt)
-
-        return self._return_get_result(result)
+        return run_sync(self.get_async(id))
 
+    @_instrumented
     async def get_async(self, id: UUID) -> DomainModelT | None:
-        get_stmt = self._gen_get_stmt(id)
-        async with self._async_engine.connect() as conn:
-            result = await conn.execute(get_stmt)
+        async with self._connect_async() as conn:
+            with server_timing.timed("db-lookup"):
+                result = await conn.execute(self._get_stmt, {GET_ID_PARAM: id})
 
         return self._return_get_result(result)
 
+    @asynccontextmanager
+    async def _connect_async(
+        self, write: bool = False
+    ) -> AsyncIterator[AsyncConnection]:
+        """
+        Yields the current unit of work's connection if there is one, otherwise a
+        new connection: to the primary that commits when the block exits if write
+        is True, or else to whichever db the next read is routed to.
+        """
+        uow = current_unit_of_work()
+        if uow is not None:
+            yield await uow.connection()
+            return
+        engine = self._engine if write else self._replicas.reader()
+        conn = await pool.connect(engine)
+        try:
+            if write:
+                async with conn.begin():
+                    yield conn
+            else:
+                yield conn
+        finally:
+            await conn.close()
+
+    async def _bump_versions(
+        self, conn: AsyncConnection, *models: DomainModelT
+    ) -> None:
+        # Bumped in the write's transaction, so the new version is only visible
+        # along with the data it describes:
+        if "owner" not in self._table.c:
+            await self._versions.bump_async(conn)
+        elif models:
+            await self._versions.bump_async(
+                conn, [getattr(model, "owner") for model in models]
+            )
+
     def insert(self, *models: DomainModelT) -> None:
-        rows = [self.dump_model(model) for model in models]
-        with self._engine.begin() as conn:
-            conn.execute(self._table.insert().values(rows))
+        run_sync(self.insert_async(*models))
 
+    @_instrumented
     async def insert_async(self, *models: DomainModelT) -> None:
         rows = [self.dump_model(model) for model in models]
+        async with self._connect_async(write=True) as conn:
+            with server_timing.timed("db-write"):
+                await conn.execute(self._table.insert().values(rows))
+            await self._bump_versions(conn, *models)
 
-        # AsyncEngine doesn't convert UUIDs to strings like Engine does:
-        for row in rows:
-            for k, v in row.items():
-                if isinstance(v, UUID):
-                    row[k] = str(v)
-
-        async with self._async_engine.begin() as conn:
-            await conn.execute(self._table.insert().values(rows))
-
-    def _gen_update_stmt(self, model: DomainModelT, sanitize: bool = False) -> Update:
+    def _gen_update_stmt(self, model: DomainModelT) -> Update:
         row = self.dump_model(model)
         id = row.pop(self._pk)
-        if sanitize:
-            # AsyncEngine doesn't convert UUIDs to strings like Engine does:
-            for k, v in row.items():
-                if isinstance(v, UUID):
-                    row[k] = str(v)
-        update = (
-            self._table.update().where(self._table.c[self._pk] == str(id)).values(**row)
-        )
+        update = self._table.update().where(self._table.c[self._pk] == id).values(**row)
         return update
 
     def update(self, model: DomainModelT) -> None:
-        update_stmt = self._gen_update_stmt(model)
-        with self._engine.begin() as conn:
-            conn.execute(update_stmt)
+        run_sync(self.update_async(model))
 
+    @_instrumented
     async def update_async(self, model: DomainModelT) -> None:
-        update_stmt = self._gen_update_stmt(model, sanitize=True)
-        async with self._async_engine.begin() as conn:
-            await conn.execute(update_stmt)
-
-    def _gen_delete_stmt(self, id: UUID) -> Delete:
-        return sa.delete(self._table).where(self._table.c[self._pk] == str(id))
-
-    def delete(self, id: UUID) -> None:
-        current = self.get(id)
-        if current:
-            delete_stmt = self._gen_delete_stmt(id)
-            with self._engine.begin() as conn:
-                conn.execute(delete_stmt)
-
-    async def delete_async(self, id: UUID) -> None:
-        current = await self.get_async(id)
-        if current:
-            delete_stmt = self._gen_delete_stmt(id)
-            async with self._async_engine.begin() as conn:
-                await conn.execute(delete_stmt)
+        update_stmt = self._gen_update_stmt(model)
+        async with self._connect_async(write=True) as conn:
+            with server_timing.timed("db-write"):
+                await conn.execute(update_stmt)
+            await self._bump_versions(conn, model)
+
+    def _gen_conditional_update_stmt(self, model: DomainModelT) -> Select[Any]:
+        t = self._table
+        row = self.dump_model(model)
+        id = row.pop(self._pk)
+        where = [t.c[self._pk] == id]
+        values: dict[str, Any] = dict(row)
+        if self._version_col:
+            where.append(t.c[self._version_col] == row.pop(self._version_col))
+            values[self._version_col] = t.c[self._version_col] + 1
+        where.append(sa.or_(*[t.c[k].is_distinct_from(v) for k, v in row.items()]))
+        updated = (
+            t.update().where(*where).values(**values).returning(*t.c).cte("updated")
+        )
+        # Every statement in the query sees the table as it was before the
+        # update, so selecting from it still finds unchanged records:
+        return (
+            sa.select(t, *[c.label(f"{UPDATED_PREFIX}{c.name}") for c in updated.c])
+            .select_from(t.outerjoin(updated, updated.c[self._pk] == t.c[self._pk]))
+            .where(t.c[self._pk] == id)
+        )
+
+    @_instrumented
+    async def update_if_changed_async(
+        self, model: DomainModelT
+    ) -> ConditionalUpdate[DomainModelT]:
+        """
+        Updates the record with the passed model's id in a single statement, but
+        only if at least one of its columns differs from the model, so no-op
+        updates don't write anything.
+
+        If the table has a version_column, the record is also only updated if its
+        stored version matches the model's, and its version is incremented.
+
+        Args:
+            model (DomainModelT): The model to update the record to.
+
+        Returns:
+            ConditionalUpdate[DomainModelT]: Whether the record was updated, was
+            unchanged, wasn't found or (with a version_column) had a different
+            version, along with the record as now stored.
+        """
+        stmt = self._gen_conditional_update_stmt(model)
+        async with self._connect_async(write=True) as conn:
+            with server_timing.timed("db-write"):
+                result = await conn.execute(stmt)
+            row = result.mappings().one_or_none()
+            if row is None:
+                return ConditionalUpdate("notFound", None)
+            current = self.load_row({c.name: row[c.name] for c in self._table.c})
+            if row[f"{UPDATED_PREFIX}{self._pk}"] is not None:
+                updated = self.load_row(
+                    {c.name: row[f"{UPDATED_PREFIX}{c.name}"] for c in self._table.c}
+                )
+                # Updates that moved a record to another owner change both owners'
+                # data:
+                await self._bump_versions(conn, current, updated)
+                return ConditionalUpdate("updated", updated)
+        version_col = self._version_col
+        if version_col and row[version_col] != self.dump_model(model)[version_col]:
+            return ConditionalUpdate("conflict", current)
+        return ConditionalUpdate("unchanged", current)
+
+    def _gen_delete_stmt(self, *ids: UUID) -> ReturningDelete[Any]:
+        return (
+            sa.delete(self._table)
+            .where(self._table.c[self._pk].in_(ids))
+            .returning(*self._table.c)
+        )
+
+    def delete(self, id: UUID) -> DomainModelT | None:
+        return run_sync(self.delete_async(id))
+
+    @_instrumented
+    async def delete_async(self, id: UUID) -> DomainModelT | None:
+        """
+        Args:
+            id (UUID): The id of the record to delete.
+
+        Returns:
+            DomainModelT | None: The deleted record, or None if there was no record
+            with the passed id.
+        """
+        delete_stmt = self._gen_delete_stmt(id)
+        async with self._connect_async(write=True) as conn:
+            with server_timing.timed("db-write"):
+                result = await conn.execute(delete_stmt)
+            deleted = self._return_get_result(result)
+            if deleted:
+                await self._bump_versions(conn, deleted)
+        return deleted
+
+    @_instrumented
+    async def bulk_write_async(
+        self,
+        inserts: Sequence[DomainModelT] = (),
+        updates: Sequence[DomainModelT] = (),
+        deletes: Sequence[UUID] = (),
+    ) -> BulkWriteResult:
+        """
+        Inserts, updates and deletes records in a single db transaction, so either
+        every write is made or none are. Inserts and updates are each sent as one
+        executemany, and deletes as one DELETE ... RETURNING.
+
+        Args:
+            inserts (Sequence[DomainModelT], optional): New records to insert.
+                Defaults to ().
+            updates (Sequence[DomainModelT], optional): Records to update by id.
+                Records that don't exist or haven't changed are skipped. Defaults
+                to ().
+            deletes (Sequence[UUID], optional): Ids of records to delete. Defaults
+                to ().
+
+        Returns:
+            BulkWriteResult: The ids of the records that were actually written.
+        """
+        async with self._connect_async(write=True) as conn:
+            current = dict[UUID, DomainModelT]()
+            if updates:
+                # Locks the records until the transaction ends, so a concurrent write
+                # can't land between reading them and updating them. They're locked
+                # in id order, so concurrent bulk writes can't deadlock:
+                pk = self._table.c[self._pk]
+                lookup = (
+                    sa.select(self._table)
+                    .where(pk.in_([m.id for m in updates]))
+                    .order_by(pk)
+                    .with_for_update()
+                )
+                with server_timing.timed("db-lookup"):
+                    current_result = await conn.execute(lookup)
+                for current_row in current_result.mappings():
+                    model = self.load_row(current_row)
+                    current[model.id] = model
+            changed = [m for m in updates if m.id in current and current[m.id] != m]
+
+            if inserts:
+                rows = [self.dump_model(m) for m in inserts]
+                with server_timing.timed("db-write"):
+                    await conn.execute(self._table.insert(), rows)
+            if changed:
+                rows = list[dict[str, Any]]()
+                for model in changed:
+                    row = self.dump_model(model)
+                    row[BULK_PK_PARAM] = row.pop(self._pk)
+                    rows.append(row)
+                update_stmt = self._table.update().where(
+                    self._table.c[self._pk] == sa.bindparam(BULK_PK_PARAM)
+                )
+                with server_timing.timed("db-write"):
+                    await conn.execute(update_stmt, rows)
+            deleted = list[DomainModelT]()
+            if deletes:
+                with server_timing.timed("db-write"):
+                    delete_result = await conn.execute(self._gen_delete_stmt(*deletes))
+                deleted = [self.load_row(row) for row in delete_result.mappings()]
+
+            # Updates that moved a record to another owner change both owners'
+            # data:
+            written = [*inserts, *changed, *[current[m.id] for m in changed], *deleted]
+            if written:
+                await self._bump_versions(conn, *written)
+        return BulkWriteResult(
+            inserted=[m.id for m in inserts],
+            updated=[m.id for m in changed],
+            unchanged=[m.id for m in updates if current.get(m.id) == m],
+            deleted=[m.id for m in deleted],
+        )
 
     def _apply_query_args(
         self,
@@ -341,7 +844,6 @@ class MenthaTable(Generic[DomainModelT]):
                 elif arg.op in SIMPLE_OPS:
                     q = SimpleOp(arg.term, arg.op).apply(q, self._table.c[field])
             else:
-                arg = str(arg) if isinstance(arg, UUID) else arg
                 q = q.where(self._table.c[field] == arg)
         return q
 
@@ -367,8 +869,9 @@ class MenthaTable(Generic[DomainModelT]):
         page_size: int | None,
         q_args: dict[str, QueryOperation | FilterModel | Any],
         sorts: list[str | SortModel] | list[SortModel] | list[str] | None = None,
+        base: Select[Any] | None = None,
     ) -> tuple[Select[Any], int | None]:
-        q = self._table.select()
+        q = self._table.select() if base is None else base
         q = self._apply_sorts(q, sorts)
         mod_pg_size = page_size
         if page_size:
@@ -383,8 +886,8 @@ class MenthaTable(Generic[DomainModelT]):
         total_hit_count: int,
         page: int,
         page_size: int | None,
-        result: list[DomainModelT],
-    ) -> PagedResultsModel[DomainModelT]:
+        result: list[ResultModelT],
+    ) -> PagedResultsModel[ResultModelT]:
         hasNext = False
         page_size = page_size if page_size is None else page_size - 1
         if page_size is not None:
@@ -417,18 +920,11 @@ class MenthaTable(Generic[DomainModelT]):
             list[DomainModelType]: The list of Domain Models matching your query,
             if any.
         """
-        q, page_size = self._generate_query(
-            page=page, page_size=page_size, q_args=query_args, sorts=sorts
+        return run_sync(
+            self.query_async(page=page, page_size=page_size, sorts=sorts, **query_args)
         )
-        count_q = self._generate_count_query(query_args)
-
-        with self._engine.connect() as conn:
-            count = conn.execute(count_q).scalar_one()
-            result = conn.execute(q)
-            rows = [self.load_row(row) for row in result.mappings()]
-
-        return self._postprocess_query_result(count, page, page_size, rows)
 
+    @_instrumented
     async def query_async(
         self,
         page: int = 1,
@@ -451,79 +947,195 @@ class MenthaTable(Generic[DomainModelT]):
         )
         count_q = self._generate_count_query(query_args)
 
-        async with self._async_engine.connect() as conn:
-            count_result = await conn.execute(count_q)
-            count = count_result.scalar_one()
-            result = await conn.execute(q)
-            rows = [self.load_row(row) for row in result.mappings()]
+        async with self._connect_async() as conn:
+            with server_timing.timed("db-count"):
+                count_result = await conn.execute(count_q)
+                count = count_result.scalar_one()
+            with server_timing.timed("db-page"):
+                result = await conn.execute(q)
+            rows = self._load_rows(result)
+
+        return self._postprocess_query_result(count, page, page_size, rows)
+
+    def _gen_joined_select(self) -> Select[Any]:
+        if self._joined_stmt is None:
+            self._joined_stmt = self._build_joined_select()
+        return self._joined_stmt
+
+    def _build_joined_select(self) -> Select[Any]:
+        q = sa.select(self._table)
+        from_clause: sa.FromClause = self._table
+        for field, rel in self._relationships.items():
+            related = rel.table.selectable(rel.constants).alias(f"rel_{field}")
+            from_clause = from_clause.outerjoin(
+                related, self._table.c[field] == related.c[rel.table._pk]
+            )
+            q = q.add_columns(
+                *[c.label(f"{field}{REL_SEP}{c.name}") for c in related.c]
+            )
+        return q.select_from(from_clause)
+
+    def _load_joined_row(
+        self, model: type[DomainModelT2], row: sa.RowMapping
+    ) -> DomainModelT2:
+        base = dict[str, Any]()
+        nested = {field: dict[str, Any]() for field in self._relationships}
+        for k, v in row.items():
+            field, sep, col = k.partition(REL_SEP)
+            if sep and field in nested:
+                nested[field][col] = v
+            else:
+                base[k] = v
+        for field, rel in self._relationships.items():
+            # A dangling id is left as-is and will fail model validation:
+            if nested[field][rel.table._pk] is not None:
+                base[field] = rel.table.load_row(nested[field])
+        return model.model_validate(utils.apply_camelcase(base))
+
+    @_instrumented
+    async def query_joined_async(
+        self,
+        expanded_model: type[DomainModelT2],
+        page: int = 1,
+        page_size: int | None = None,
+        sorts: list[str | SortModel] | list[SortModel] | list[str] | None = None,
+        **query_args: QueryOperation | Any,
+    ) -> PagedResultsModel[DomainModelT2]:
+        """
+        Works like query_async, but joins every declared relationship in the same
+        query and returns expanded_model, with each related id replaced by the
+        related model.
+
+        Args:
+            expanded_model (type[DomainModelT2]): The domain model to load each
+                joined row as, e.g. Transaction[Category].
+
+        Returns:
+            PagedResultsModel[DomainModelT2]: The paginated, expanded results.
+        """
+        q, page_size = self._generate_query(
+            page=page,
+            page_size=page_size,
+            q_args=query_args,
+            sorts=sorts,
+            base=self._gen_joined_select(),
+        )
+        count_q = self._generate_count_query(query_args)
+
+        async with self._connect_async() as conn:
+            with server_timing.timed("db-count"):
+                count_result = await conn.execute(count_q)
+                count = count_result.scalar_one()
+            with server_timing.timed("db-page"):
+                result = await conn.execute(q)
+            with tracing.span("MenthaTable.load_rows") as span, server_timing.timed(
+                "load-row"
+            ):
+                rows = [
+                    self._load_joined_row(expanded_model, row)
+                    for row in result.mappings()
+                ]
+                span.set_attribute("rows", len(rows))
 
         return self._postprocess_query_result(count, page, page_size, rows)
 
+    @_instrumented
+    async def select_async(self, stmt: Select[Any]) -> list[sa.RowMapping]:
+        """
+        Runs an arbitrary select statement, typically one built from this table's
+        .table for queries that don't fit query_async, like aggregates.
+
+        Args:
+            stmt (Select[Any]): The statement to execute.
+
+        Returns:
+            list[sa.RowMapping]: The raw rows returned by the statement.
+        """
+        async with self._connect_async() as conn:
+            with server_timing.timed("db-select"):
+                result = await conn.execute(stmt)
+                return list(result.mappings())
+
     def page_through_query(
         self,
         sorts: list[SortModel] | None = None,
         **query_args: QueryOperation | Any,
     ) -> list[DomainModelT]:
-        page = 1
-        result = list[DomainModelT]()
-        while True:
-            results = self.query(
-                page=page,
-                page_size=100,
-                sorts=sorts or [],
-                **query_args,
-            )
-            result += results.results
-            if not results.hasNext:
-                break
-            else:
-                page += 1
-        return result
+        return run_sync(self.page_through_query_async(sorts, **query_args))
 
+    @_instrumented
     async def page_through_query_async(
         self,
         sorts: list[SortModel] | None = None,
         **query_args: QueryOperation | Any,
     ) -> list[DomainModelT]:
-        page = 1
-        result = list[DomainModelT]()
-        while True:
-            results = await self.query_async(
-                page=page,
-                page_size=100,
-                sorts=sorts or [],
-                **query_args,
-            )
-            result += results.results
-            if not results.hasNext:
-                break
-            else:
-                page += 1
-        return result
+        # Every matching record is returned, so they're all read in one statement,
+        # rather than a count and a page per 100 records:
+        q, _ = self._generate_query(
+            page=1, page_size=None, q_args=query_args, sorts=sorts
+        )
+        async with self._connect_async() as conn:
+            with server_timing.timed("db-page"):
+                result = await conn.execute(q)
+            return self._load_rows(result)
+
+    def stream_async(
+        self,
+        sorts: list[str | SortModel] | list[SortModel] | list[str] | None = None,
+        batch_size: int = 500,
+        **query_args: QueryOperation | FilterModel | Any,
+    ) -> AsyncIterator[DomainModelT]:
+        """
+        Works like page_through_query_async, but yields records from a server-side
+        cursor as they're fetched, so memory use doesn't grow with the number of
+        matching records.
+
+        Streams are usually read after the unit of work they were made in has
+        closed, like those sent as StreamingResponses, so they read on a connection
+        of their own. It's to the db the unit of work (or else the next read) would
+        use when this is called, rather than when the stream is read, so it still
+        sees the writes the caller's reads would.
+
+        Args:
+            sorts (list[str | SortModel] | None, optional): Sorts to apply.
+                Defaults to None.
+            batch_size (int, optional): Number of rows fetched from the cursor at
+                a time. Defaults to 500.
+
+        Returns:
+            AsyncIterator[DomainModelT]: Each matching record.
+        """
+        q, _ = self._generate_query(
+            page=1, page_size=None, q_args=query_args, sorts=sorts
+        )
+        uow = current_unit_of_work()
+        engine = uow.engine if uow is not None else self._replicas.reader()
+        return self._stream_rows(engine, q.execution_options(yield_per=batch_size))
+
+    async def _stream_rows(
+        self, engine: AsyncEngine, q: Select[Any]
+    ) -> AsyncIterator[DomainModelT]:
+        conn = await pool.connect(engine)
+        try:
+            result = await conn.stream(q)
+            async for row in result.mappings():
+                yield self.load_row(row)
+        finally:
+            await conn.close()
 
     def _generate_count_query(
         self, query_args: dict[str, QueryOperation | Any]
     ) -> Select[Any]:
-        q = self._table.select()
-        q = q.with_only_columns(sa.func.count(self._table.columns[self._pk]))
-        q = self._apply_query_args(q, query_args)
-        return q
+        return self._apply_query_args(self._count_stmt, query_args)
 
     def count(self, **query_args: QueryOperation | Any) -> int:
-        q = self._generate_count_query(query_args)
-        with self._engine.connect() as conn:
-            result = conn.execute(q)
-
-        return result.scalar_one()
+        return run_sync(self.count_async(**query_args))
 
+    @_instrumented
     async def count_async(self, **query_args: QueryOperation | Any) -> int:
         q = self._generate_count_query(query_args)
-        async with self._async_engine.connect() as conn:
-            result = await conn.execute(q)
+        async with self._connect_async() as conn:
+            with server_timing.timed("db-count"):
+                result = await conn.execute(q)
 
         return result.scalar_one()
-
-    @staticmethod
-    def _reflect_table(table: str, metadata: MetaData, engine: Engine) -> Table:
-        tbl = Table(table, metadata, autoload_with=engine)
-        return tbl
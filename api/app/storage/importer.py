@@ -1,18 +1,48 @@
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from time import perf_counter
 from typing import Iterable
 from uuid import UUID, uuid4
 
+from app import tracing
 from app.domain.account import Account, AccountType
 from app.domain.rule import Rule, check_rule_against_transaction
 from app.domain.transaction import Transaction, decode_ofx_transaction
-from app.storage.db import Between, MenthaDB
+from app.metrics import Counter, Gauge
+from app.storage.db import Between, IsIn, MenthaDB
 from app.storage.ofx import OFXFileData, read_ofx_file
+from app.storage.unit_of_work import current_unit_of_work
 
 IMPORT_FILES = Path("imports/")
 INBOX = IMPORT_FILES.joinpath("inbox")
 COMPLETE = IMPORT_FILES.joinpath("complete")
 
+IMPORT_FILES_READ = Counter("mentha_import_files", "OFX files imported.")
+IMPORT_ROWS_PARSED = Counter(
+    "mentha_import_rows_parsed", "Transactions read from imported OFX files."
+)
+IMPORT_ROWS_INSERTED = Counter(
+    "mentha_import_rows_inserted", "Imported transactions inserted into the db."
+)
+IMPORT_ROWS_REJECTED = Counter(
+    "mentha_import_rows_rejected",
+    "Imported transactions skipped because they were already stored.",
+)
+IMPORT_ROWS_PER_SECOND = Gauge(
+    "mentha_import_rows_per_second",
+    "Transactions parsed per second by the most recent import.",
+)
+
+
+def _complete(filepath: Path) -> None:
+    filepath.rename(COMPLETE.joinpath(filepath.name))
+
+
+def _count_rows(inserted: int, rejected: int) -> None:
+    IMPORT_ROWS_INSERTED.inc(inserted)
+    IMPORT_ROWS_REJECTED.inc(rejected)
+
 
 class TransactionImporterError(Exception):
     def __init__(self, msg: str) -> None:
@@ -43,71 +73,107 @@ class Importer:
         self._rules.sort(key=lambda rule: rule.priority)
 
     async def execute(self) -> ImportResult:
-        imported = list[Path]()
-        import_ct = 0
-        reject_ct = 0
-        existing_fit_ids = set[str]()
+        parsed_ct = 0
+        start = perf_counter()
+        files = list[tuple[Path, OFXFileData]]()
         for filepath in INBOX.iterdir():
-            ofx_file = read_ofx_file(filepath)
-            inst_result = await self._db.institutions.query_async(
-                fit_id=ofx_file.bank_id
-            )
-            insts = inst_result.results
+            with tracing.span("import.read_ofx", file=filepath.name) as span:
+                ofx_file = read_ofx_file(filepath)
+                span.set_attribute("rows_parsed", len(ofx_file.transactions))
+            IMPORT_FILES_READ.inc()
+            IMPORT_ROWS_PARSED.inc(len(ofx_file.transactions))
+            parsed_ct += len(ofx_file.transactions)
+            files.append((filepath, ofx_file))
+        if not files:
+            return ImportResult(import_ct=0, preexisting_transactions=0)
+
+        # Every file's institution, account and existing transactions are looked up
+        # together, so an import makes the same number of queries however many
+        # files it has:
+        inst_result = await self._db.institutions.query_async(
+            fit_id=IsIn([ofx_file.bank_id for _, ofx_file in files])
+        )
+        insts = {inst.fitId: inst for inst in inst_result.results}
+        for _, ofx_file in files:
             # This is done first because there is no guarantee that two given
             # financial institutions will have universally unique account ids.
-            if len(insts) == 0:
+            if ofx_file.bank_id not in insts:
                 # Currently only importing transactions from known institutions:
                 raise TransactionImporterError(
                     f"Unable to locate institution for fit_id {ofx_file.bank_id}"
                 )
-            else:
-                inst = insts[0]
-            acct_result = await self._db.accounts.query_async(
-                fit_id=ofx_file.acct_id, institution=inst.id
-            )
-            accts = acct_result.results
-            if len(accts) == 0:
+        acct_result = await self._db.accounts.query_async(
+            fit_id=IsIn([ofx_file.acct_id for _, ofx_file in files]),
+            institution=IsIn([inst.id for inst in insts.values()]),
+        )
+        accts = {(a.institution, a.fitId): a for a in acct_result.results}
+        new_accts = list[Account[UUID]]()
+        for _, ofx_file in files:
+            inst = insts[ofx_file.bank_id]
+            if (inst.id, ofx_file.acct_id) not in accts:
                 acct = self.create_acct_from_ofx_file(ofx_file, self._owner, inst.id)
-                await self._db.accounts.insert_async(acct)
-            else:
-                acct = accts[0]
-            import_trans = [
-                decode_ofx_transaction(
-                    uuid4(),
-                    t,
-                    acct_id=acct.id,
-                    owner_id=self._owner,
-                    tran_fit_id_pat=inst.transFitIdPat,
-                )
-                for t in ofx_file.transactions
-            ]
-            # Pull transactions matching the import file's date range and reject
-            # any in the import that have a fit_id of an existing transaction.
-            import_trans.sort(key=lambda a: a.date)
+                accts[(inst.id, ofx_file.acct_id)] = acct
+                new_accts.append(acct)
+        if new_accts:
+            await self._db.accounts.insert_async(*new_accts)
+
+        import_trans = list[Transaction[UUID]]()
+        for filepath, ofx_file in files:
+            inst = insts[ofx_file.bank_id]
+            acct = accts[(inst.id, ofx_file.acct_id)]
+            with tracing.span("import.decode", file=filepath.name):
+                import_trans += [
+                    decode_ofx_transaction(
+                        uuid4(),
+                        t,
+                        acct_id=acct.id,
+                        owner_id=self._owner,
+                        tran_fit_id_pat=inst.transFitIdPat,
+                    )
+                    for t in ofx_file.transactions
+                ]
+        # Pull transactions matching the import's date range and reject any in the
+        # import that have the fit_id of an existing transaction in their account.
+        existing_fit_ids = set[tuple[UUID, str]]()
+        if import_trans:
+            dates = [tran.date for tran in import_trans]
             recent_trans = await self._db.transactions.page_through_query_async(
                 owner=self._owner,
-                date=Between(import_trans[0].date, import_trans[-1].date),
-                account=acct.id,
+                date=Between(min(dates), max(dates)),
+                account=IsIn([tran.account for tran in import_trans]),
             )
-            for tran in recent_trans:
-                existing_fit_ids.add(tran.fitId)
-            eligible_trans = list[Transaction[UUID]]()
-            for tran in import_trans:
-                if tran.fitId in existing_fit_ids:
-                    reject_ct += 1
-                else:
-                    eligible_trans.append(tran)
-            # Only bother applying rules to eligible transactions, obviously:
+            existing_fit_ids = {(tran.account, tran.fitId) for tran in recent_trans}
+        eligible_trans = list[Transaction[UUID]]()
+        reject_ct = 0
+        for tran in import_trans:
+            if (tran.account, tran.fitId) in existing_fit_ids:
+                reject_ct += 1
+            else:
+                eligible_trans.append(tran)
+        # Only bother applying rules to eligible transactions, obviously:
+        with tracing.span("import.apply_rules", rules=len(self._rules)):
             transactions = await self.check_rules_against_imported_transactions(
                 eligible_trans,
                 self._rules,
             )
+        if transactions:
             await self._db.transactions.insert_async(*transactions)
-            import_ct += len(transactions)
-            imported.append(filepath)
-        for filepath in imported:
-            filepath.rename(COMPLETE.joinpath(filepath.name))
-        return ImportResult(import_ct=import_ct, preexisting_transactions=reject_ct)
+        # Rows are only counted, and files only moved, once their transactions are
+        # committed, so a unit of work that fails to commit leaves its files in the
+        # inbox to import again, and its rows uncounted:
+        committed = [partial(_count_rows, len(transactions), reject_ct)]
+        committed += [partial(_complete, filepath) for filepath, _ in files]
+        uow = current_unit_of_work()
+        for callback in committed:
+            if uow is not None:
+                uow.after_commit(callback)
+            else:
+                callback()
+        if parsed_ct:
+            IMPORT_ROWS_PER_SECOND.set(parsed_ct / (perf_counter() - start))
+        return ImportResult(
+            import_ct=len(transactions), preexisting_transactions=reject_ct
+        )
 
     @classmethod
     async def check_rules_against_imported_transactions(
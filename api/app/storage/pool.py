@@ -0,0 +1,43 @@
+from time import perf_counter
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app import server_timing
+from app.metrics import Gauge, Histogram
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "mentha_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from a db engine's pool.",
+    ["db"],
+)
+POOL_IN_USE = Gauge(
+    "mentha_db_pool_connections_in_use",
+    "Connections currently checked out of a db engine's pool.",
+    ["db"],
+)
+
+
+def _db_label(engine: AsyncEngine) -> str:
+    url = engine.url
+    return f"{url.host}:{url.port or 5432}/{url.database}"
+
+
+def instrument_pool(engine: AsyncEngine) -> None:
+    """
+    Keeps the in-use gauge of the engine's pool up to date.
+    """
+    in_use = POOL_IN_USE.labels(_db_label(engine))
+    sa.event.listen(engine.sync_engine, "checkout", lambda *_: in_use.inc())
+    sa.event.listen(engine.sync_engine, "checkin", lambda *_: in_use.dec())
+
+
+async def connect(engine: AsyncEngine) -> AsyncConnection:
+    """
+    Works like engine.connect(), but records how long the connection took to get.
+    """
+    start = perf_counter()
+    with server_timing.timed("db-connect"):
+        conn = await engine.connect()
+    POOL_CHECKOUT_WAIT.labels(_db_label(engine)).observe(perf_counter() - start)
+    return conn
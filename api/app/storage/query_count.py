@@ -0,0 +1,89 @@
+"""
+Counts the statements executed on MenthaDB's engines in the current context, so
+request handlers that make a query per record, rather than one per batch, can
+be caught by the query budgets of their routes, or asserted on in tests.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_current_count: ContextVar[QueryCount | None] = ContextVar(
+    "current_query_count", default=None
+)
+
+
+class QueryCount:
+    def __init__(self, parent: QueryCount | None = None) -> None:
+        self.count = 0
+        self.statements = Counter[str]()
+        # (label, count) of each request counted while this count was current:
+        self.requests = list[tuple[str, int]]()
+        self._parent = parent
+
+    def record(self, statement: str) -> None:
+        count: QueryCount | None = self
+        # Outer counts, like a test's, include the statements of requests they
+        # wrap:
+        while count is not None:
+            count.count += 1
+            count.statements[statement] += 1
+            count = count._parent
+
+    def add_request(self, label: str) -> None:
+        """
+        Records this count as that of a request, with every outer count.
+        """
+        count = self._parent
+        while count is not None:
+            count.requests.append((label, self.count))
+            count = count._parent
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        """
+        Returns:
+            tuple[str, int] | None: The statement executed most often, and how
+            often, which is usually the one to batch, or None if there were none.
+        """
+        top = self.statements.most_common(1)
+        return top[0] if top else None
+
+    def for_request(self, label: str) -> list[int]:
+        """
+        Returns:
+            list[int]: The statements executed by each counted request with the
+            passed label, e.g. "GET /categories/{id}", in the order they were made.
+        """
+        return [count for request, count in self.requests if request == label]
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """
+    Counts the statements executed in the block, including any in requests
+    handled by test clients in it.
+    """
+    count = QueryCount(parent=_current_count.get())
+    token = _current_count.set(count)
+    try:
+        yield count
+    finally:
+        _current_count.reset(token)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Records each statement executed on the engine against the current count.
+    """
+
+    def _before(conn: sa.Connection, cursor: Any, statement: str, *_: Any) -> None:
+        count = _current_count.get()
+        if count is not None:
+            count.record(statement)
+
+    sa.event.listen(engine.sync_engine, "before_cursor_execute", _before)
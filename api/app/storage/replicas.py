@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import cycle
+from typing import Iterator, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_read_primary: ContextVar[bool] = ContextVar("read_primary", default=False)
+
+
+class ReplicaSet:
+    """
+    Routes reads across the async engines of a primary db's read replicas, round
+    robin, and everything else to the primary. With no replicas, or inside
+    read_your_writes, reads go to the primary too.
+    """
+
+    def __init__(
+        self, primary: AsyncEngine, replicas: Sequence[AsyncEngine] = ()
+    ) -> None:
+        self._primary = primary
+        self._replicas = list(replicas)
+        self._next_replica = cycle(self._replicas)
+
+    @property
+    def primary(self) -> AsyncEngine:
+        return self._primary
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [self._primary, *self._replicas]
+
+    def reader(self) -> AsyncEngine:
+        """
+        Returns:
+            AsyncEngine: The engine the next read should use.
+        """
+        if not self._replicas or _read_primary.get():
+            return self._primary
+        return next(self._next_replica)
+
+
+@contextmanager
+def read_your_writes() -> Iterator[None]:
+    """
+    Sends reads in the block to the primary, so they see writes that replicas may
+    not have replayed yet.
+    """
+    token = _read_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_primary.reset(token)
@@ -0,0 +1,210 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy import Select
+
+from app import server_timing
+from app.domain.budget import Budget
+from app.domain.category import SYSTEM_CATEGORIES, TRANSFER, Category
+from app.domain.core import DomainModelT
+from app.domain.user import SYSTEM_USER
+from app.storage.db import REL_SEP, MenthaDB, MenthaTable
+
+CATEGORY_PREFIX = f"category{REL_SEP}"
+
+
+@dataclass
+class BudgetReportRow:
+    """
+    A budget alongside its category and the summed transactions for that category.
+    Summed transactions with no budget for their category come back with budget
+    set to None.
+    """
+
+    budget: Budget[UUID] | None
+    category: Category | None
+    total: float
+
+
+def gen_owner_categories_query(db: MenthaDB, owner: UUID) -> Select[Any]:
+    """
+    Args:
+        db (MenthaDB): The db to query.
+        owner (UUID): The owner to scope categories to.
+
+    Returns:
+        Select[Any]: A select of the owner's categories plus the system categories.
+    """
+    cats = db.categories.selectable(SYSTEM_CATEGORIES)
+    return sa.select(cats).where(cats.c.owner.in_([owner, SYSTEM_USER.id]))
+
+
+def gen_owner_budgets_query(db: MenthaDB, owner: UUID) -> Select[Any]:
+    b = db.budgets.table
+    return sa.select(b).where(b.c.owner == owner)
+
+
+def gen_transaction_sums_query(
+    db: MenthaDB,
+    owner: UUID,
+    start: datetime,
+    end: datetime,
+    by_month: bool = False,
+) -> Select[Any]:
+    """
+    Sums an owner's transactions in the passed date range by category, treating
+    debits as negative and excluding transfers.
+
+    Args:
+        db (MenthaDB): The db to query.
+        owner (UUID): The owner of the transactions.
+        start (datetime): Start of the date range (inclusive).
+        end (datetime): End of the date range (inclusive).
+        by_month (bool, optional): If True, sums are also grouped by the month
+            of the transaction, which is included as a month column. Defaults to
+            False.
+
+    Returns:
+        Select[Any]: A select of category and total columns.
+    """
+    t = db.transactions.table
+    signed_amt = sa.case((t.c.type == "debit", -t.c.amt), else_=t.c.amt)
+    group_cols: list[sa.ColumnElement[Any]] = [t.c.category]
+    if by_month:
+        group_cols.append(
+            sa.func.date_trunc("month", sa.cast(t.c.date, sa.DateTime)).label("month")
+        )
+    return (
+        sa.select(*group_cols, sa.func.sum(signed_amt).label("total"))
+        .where(
+            t.c.owner == owner,
+            sa.between(t.c.date, start, end),
+            t.c.category != TRANSFER.id,
+        )
+        .group_by(*group_cols)
+    )
+
+
+def _load_prefixed_row(
+    row: sa.RowMapping, table: MenthaTable[DomainModelT], prefix: str = ""
+) -> DomainModelT | None:
+    values = {c.name: row[f"{prefix}{c.name}"] for c in table.table.c}
+    # Outer joined rows with no match come back as all nulls:
+    return table.load_row(values) if values["id"] is not None else None
+
+
+async def query_budget_report_rows(
+    db: MenthaDB, owner: UUID, start: datetime, end: datetime
+) -> list[BudgetReportRow]:
+    """
+    Fetches everything needed for an owner's budget report in one query: their
+    budgets and owner scoped categories, full outer joined to the sums of their
+    transactions in the passed date range.
+
+    Args:
+        db (MenthaDB): The db to query.
+        owner (UUID): The owner of the budgets and transactions.
+        start (datetime): Start of the date range (inclusive).
+        end (datetime): End of the date range (inclusive).
+
+    Returns:
+        list[BudgetReportRow]: One row per budget, plus one per summed category
+        that has no budget.
+    """
+    budgets = gen_owner_budgets_query(db, owner).cte("owner_budgets")
+    sums = gen_transaction_sums_query(db, owner, start, end).cte("sums")
+    cats = gen_owner_categories_query(db, owner).cte("owner_categories")
+    stmt = sa.select(
+        budgets,
+        sums.c.total,
+        *[c.label(f"{CATEGORY_PREFIX}{c.name}") for c in cats.c],
+    ).select_from(
+        budgets.join(sums, budgets.c.category == sums.c.category, full=True).outerjoin(
+            cats, cats.c.id == sa.func.coalesce(budgets.c.category, sums.c.category)
+        )
+    )
+    rows = await db.budgets.select_async(stmt)
+    with server_timing.timed("load-row"):
+        return [
+            BudgetReportRow(
+                budget=_load_prefixed_row(row, db.budgets),
+                category=_load_prefixed_row(row, db.categories, CATEGORY_PREFIX),
+                total=round(row["total"] or 0, 2),
+            )
+            for row in rows
+        ]
+
+
+async def query_budget_range_rows(
+    db: MenthaDB, owner: UUID, months: Sequence[datetime], end: datetime
+) -> dict[datetime, list[BudgetReportRow]]:
+    """
+    Fetches the equivalent of query_budget_report_rows for each of the passed
+    months, using one query for the owner's budgets and one query for their
+    transaction sums grouped by month and category.
+
+    Args:
+        db (MenthaDB): The db to query.
+        owner (UUID): The owner of the budgets and transactions.
+        months (Sequence[datetime]): The first day of each month to fetch rows
+            for, in ascending order.
+        end (datetime): The end of the last month (inclusive).
+
+    Returns:
+        dict[datetime, list[BudgetReportRow]]: The rows for each passed month.
+    """
+    cats = gen_owner_categories_query(db, owner).cte("owner_categories")
+    cat_cols = [c.label(f"{CATEGORY_PREFIX}{c.name}") for c in cats.c]
+    budgets = gen_owner_budgets_query(db, owner).cte("owner_budgets")
+    budget_stmt = sa.select(budgets, *cat_cols).select_from(
+        budgets.outerjoin(cats, cats.c.id == budgets.c.category)
+    )
+    sums = gen_transaction_sums_query(db, owner, months[0], end, by_month=True).cte(
+        "sums"
+    )
+    sums_stmt = sa.select(sums, *cat_cols).select_from(
+        sums.outerjoin(cats, cats.c.id == sums.c.category)
+    )
+
+    raw_budget_rows = await db.budgets.select_async(budget_stmt)
+    raw_sums_rows = await db.transactions.select_async(sums_stmt)
+    with server_timing.timed("load-row"):
+        budget_rows = [
+            (
+                _load_prefixed_row(row, db.budgets),
+                _load_prefixed_row(row, db.categories, CATEGORY_PREFIX),
+            )
+            for row in raw_budget_rows
+        ]
+        sums_by_month = {month: dict[UUID, BudgetReportRow]() for month in months}
+        for row in raw_sums_rows:
+            sums_by_month[row["month"]][UUID(row["category"])] = BudgetReportRow(
+                budget=None,
+                category=_load_prefixed_row(row, db.categories, CATEGORY_PREFIX),
+                total=round(row["total"] or 0, 2),
+            )
+
+    result = dict[datetime, list[BudgetReportRow]]()
+    for month, month_sums in sums_by_month.items():
+        rows = list[BudgetReportRow]()
+        budgeted = set[UUID]()
+        for budget, category in budget_rows:
+            if budget is None:
+                continue
+            summed = month_sums.get(budget.category)
+            rows.append(
+                BudgetReportRow(
+                    budget=budget,
+                    category=category,
+                    total=summed.total if summed else 0,
+                )
+            )
+            budgeted.add(budget.category)
+        # Like the full outer join in query_budget_report_rows, sums only get
+        # their own row when no budget exists for the category:
+        rows += [row for cat_id, row in month_sums.items() if cat_id not in budgeted]
+        result[month] = rows
+    return result
@@ -0,0 +1,112 @@
+"""
+Static definitions of the tables created by the alembic migrations, so MenthaDB
+doesn't have to reflect them from the db on startup. Keep these in step with any
+new migration; tests/test_db.py checks them against a migrated db.
+"""
+from typing import Any
+from uuid import UUID
+
+import sqlalchemy as sa
+
+from app.domain.account import ACCOUNT_TABLE
+from app.domain.budget import BUDGET_TABLE
+from app.domain.category import CATEGORY_TABLE
+from app.domain.institution import INSTITUTION_TABLE
+from app.domain.rule import RULE_TABLE
+from app.domain.transaction import TRANSACTION_TABLE
+
+DATA_VERSIONS_TABLE = "data_versions"
+# The owner data_versions keeps the version of data every owner shares under:
+GLOBAL_OWNER = "*"
+
+
+class UUIDString(sa.types.TypeDecorator[str]):
+    """
+    A string column holding UUIDs. UUIDs bound to it are converted to strings
+    wherever they appear, in inserted rows as well as in where clauses, so callers
+    can pass the UUIDs on domain models straight through. asyncpg, unlike
+    psycopg, won't send a UUID as a string.
+    """
+
+    impl = sa.String(256)
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: sa.Dialect) -> Any:
+        return str(value) if isinstance(value, UUID) else value
+
+
+metadata = sa.MetaData()
+
+accounts = sa.Table(
+    ACCOUNT_TABLE,
+    metadata,
+    sa.Column("id", UUIDString()),
+    sa.Column("fit_id", sa.String(256)),
+    sa.Column("account_type", sa.String(100)),
+    sa.Column("name", sa.String(256)),
+    sa.Column("institution", UUIDString()),
+    sa.Column("owner", UUIDString()),
+)
+
+budgets = sa.Table(
+    BUDGET_TABLE,
+    metadata,
+    sa.Column("id", UUIDString()),
+    sa.Column("category", UUIDString()),
+    sa.Column("amt", sa.Float()),
+    sa.Column("period", sa.Integer),
+    sa.Column("create_date", sa.Date),
+    sa.Column("inactive_date", sa.Date),
+    sa.Column("owner", UUIDString()),
+)
+
+categories = sa.Table(
+    CATEGORY_TABLE,
+    metadata,
+    sa.Column("id", UUIDString()),
+    sa.Column("name", sa.String(256)),
+    sa.Column("parent_category", UUIDString()),
+    sa.Column("owner", UUIDString()),
+)
+
+institutions = sa.Table(
+    INSTITUTION_TABLE,
+    metadata,
+    sa.Column("id", UUIDString()),
+    sa.Column("name", sa.String(256)),
+    sa.Column("fit_id", sa.String(256)),
+    sa.Column("trans_fit_id_pat", sa.String(256)),
+)
+
+rules = sa.Table(
+    RULE_TABLE,
+    metadata,
+    sa.Column("id", UUIDString()),
+    sa.Column("priority", sa.Integer),
+    sa.Column("result_category", UUIDString()),
+    sa.Column("owner", UUIDString()),
+    sa.Column("match_name", sa.String(256)),
+    sa.Column("match_amt", sa.String(256)),
+    sa.Column("match_type", sa.String(10)),
+)
+
+transactions = sa.Table(
+    TRANSACTION_TABLE,
+    metadata,
+    sa.Column("id", UUIDString()),
+    sa.Column("fit_id", sa.String(256)),
+    sa.Column("amt", sa.Float()),
+    sa.Column("date", sa.Date),
+    sa.Column("name", sa.String(256)),
+    sa.Column("category", UUIDString()),
+    sa.Column("account", UUIDString()),
+    sa.Column("owner", UUIDString()),
+    sa.Column("type", sa.String(10)),
+)
+
+data_versions = sa.Table(
+    DATA_VERSIONS_TABLE,
+    metadata,
+    sa.Column("owner", sa.String(256), primary_key=True),
+    sa.Column("version", sa.BigInteger, nullable=False),
+)
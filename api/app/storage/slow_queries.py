@@ -0,0 +1,166 @@
+"""
+Logs statements that take longer than a threshold to a rotating JSONL file, with
+their SQL, which has placeholders in place of any parameter values, the types of
+those values, the rows returned or affected and, for a sampled share of them, the
+plan Postgres chose.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from time import perf_counter
+from typing import Any, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_STATEMENT_START = "mentha_statement_start"
+_EXPLAIN_SAVEPOINT = "mentha_explain"
+
+# Runs of placeholders, like those of IN lists, whose length varies by call:
+_PLACEHOLDER_RUN = re.compile(r"\$\d+(?:\s*,\s*\$\d+)*")
+_WHITESPACE = re.compile(r"\s+")
+# Plans show parameter values as quoted literals in their conditions:
+_QUOTED_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+@dataclass
+class SlowQueryLogConfig:
+    path: str
+    threshold_ms: float = 200
+    # EXPLAIN ANALYZE runs the statement a second time, so leave this at 0 in
+    # production:
+    explain_sample_ratio: float = 0.0
+    max_bytes: int = 10 * 2**20
+    backup_count: int = 5
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Returns:
+        str: A hash of the statement's shape, which is the same for statements that
+        only differ in their number of IN list items, or their whitespace.
+    """
+    shape = _PLACEHOLDER_RUN.sub("$n", _WHITESPACE.sub(" ", statement).strip())
+    return hashlib.sha1(shape.encode()).hexdigest()[:16]
+
+
+def _redact(parameters: Any) -> Any:
+    # Keeps the types of parameter values, but none of the values, which can be
+    # owner ids or transaction details:
+    if isinstance(parameters, dict):
+        return {k: _redact(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(v) for v in parameters]
+    return None if parameters is None else type(parameters).__name__
+
+
+def _redact_plan(plan: Any) -> Any:
+    if isinstance(plan, dict):
+        return {k: _redact_plan(v) for k, v in plan.items()}
+    if isinstance(plan, list):
+        return [_redact_plan(v) for v in plan]
+    if isinstance(plan, str):
+        return _QUOTED_LITERAL.sub("'?'", plan)
+    return plan
+
+
+def _row_count(cursor: Any) -> int | None:
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+    # asyncpg's adapted cursor leaves rowcount at -1 for SELECTs, but has already
+    # buffered their rows by now:
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else None
+
+
+class SlowQueryLog:
+    def __init__(self, config: SlowQueryLogConfig) -> None:
+        self._config = config
+        self._threshold = config.threshold_ms / 1000
+        self._handler = RotatingFileHandler(
+            config.path,
+            maxBytes=config.max_bytes,
+            backupCount=config.backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """
+        Times every statement executed on the engine, logging the slow ones.
+        """
+        sa.event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        sa.event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+
+    def close(self) -> None:
+        self._handler.close()
+
+    def _before(self, conn: sa.Connection, *_: Any) -> None:
+        conn.info[_STATEMENT_START] = perf_counter()
+
+    def _after(
+        self,
+        conn: sa.Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        start = conn.info.pop(_STATEMENT_START, None)
+        if start is None:
+            return
+        elapsed = perf_counter() - start
+        if elapsed < self._threshold:
+            return
+        entry: dict[str, Any] = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "db": conn.engine.url.render_as_string(hide_password=True),
+            "duration_ms": round(elapsed * 1000, 3),
+            "fingerprint": fingerprint(statement),
+            "statement": statement,
+            "params": _redact(parameters),
+            "rows": _row_count(cursor),
+        }
+        if executemany:
+            entry["executemany"] = len(parameters)
+        elif random.random() < self._config.explain_sample_ratio:
+            entry.update(self._explain(conn, statement, parameters))
+        self._handler.handle(logging.makeLogRecord({"msg": json.dumps(entry)}))
+
+    @staticmethod
+    def _explain(
+        conn: sa.Connection, statement: str, parameters: Sequence[Any]
+    ) -> dict[str, Any]:
+        # Only reads are analyzed, since EXPLAIN ANALYZE runs the statement again.
+        # Anything else, including CTEs that may write, just gets its plan:
+        analyze = statement.lstrip()[:6].upper() == "SELECT"
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        # The raw DBAPI cursor skips these event handlers, and a savepoint keeps a
+        # failed EXPLAIN from aborting the caller's transaction:
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+            try:
+                cursor.execute(f"EXPLAIN ({options}) {statement}", parameters)
+                [(plan,)] = cursor.fetchall()
+            except Exception as e:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+                logger.warning("Failed to EXPLAIN a slow statement: %s", e)
+                return {}
+            finally:
+                cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+        finally:
+            cursor.close()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return {"analyzed": analyze, "plan": _redact_plan(plan)}
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.storage import pool
+
+_current: ContextVar[UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """
+    A single db connection and transaction shared by every MenthaTable call made
+    while it's active, so they see the same data and only one connection is
+    checked out. The connection is opened on first use, so work that never
+    touches the db doesn't pay for one.
+
+    Callbacks registered with after_commit, like data version bumps, run once the
+    transaction commits, so nothing can observe them before the writes they
+    describe are visible. State that should only live as long as the transaction,
+    like lookups memoized against its snapshot, can be kept in info.
+    """
+
+    def __init__(self, engine: AsyncEngine, isolation_level: str | None = None) -> None:
+        self._engine = engine
+        self._isolation_level = isolation_level
+        self._conn: AsyncConnection | None = None
+        self._lock = asyncio.Lock()
+        self._after_commit = list[Callable[[], Any]]()
+        self.info = dict[Any, Any]()
+
+    async def connection(self) -> AsyncConnection:
+        async with self._lock:
+            if self._conn is None:
+                conn = await pool.connect(self._engine)
+                if self._isolation_level:
+                    await conn.execution_options(isolation_level=self._isolation_level)
+                await conn.begin()
+                self._conn = conn
+        return self._conn
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self._engine
+
+    def after_commit(self, callback: Callable[[], Any]) -> None:
+        self._after_commit.append(callback)
+
+    async def _close(self, commit: bool) -> None:
+        if self._conn is None:
+            return
+        try:
+            if commit:
+                await self._conn.commit()
+            else:
+                await self._conn.rollback()
+        finally:
+            await self._conn.close()
+            self._conn = None
+        if commit:
+            for callback in self._after_commit:
+                callback()
+
+
+def current_unit_of_work() -> UnitOfWork | None:
+    return _current.get()
+
+
+@asynccontextmanager
+async def unit_of_work(
+    engine: AsyncEngine, isolation_level: str | None = None
+) -> AsyncIterator[UnitOfWork]:
+    """
+    Makes a UnitOfWork current until the block exits, committing it if the block
+    succeeds and rolling it back if it raises.
+
+    Args:
+        engine (AsyncEngine): The engine to get the connection from.
+        isolation_level (str | None, optional): The transaction isolation level,
+            e.g. REPEATABLE READ to give every query the same snapshot. Defaults
+            to None, which uses the engine's.
+
+    Yields:
+        UnitOfWork: The active unit of work.
+    """
+    uow = UnitOfWork(engine, isolation_level)
+    token = _current.set(uow)
+    try:
+        yield uow
+    except BaseException:
+        _current.reset(token)
+        await uow._close(commit=False)
+        raise
+    _current.reset(token)
+    await uow._close(commit=True)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """
+    Opts the block out of the current unit of work, so MenthaTable calls in it use
+    and commit their own connections. Use it for work that outlives the request,
+    like background jobs.
+    """
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
@@ -0,0 +1,90 @@
+from typing import Iterable
+from uuid import UUID
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.storage import pool
+from app.storage.replicas import ReplicaSet
+from app.storage.schema import GLOBAL_OWNER, data_versions
+from app.storage.unit_of_work import current_unit_of_work
+
+_OWNER_PARAM = "owner"
+
+
+class DataVersions:
+    """
+    Tracks a version for each owner's data that changes whenever a MenthaTable
+    writes a record for that owner. Writes to tables without an owner, like
+    institutions, change the version of every owner.
+
+    Versions are stored in the data_versions table and bumped in the same
+    transaction as the writes they describe, so every worker sees the same
+    versions, and a version can't change without its data changing too (or the
+    other way around). Reads made in a unit of work get the version from the same
+    snapshot as their data.
+    """
+
+    def __init__(self, replicas: ReplicaSet) -> None:
+        self._replicas = replicas
+        c = data_versions.c
+        param: sa.BindParameter[str] = sa.bindparam(_OWNER_PARAM)
+        self._get_stmt = sa.select(
+            sa.func.coalesce(sa.func.max(c.version).filter(c.owner == GLOBAL_OWNER), 0),
+            sa.func.coalesce(sa.func.max(c.version).filter(c.owner == param), 0),
+        ).where(c.owner.in_([GLOBAL_OWNER, param]))
+
+    async def bump_async(
+        self, conn: AsyncConnection, owners: Iterable[UUID] | None = None
+    ) -> None:
+        """
+        Args:
+            conn (AsyncConnection): The connection, in a transaction, that the
+                owners' data was written on.
+            owners (Iterable[UUID] | None, optional): The owners whose data changed.
+                Defaults to None, which changes the version of every owner.
+        """
+        keys = [GLOBAL_OWNER] if owners is None else sorted({str(o) for o in owners})
+        if not keys:
+            return
+        # Sorted keys lock the rows of concurrent bumps in the same order, so they
+        # can't deadlock:
+        stmt = insert(data_versions).values([{"owner": k, "version": 1} for k in keys])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[data_versions.c.owner],
+            set_={"version": data_versions.c.version + 1},
+        )
+        await conn.execute(stmt)
+
+        uow = current_unit_of_work()
+        if uow is not None:
+            # A later read in the unit of work has to see the new version:
+            uow.info.pop(self, None)
+
+    async def get_async(self, owner: UUID) -> str:
+        """
+        Args:
+            owner (UUID): The owner to get the version for.
+
+        Returns:
+            str: An opaque version string, which will differ from any previously
+            returned for the owner if their data may have changed since.
+        """
+        uow = current_unit_of_work()
+        if uow is None:
+            conn = await pool.connect(self._replicas.reader())
+            try:
+                return await self._select(conn, owner)
+            finally:
+                await conn.close()
+        # Route dependencies and the route itself share one lookup:
+        cached: dict[UUID, str] = uow.info.setdefault(self, {})
+        if owner not in cached:
+            cached[owner] = await self._select(await uow.connection(), owner)
+        return cached[owner]
+
+    async def _select(self, conn: AsyncConnection, owner: UUID) -> str:
+        result = await conn.execute(self._get_stmt, {_OWNER_PARAM: str(owner)})
+        global_version, owner_version = result.one()
+        return f"{global_version}.{owner_version}"
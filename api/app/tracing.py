@@ -0,0 +1,426 @@
+"""
+Minimal tracing that follows the OpenTelemetry data model: spans nest through a
+contextvar, incoming W3C traceparent headers are continued, and finished spans
+are exported in batches from a background thread as OTLP/JSON, one
+ExportTraceServiceRequest per line, which an OpenTelemetry Collector's
+otlpjsonfile receiver can forward anywhere. Exporting to a file or the console
+needs nothing else running, so it works offline.
+
+Tracing is off until configure_tracing is called, and spans in unsampled traces
+are never recorded, so span() costs under a microsecond then.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Literal, Sequence, TextIO
+
+SERVICE_NAME = "mentha-api"
+
+SpanKind = Literal["internal", "server", "client"]
+SpanStatus = Literal["unset", "ok", "error"]
+
+# Enum values of the OTLP protocol:
+_OTLP_KINDS: dict[SpanKind, int] = {"internal": 1, "server": 2, "client": 3}
+_OTLP_STATUSES: dict[SpanStatus, int] = {"unset": 0, "ok": 1, "error": 2}
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class SpanContext:
+    trace_id: int
+    span_id: int
+    sampled: bool
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: int | None = None
+    kind: SpanKind = "internal"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    status: SpanStatus = "unset"
+    status_message: str = ""
+
+    @property
+    def recording(self) -> bool:
+        return self.context.sampled
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def set_status(self, status: SpanStatus, message: str = "") -> None:
+        if self.recording:
+            self.status = status
+            self.status_message = message
+
+    def record_exception(self, e: BaseException) -> None:
+        self.set_attribute("exception.type", type(e).__qualname__)
+        self.set_attribute("exception.message", str(e))
+        self.set_status("error", str(e))
+
+    def end(self) -> None:
+        if not self.recording or self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        _tracer.export(self)
+
+    def to_otlp(self) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": f"{self.context.trace_id:032x}",
+            "spanId": f"{self.context.span_id:016x}",
+            "name": self.name,
+            "kind": _OTLP_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()
+            ],
+            "status": {
+                "code": _OTLP_STATUSES[self.status],
+                "message": self.status_message,
+            },
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = f"{self.parent_id:016x}"
+        return span
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # 64 bit ints are strings in OTLP/JSON:
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# Stands in for every span of an unsampled trace, or when tracing is off:
+_NON_RECORDING = Span("", SpanContext(0, 0, sampled=False))
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, spans: Sequence[Span]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends each batch of finished spans to a file as a line of OTLP/JSON.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self._path = Path(path)
+        self._file: TextIO | None = None
+
+    def export(self, spans: Sequence[Span]) -> None:
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": _otlp_value(SERVICE_NAME),
+                                }
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": __name__},
+                                "spans": [span.to_otlp() for span in spans],
+                            }
+                        ],
+                    }
+                ]
+            }
+        )
+        if self._file is None:
+            self._file = self._path.open("a")
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """
+    Writes a line per finished span, for reading traces while developing.
+    """
+
+    def __init__(self, stream: TextIO = sys.stderr) -> None:
+        self._stream = stream
+
+    def export(self, spans: Sequence[Span]) -> None:
+        for span in spans:
+            duration_ms = ((span.end_ns or span.start_ns) - span.start_ns) / 1e6
+            attrs = " ".join(f"{k}={v!r}" for k, v in span.attributes.items())
+            self._stream.write(
+                f"[trace {span.context.trace_id:032x}] {span.name} "
+                f"{duration_ms:.2f}ms {span.status} {attrs}\n"
+            )
+
+
+class BatchSpanProcessor:
+    """
+    Queues finished spans and hands them to an exporter in batches from a
+    background thread, like OpenTelemetry's processor of the same name, so ending
+    a span never waits on I/O. Once max_queue_size spans are waiting, new ones are
+    dropped rather than letting the queue grow without bound.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        schedule_delay: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            schedule_delay (float, optional): The most seconds a span waits to be
+                exported, unless the queue fills a batch sooner. Defaults to 1.0.
+        """
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue = queue.SimpleQueue[Span]()
+        self._max_queue_size = max_queue_size
+        self._max_batch_size = max_batch_size
+        self._schedule_delay = schedule_delay
+        self._wake = threading.Event()
+        self._stopping = False
+        # Only one thread exports at a time, so exporters don't need to lock:
+        self._export_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        size = self._queue.qsize()
+        if size >= self._max_queue_size:
+            self.dropped += 1
+            return
+        self._queue.put(span)
+        if size + 1 >= self._max_batch_size:
+            self._wake.set()
+
+    def force_flush(self) -> None:
+        """
+        Exports every queued span before returning.
+        """
+        with self._export_lock:
+            while not self._queue.empty():
+                batch = list[Span]()
+                while len(batch) < self._max_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get())
+                self.exporter.export(batch)
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self.force_flush()
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self._schedule_delay)
+            self._wake.clear()
+            self.force_flush()
+
+
+class _Tracer:
+    def __init__(self) -> None:
+        self.processor: BatchSpanProcessor | None = None
+        self.sample_ratio = 1.0
+
+    def sample(self, trace_id: int) -> bool:
+        # Like OpenTelemetry's TraceIdRatioBased sampler, so every service
+        # sampling at the same ratio keeps the same traces:
+        return (trace_id & (2**64 - 1)) < self.sample_ratio * 2**64
+
+    def export(self, span: Span) -> None:
+        if self.processor is not None:
+            self.processor.on_end(span)
+
+
+_tracer = _Tracer()
+
+
+def configure_tracing(exporter: SpanExporter | None, sample_ratio: float = 1.0) -> None:
+    """
+    Args:
+        exporter (SpanExporter | None): Where finished spans are sent, in batches
+            from a background thread, or None to turn tracing off.
+        sample_ratio (float, optional): The fraction of traces to record, from 0
+            to 1. Traces continued from a traceparent header follow its sampled
+            flag instead. Defaults to 1.0.
+    """
+    processor = _tracer.processor
+    if processor is not None and processor.exporter is exporter:
+        _tracer.sample_ratio = sample_ratio
+        return
+    _tracer.processor = None
+    if processor is not None:
+        processor.shutdown()
+    if exporter is not None:
+        _tracer.processor = BatchSpanProcessor(exporter)
+    _tracer.sample_ratio = sample_ratio
+
+
+def force_flush() -> None:
+    """
+    Exports every span that has ended so far, e.g. before reading them back.
+    """
+    if _tracer.processor is not None:
+        _tracer.processor.force_flush()
+
+
+# Exports whatever is still queued when the process exits:
+atexit.register(configure_tracing, None)
+
+
+def exporter_from_setting(setting: str) -> SpanExporter:
+    """
+    Args:
+        setting (str): "console", or the path of a file to write spans to.
+
+    Returns:
+        SpanExporter: The matching exporter.
+    """
+    if setting == "console":
+        return ConsoleSpanExporter()
+    return FileSpanExporter(setting)
+
+
+def current_span() -> Span:
+    return _current_span.get() or _NON_RECORDING
+
+
+def parse_traceparent(header: str | None) -> SpanContext | None:
+    """
+    Returns:
+        SpanContext | None: The remote parent in a W3C traceparent header, or
+        None if it's missing or malformed.
+    """
+    m = _TRACEPARENT.match(header or "")
+    if not m or int(m[1], 16) == 0 or int(m[2], 16) == 0:
+        return None
+    return SpanContext(int(m[1], 16), int(m[2], 16), sampled=bool(int(m[3], 16) & 1))
+
+
+def start_span(
+    name: str,
+    kind: SpanKind = "internal",
+    parent: SpanContext | None = None,
+    attributes: dict[str, Any] | None = None,
+) -> Span:
+    """
+    Starts a span without making it current. Callers must end() it.
+
+    Args:
+        parent (SpanContext | None, optional): The span's parent. Defaults to
+            None, which uses the current span, or starts a new trace if there
+            isn't one.
+    """
+    if _tracer.processor is None:
+        return _NON_RECORDING
+    if parent is None:
+        current = _current_span.get()
+        parent = current.context if current is not None else None
+    if parent is None:
+        trace_id = random.getrandbits(128)
+        sampled = _tracer.sample(trace_id)
+    else:
+        trace_id = parent.trace_id
+        sampled = parent.sampled
+    if not sampled:
+        return _NON_RECORDING
+    return Span(
+        name,
+        SpanContext(trace_id, random.getrandbits(64), sampled=True),
+        parent_id=parent.span_id if parent is not None else None,
+        kind=kind,
+        attributes=attributes or {},
+    )
+
+
+class _SpanScope:
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, span: Span) -> None:
+        self._span = span
+        self._token: Token[Span | None] | None = None
+
+    def __enter__(self) -> Span:
+        # Unsampled spans are made current too, when tracing is on, to keep their
+        # descendants from starting traces of their own:
+        if _tracer.processor is not None:
+            self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if self._token is not None:
+            _current_span.reset(self._token)
+        if exc is not None:
+            self._span.record_exception(exc)
+        self._span.end()
+
+
+def span(
+    name: str,
+    kind: SpanKind = "internal",
+    parent: SpanContext | None = None,
+    attributes: dict[str, Any] | None = None,
+    **kw_attributes: Any,
+) -> AbstractContextManager[Span]:
+    """
+    Runs the block in a new span that's current until the block exits, and is
+    marked as an error if the block raises.
+
+    Args:
+        attributes (dict[str, Any] | None, optional): The span's attributes, for
+            names that aren't identifiers, like "db.collection.name". Others can
+            also be passed as keyword arguments. Defaults to None.
+
+    Returns:
+        AbstractContextManager[Span]: Yields the span, to add attributes to.
+    """
+    return _SpanScope(
+        start_span(name, kind, parent, {**(attributes or {}), **kw_attributes})
+    )
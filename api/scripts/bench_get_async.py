@@ -0,0 +1,55 @@
+"""
+Measures MenthaTable.get_async throughput with the unpooled async engine (a new
+connection, and so fresh prepared statements, for every call) against the pooled
+engine the app uses, which reuses connections and their prepared statements.
+
+Lookups use random ids, so the db needs no data and nothing is written. Run from
+the api directory against a running db:
+    python -m scripts.bench_get_async --calls 2000 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+from time import perf_counter
+from uuid import uuid4
+
+from app.storage.db import MenthaDB, MenthaDBAsyncConfig, MenthaDBConfig
+
+
+async def run_gets(db: MenthaDB, calls: int, concurrency: int) -> float:
+    async def _worker(n: int) -> None:
+        for _ in range(n):
+            await db.categories.get_async(uuid4())
+
+    # Warms up the pool, statement caches and compiled SQL:
+    await _worker(concurrency)
+    start = perf_counter()
+    await asyncio.gather(*[_worker(calls // concurrency) for _ in range(concurrency)])
+    elapsed = perf_counter() - start
+    await db.dispose_async()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--user", default=os.environ.get("DB_USER", "postgres"))
+    parser.add_argument("--pwd", default=os.environ.get("DB_PWD", "test"))
+    parser.add_argument("--host", default=os.environ.get("DB_URL", "localhost:5432"))
+    args = parser.parse_args()
+
+    config = MenthaDBConfig(user=args.user, pwd=args.pwd, host=args.host)
+    async_config = MenthaDBAsyncConfig(pool_size_async=args.concurrency)
+    print(f"{args.calls} get_async calls, {args.concurrency} at a time:")
+    for name, db in [
+        ("unpooled", MenthaDB(config)),
+        ("pooled", MenthaDB(config, async_config)),
+    ]:
+        elapsed = asyncio.run(run_gets(db, args.calls, args.concurrency))
+        db.dispose()
+        print(f"  {name:<10}{args.calls / elapsed:10.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Times encoding a /transactions/by-owner page with FastAPI's default response
+handling against model_json_endpoint, using the same in-memory page for both so
+the db isn't involved.
+
+Run from the api directory:
+    python -m scripts.bench_serialization --rows 500 --repeat 50
+"""
+import argparse
+from datetime import date, timedelta
+from statistics import median
+from time import perf_counter
+from uuid import UUID, uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.domain.category import SYSTEM_CATEGORIES, Category
+from app.domain.core import PagedResultsModel, QueryModel
+from app.domain.transaction import Transaction
+from app.routes.responses import model_json_endpoint
+
+
+def gen_page(rows: int) -> PagedResultsModel[Transaction[Category]]:
+    owner, account = uuid4(), uuid4()
+    results = [
+        Transaction[Category](
+            id=uuid4(),
+            fitId=str(i),
+            amt=round(i * 1.37, 2),
+            type="debit" if i % 3 else "credit",
+            date=date(2024, 1, 1) + timedelta(days=i % 365),
+            name=f"Transaction {i}",
+            category=SYSTEM_CATEGORIES[i % len(SYSTEM_CATEGORIES)],
+            account=account,
+            owner=owner,
+        )
+        for i in range(rows)
+    ]
+    # Built the same way as MenthaTable's paged results:
+    return PagedResultsModel(
+        results=results,
+        hitCount=rows,
+        totalHitCount=rows,
+        page=1,
+        pageSize=rows,
+        hasNext=False,
+        hasPrev=False,
+    )
+
+
+def time_route(client: TestClient, route: str, repeat: int) -> list[float]:
+    times = list[float]()
+    for _ in range(repeat):
+        start = perf_counter()
+        resp = client.post(route, json={})
+        times.append(perf_counter() - start)
+        assert resp.status_code == 200
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    page = gen_page(args.rows)
+
+    async def get_by_owner(
+        ownerId: UUID, query: QueryModel
+    ) -> PagedResultsModel[Transaction[Category]]:
+        return page
+
+    app = FastAPI()
+    app.add_api_route("/default/{ownerId}", get_by_owner, methods=["POST"])
+    app.add_api_route(
+        "/model-json/{ownerId}", model_json_endpoint(get_by_owner), methods=["POST"]
+    )
+    client = TestClient(app)
+    owner = uuid4()
+    assert (
+        client.post(f"/default/{owner}", json={}).json()
+        == client.post(f"/model-json/{owner}", json={}).json()
+    )
+
+    print(f"{args.rows} rows per page, median of {args.repeat} requests:")
+    for name in ["default", "model-json"]:
+        times = time_route(client, f"/{name}/{owner}", args.repeat)
+        print(f"  {name:<12}{median(times) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measures how long a worker takes to start serving: building the app, against
+also reflecting the tables from the db as MenthaDB used to, and a whole uvicorn
+process, from being spawned until it answers requests. Run from the api
+directory against a running db:
+    python -m scripts.bench_startup --runs 20 --server-runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from time import perf_counter, sleep
+from urllib.request import urlopen
+
+import sqlalchemy as sa
+
+from app.core import create_app
+from app.storage import schema
+from app.storage.db import MenthaDB, MenthaDBAsyncConfig, MenthaDBConfig
+
+# uvicorn only accepts connections once the app's lifespan has waited for the db,
+# so the first answer from a route that doesn't query it means the worker's ready:
+READY_PATH = "/metrics"
+
+
+def build(config: MenthaDBConfig, reflect: bool) -> float:
+    start = perf_counter()
+    db = MenthaDB(config, MenthaDBAsyncConfig())
+    if reflect:
+        engine = sa.create_engine(db.url)
+        sa.MetaData().reflect(bind=engine, only=list(schema.metadata.tables))
+        engine.dispose()
+    create_app(db)
+    elapsed = perf_counter() - start
+    db.dispose()
+    return elapsed
+
+
+def serve(config: MenthaDBConfig, port: int, timeout: float) -> float:
+    """
+    Returns:
+        float: Seconds from spawning uvicorn until it answered READY_PATH.
+    """
+    env = {
+        **os.environ,
+        "DB_USER": config.user,
+        "DB_PWD": config.pwd,
+        "DB_URL": config.host,
+    }
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+    start = perf_counter()
+    server = subprocess.Popen([*command, "--log-level", "warning"], env=env)
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}.")
+            try:
+                with urlopen(f"http://127.0.0.1:{port}{READY_PATH}", timeout=1):
+                    return perf_counter() - start
+            except OSError:
+                # Refused until uvicorn's listening:
+                if perf_counter() - start > timeout:
+                    raise TimeoutError(f"uvicorn wasn't ready within {timeout}s.")
+                sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--server-runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--user", default=os.environ.get("DB_USER", "postgres"))
+    parser.add_argument("--pwd", default=os.environ.get("DB_PWD", "test"))
+    parser.add_argument("--host", default=os.environ.get("DB_URL", "localhost:5432"))
+    args = parser.parse_args()
+
+    config = MenthaDBConfig(user=args.user, pwd=args.pwd, host=args.host)
+    print(f"App startup, best of {args.runs}:")
+    for name, reflect in [("reflected", True), ("static", False)]:
+        best = min(build(config, reflect) for _ in range(args.runs))
+        print(f"  {name:<10}{best * 1000:10.1f} ms")
+
+    print(f"uvicorn spawn until ready, best of {args.server_runs}:")
+    times = [serve(config, args.port, args.timeout) for _ in range(args.server_runs)]
+    print(f"  {'best':<10}{min(times) * 1000:10.1f} ms")
+    print(f"  {'worst':<10}{max(times) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""
+Replays a mix of the client's traffic against a running API: dashboard polling
+of the trends, budget reports, deep pages of transactions, rule edits and
+imports. Each endpoint's throughput and latency percentiles are written as JSON,
+so builds can be compared.
+
+Owners are seeded with categories, budgets, rules and a year of transactions
+through the API first, so any empty db will do. The harness uses httpx, which is
+one of the dev dependencies, so it needs a full `poetry install` (as the Docker
+image does), not `--only main`. Run from the api directory against a local
+server and db:
+    python -m scripts.load_test --url http://localhost:8000 --concurrency 20 \\
+        --duration 30 --out load_test.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Callable, NamedTuple
+from uuid import UUID, uuid4
+
+import httpx
+
+PAGE_SIZE = 50
+IMPORT_SIZE = 25
+SEED_BATCH_SIZE = 500
+CATEGORY_NAMES = [
+    "Groceries",
+    "Rent",
+    "Utilities",
+    "Dining",
+    "Fuel",
+    "Insurance",
+    "Travel",
+    "Gifts",
+]
+MERCHANTS = ["Store", "Market", "Cafe", "Station", "Airline", "Landlord", "Power"]
+
+
+@dataclass
+class Owner:
+    id: UUID
+    account: UUID
+    categories: list[UUID] = field(default_factory=list)
+    # Rule inputs by id, so edits can resend them:
+    rules: dict[UUID, dict[str, Any]] = field(default_factory=dict)
+    transaction_ct: int = 0
+
+
+class LoadRequest(NamedTuple):
+    # The route, e.g. "GET /trends/net-income/{ownerId}", results are grouped by:
+    label: str
+    method: str
+    url: str
+    params: dict[str, Any] | None = None
+    json: Any = None
+
+
+def _months_ago(months: int) -> date:
+    today = date.today().replace(day=1)
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    return date(year, month + 1, 1)
+
+
+def _datetime(day: date) -> str:
+    # Input models take datetimes, which the API won't parse from a bare date:
+    return datetime.combine(day, time()).isoformat()
+
+
+def _transaction(owner: Owner, rng: random.Random, day: date) -> dict[str, Any]:
+    credit = rng.random() < 0.1
+    return {
+        "fitId": uuid4().hex,
+        "amt": round(rng.uniform(500, 3000) if credit else rng.uniform(2, 200), 2),
+        "type": "credit" if credit else "debit",
+        "date": _datetime(day),
+        "name": f"{rng.choice(MERCHANTS)} #{rng.randint(1, 99)}",
+        "category": str(rng.choice(owner.categories)),
+        "account": str(owner.account),
+        "owner": str(owner.id),
+    }
+
+
+async def _bulk_create(
+    client: httpx.AsyncClient, route: str, inputs: list[dict[str, Any]]
+) -> list[UUID]:
+    ids = list[UUID]()
+    for i in range(0, len(inputs), SEED_BATCH_SIZE):
+        resp = await client.post(
+            route, json={"create": inputs[i : i + SEED_BATCH_SIZE]}
+        )
+        resp.raise_for_status()
+        ids.extend(UUID(result["id"]) for result in resp.json())
+    return ids
+
+
+async def seed_owner(
+    client: httpx.AsyncClient, transactions: int, rng: random.Random
+) -> Owner:
+    """
+    Creates an owner with a category and budget per name in CATEGORY_NAMES, a rule
+    per merchant, and the passed number of transactions over the past year.
+    """
+    owner = Owner(id=uuid4(), account=uuid4())
+    owner.categories = await _bulk_create(
+        client,
+        "/categories/bulk",
+        [{"name": name, "owner": str(owner.id)} for name in CATEGORY_NAMES],
+    )
+    await _bulk_create(
+        client,
+        "/budgets/bulk",
+        [
+            {
+                "category": str(category),
+                "amt": rng.randint(50, 1000),
+                "period": rng.choice([1, 1, 3, 12]),
+                "createDate": _datetime(_months_ago(12)),
+                "owner": str(owner.id),
+            }
+            for category in owner.categories
+        ],
+    )
+    rules = [
+        {
+            "priority": priority,
+            "resultCategory": str(rng.choice(owner.categories)),
+            "owner": str(owner.id),
+            "matchName": merchant,
+        }
+        for priority, merchant in enumerate(MERCHANTS)
+    ]
+    rule_ids = await _bulk_create(client, "/rules/bulk", rules)
+    owner.rules = dict(zip(rule_ids, rules))
+    start = _months_ago(12)
+    span = (date.today() - start).days
+    await _bulk_create(
+        client,
+        "/transactions/bulk",
+        [
+            _transaction(owner, rng, start + timedelta(days=rng.randint(0, span)))
+            for _ in range(transactions)
+        ],
+    )
+    owner.transaction_ct = transactions
+    return owner
+
+
+def poll_trends(owner: Owner, rng: random.Random) -> LoadRequest:
+    dates = {"startDt": _months_ago(11).isoformat(), "endDt": date.today().isoformat()}
+    if rng.random() < 0.5:
+        return LoadRequest(
+            "GET /trends/net-income/{ownerId}",
+            "GET",
+            f"/trends/net-income/{owner.id}",
+            params=dates,
+        )
+    return LoadRequest(
+        "GET /trends/category-spend/{ownerId}",
+        "GET",
+        f"/trends/category-spend/{owner.id}",
+        params={"category": str(rng.choice(owner.categories)), **dates},
+    )
+
+
+def get_budget_report(owner: Owner, rng: random.Random) -> LoadRequest:
+    if rng.random() < 0.7:
+        month = _months_ago(rng.randint(0, 11))
+        return LoadRequest(
+            "GET /budgets/by-owner/{ownerId}/{year}/{month}",
+            "GET",
+            f"/budgets/by-owner/{owner.id}/{month.year}/{month.month}",
+        )
+    return LoadRequest(
+        "GET /budgets/by-owner/{ownerId}/range",
+        "GET",
+        f"/budgets/by-owner/{owner.id}/range",
+        params={
+            "startDt": _months_ago(11).isoformat(),
+            "endDt": _months_ago(0).isoformat(),
+        },
+    )
+
+
+def list_transactions(owner: Owner, rng: random.Random) -> LoadRequest:
+    # Any page, not just the first, since deep offsets are the slow ones:
+    pages = max(1, -(-owner.transaction_ct // PAGE_SIZE))
+    return LoadRequest(
+        "POST /transactions/by-owner/{ownerId}",
+        "POST",
+        f"/transactions/by-owner/{owner.id}",
+        params={"page": rng.randint(1, pages), "pageSize": PAGE_SIZE},
+        json={"sorts": [{"field": "date", "direction": "desc"}], "filters": []},
+    )
+
+
+def edit_rule(owner: Owner, rng: random.Random) -> LoadRequest:
+    id, rule = rng.choice(list(owner.rules.items()))
+    rule["resultCategory"] = str(rng.choice(owner.categories))
+    return LoadRequest("PUT /rules/{id}", "PUT", f"/rules/{id}", json=rule)
+
+
+def import_transactions(owner: Owner, rng: random.Random) -> LoadRequest:
+    # Imports land in the current month, which invalidates the owner's cached
+    # reports like a real import would:
+    owner.transaction_ct += IMPORT_SIZE
+    return LoadRequest(
+        "POST /transactions/bulk",
+        "POST",
+        "/transactions/bulk",
+        json={
+            "create": [
+                _transaction(owner, rng, date.today()) for _ in range(IMPORT_SIZE)
+            ]
+        },
+    )
+
+
+Scenario = Callable[[Owner, random.Random], LoadRequest]
+
+SCENARIOS: dict[str, Scenario] = {
+    "trends": poll_trends,
+    "budgets": get_budget_report,
+    "transactions": list_transactions,
+    "rules": edit_rule,
+    "imports": import_transactions,
+}
+DEFAULT_MIX = {
+    "trends": 40,
+    "budgets": 25,
+    "transactions": 25,
+    "rules": 5,
+    "imports": 5,
+}
+
+
+@dataclass
+class EndpointResults:
+    # Of every response, whatever its status:
+    latencies: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    # Requests that got no response, e.g. from timeouts or dropped connections:
+    failures: int = 0
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    owners: list[Owner],
+    mix: dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int | None = None,
+) -> dict[str, EndpointResults]:
+    """
+    Sends requests picked from the mix, weighted, from concurrency workers at
+    once, each waiting for its response before sending another, until duration
+    seconds have passed.
+    """
+    results = defaultdict[str, EndpointResults](EndpointResults)
+    scenarios = [SCENARIOS[name] for name in mix]
+    weights = list(mix.values())
+    deadline = perf_counter() + duration
+
+    async def _worker(rng: random.Random) -> None:
+        while perf_counter() < deadline:
+            [scenario] = rng.choices(scenarios, weights)
+            request = scenario(rng.choice(owners), rng)
+            endpoint = results[request.label]
+            start = perf_counter()
+            try:
+                resp = await client.request(
+                    request.method,
+                    request.url,
+                    params=request.params,
+                    json=request.json,
+                )
+                await resp.aread()
+            except httpx.HTTPError:
+                endpoint.failures += 1
+                continue
+            endpoint.latencies.append(perf_counter() - start)
+            endpoint.statuses[resp.status_code] += 1
+
+    rng = random.Random(seed)
+    await asyncio.gather(
+        *[_worker(random.Random(rng.random())) for _ in range(concurrency)]
+    )
+    return results
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {}
+    # Inclusive, so percentiles never exceed the max. quantiles needs two points:
+    cuts = quantiles(
+        latencies * 2 if len(latencies) == 1 else latencies, n=100, method="inclusive"
+    )
+    return {
+        "p50Ms": round(cuts[49] * 1000, 2),
+        "p90Ms": round(cuts[89] * 1000, 2),
+        "p99Ms": round(cuts[98] * 1000, 2),
+        "maxMs": round(max(latencies) * 1000, 2),
+    }
+
+
+def summarize(results: dict[str, EndpointResults], duration: float) -> dict[str, Any]:
+    """
+    Returns:
+        dict[str, Any]: Requests, errors (error statuses and requests that got no
+        response), responses by status, throughput in responses per second and
+        latency percentiles, for each endpoint and in total.
+    """
+
+    def _summarize(r: EndpointResults) -> dict[str, Any]:
+        return {
+            "requests": len(r.latencies) + r.failures,
+            "errors": r.failures
+            + sum(n for status, n in r.statuses.items() if status >= 400),
+            "statuses": {str(status): n for status, n in sorted(r.statuses.items())},
+            "throughput": round(len(r.latencies) / duration, 2),
+            **_percentiles(r.latencies),
+        }
+
+    total = EndpointResults()
+    for r in results.values():
+        total.latencies.extend(r.latencies)
+        total.failures += r.failures
+        for status, n in r.statuses.items():
+            total.statuses[status] += n
+    return {
+        "endpoints": {label: _summarize(r) for label, r in sorted(results.items())},
+        "total": _summarize(total),
+    }
+
+
+def parse_mix(setting: str) -> dict[str, int]:
+    """
+    Parses a mix like "trends=40,budgets=25", where each weight is relative to the
+    others. Scenarios left out aren't run.
+    """
+    mix = dict[str, int]()
+    for part in setting.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}."
+            )
+        mix[name] = int(weight)
+    return mix
+
+
+async def main_async(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=args.timeout
+    ) as client:
+        print(f"Seeding {args.owners} owners...", file=sys.stderr)
+        owners = await asyncio.gather(
+            *[seed_owner(client, args.transactions, rng) for _ in range(args.owners)]
+        )
+        if args.warmup:
+            print(f"Warming up for {args.warmup}s...", file=sys.stderr)
+            await run_load(client, owners, args.mix, args.concurrency, args.warmup)
+        print(f"Running for {args.duration}s...", file=sys.stderr)
+        start = perf_counter()
+        results = await run_load(
+            client, owners, args.mix, args.concurrency, args.duration, args.seed
+        )
+        elapsed = perf_counter() - start
+    return {
+        "config": {
+            "url": args.url,
+            "concurrency": args.concurrency,
+            "durationSeconds": args.duration,
+            "owners": args.owners,
+            "transactionsPerOwner": args.transactions,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        # Slightly longer than the duration, since requests in flight finish:
+        "elapsedSeconds": round(elapsed, 3),
+        **summarize(results, elapsed),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--owners", type=int, default=4)
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="Weights of the scenarios to run, e.g. trends=40,budgets=25. "
+        f"Defaults to {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}.",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", help="Path to write the JSON report to.")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    if not args.out:
+        print(json.dumps(report, indent=2))
+        return
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{'endpoint':<50}{'req/s':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'errors':>8}")
+    for label, result in [*report["endpoints"].items(), ("total", report["total"])]:
+        print(
+            f"{label:<50}{result['throughput']:>8.1f}"
+            f"{result.get('p50Ms', 0):>9.1f}{result.get('p90Ms', 0):>9.1f}"
+            f"{result.get('p99Ms', 0):>9.1f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Synthetic data for the benchmarks, seeded so every run benchmarks the same data.
+Benchmarks only run when asked for, and those of routes also need the db:
+    pytest tests/benchmarks --run-benchmarks --run-integration-tests
+"""
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from app.domain.category import SYSTEM_CATEGORIES, Category
+from app.domain.core import FilterModel
+from app.domain.rule import Rule
+from app.domain.transaction import Transaction
+
+SIZES = [100, 1_000, 10_000]
+START_DATE = date(2024, 1, 1)
+MERCHANTS = ["Store", "Market", "Cafe", "Station", "Airline", "Landlord", "Power"]
+
+OFX_HEADER = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS>
+<STMTRS><CURDEF>USD<BANKACCTFROM><BANKID>123456
+<ACCTID>123_456-S0200<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST><DTSTART>20240101<DTEND>20241231
+"""
+OFX_FOOTER = """</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+
+def gen_categories(size: int, owner: UUID) -> list[Category]:
+    categories = list[Category]()
+    parent: UUID | None = None
+    for i in range(size):
+        # Every fifth category is a primary one, followed by its subcategories:
+        category = Category(
+            id=uuid4(),
+            name=f"Category {i}",
+            parentCategory=parent if i % 5 else None,
+            owner=owner,
+        )
+        if not i % 5:
+            parent = category.id
+        categories.append(category)
+    return categories
+
+
+def gen_transactions(
+    size: int, categories: list[UUID], seed: int = 0
+) -> list[Transaction[UUID]]:
+    """
+    Generates transactions spread over 2024, mostly debits, in the passed
+    categories.
+    """
+    rng = random.Random(seed)
+    owner, account = uuid4(), uuid4()
+    return [
+        Transaction[UUID](
+            id=uuid4(),
+            fitId=str(i),
+            amt=round(rng.uniform(2, 200), 2),
+            type="credit" if rng.random() < 0.1 else "debit",
+            date=START_DATE + timedelta(days=rng.randint(0, 365)),
+            name=f"{rng.choice(MERCHANTS)} #{rng.randint(1, 99)}",
+            category=rng.choice(categories),
+            account=account,
+            owner=owner,
+        )
+        for i in range(size)
+    ]
+
+
+def gen_rules(size: int, categories: list[UUID], seed: int = 0) -> list[Rule[UUID]]:
+    """
+    Generates rules matching names, amounts, or names, amounts and types, which
+    never match transactions from gen_transactions, so each is checked against
+    every rule.
+    """
+    rng = random.Random(seed)
+    rules = list[Rule[UUID]]()
+    for i in range(size):
+        kind = i % 3
+        rules.append(
+            Rule[UUID](
+                id=uuid4(),
+                priority=i,
+                resultCategory=rng.choice(categories),
+                owner=uuid4(),
+                matchName=(
+                    f"{rng.choice(MERCHANTS)} #{rng.randint(100, 199)}"
+                    if kind != 1
+                    else None
+                ),
+                matchAmt=(
+                    f"{rng.choice(['>', '>=', '='])}{rng.randint(201, 400)}"
+                    if kind != 0
+                    else None
+                ),
+                matchType="credit" if kind == 2 else None,
+            )
+        )
+    return rules
+
+
+def gen_filters(size: int, seed: int = 0) -> list[FilterModel]:
+    """
+    Generates filters with string terms of each type preprocess_filters parses.
+    """
+    rng = random.Random(seed)
+    terms = [
+        lambda: f"{rng.uniform(0, 1000):.2f}",
+        lambda: str(rng.randint(0, 1000)),
+        lambda: (START_DATE + timedelta(days=rng.randint(0, 365))).isoformat(),
+        lambda: rng.choice(MERCHANTS),
+    ]
+    return [
+        FilterModel(field=f"field{i}", op=">=", term=terms[i % len(terms)]())
+        for i in range(size)
+    ]
+
+
+def write_ofx_file(
+    path: Path, size: int, newlines: bool = False, seed: int = 0
+) -> Path:
+    """
+    Writes an OFX file of transactions, with each on one line, or with each of
+    their elements on its own line if newlines is set.
+    """
+    rng = random.Random(seed)
+    sep = "\n" if newlines else ""
+    rows = list[str]()
+    for i in range(size):
+        posted = START_DATE + timedelta(days=rng.randint(0, 365))
+        amt = rng.uniform(-200, 200)
+        rows.append(
+            sep.join(
+                [
+                    "<STMTTRN>",
+                    f"<TRNTYPE>{'CREDIT' if amt > 0 else 'DEBIT'}",
+                    f"<DTPOSTED>{posted:%Y%m%d}000000",
+                    f"<TRNAMT>{amt:.2f}",
+                    f"<FITID>789_1011-S0200|{i}",
+                    f"<NAME>{rng.choice(MERCHANTS)}",
+                    "<MEMO>DebitCard, Withdrawal, Processed",
+                    "</STMTTRN>",
+                ]
+            )
+        )
+    path.write_text(OFX_HEADER + "\n".join(rows) + "\n" + OFX_FOOTER)
+    return path
+
+
+def category_ids(size: int) -> list[UUID]:
+    """
+    Returns:
+        list[UUID]: Ids of the system categories and some owned ones, so
+        transactions spread over a realistic number of categories.
+    """
+    return [cat.id for cat in SYSTEM_CATEGORIES] + [
+        uuid4() for _ in range(max(5, size // 100))
+    ]
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.routes.utils import preprocess_filters
+from app.storage.ofx import read_ofx_file
+from tests.benchmarks.data import SIZES, gen_filters, write_ofx_file
+
+
+@pytest.mark.benchmark(group="read_ofx_file")
+@pytest.mark.parametrize("newlines", [False, True], ids=["one-line", "newlines"])
+@pytest.mark.parametrize("size", SIZES)
+def test_read_ofx_file(
+    benchmark: BenchmarkFixture, tmp_path: Path, size: int, newlines: bool
+):
+    path = write_ofx_file(tmp_path / "transactions.ofx", size, newlines)
+    result = benchmark(read_ofx_file, path)
+    assert len(result.transactions) == size
+
+
+@pytest.mark.benchmark(group="preprocess_filters")
+@pytest.mark.parametrize("size", [10, 100, 1_000])
+def test_preprocess_filters(benchmark: BenchmarkFixture, size: int):
+    # Filters are parsed in place, so each round needs new ones:
+    result = benchmark.pedantic(
+        preprocess_filters,
+        setup=lambda: ((gen_filters(size),), {}),
+        rounds=50,
+    )
+    assert len(result) == size
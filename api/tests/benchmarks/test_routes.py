@@ -0,0 +1,150 @@
+import json
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.core import create_app
+from app.domain.category import SYSTEM_CATEGORIES
+from app.routes.cache import LRUCacheBackend
+from app.storage.db import MenthaDB
+from tests.benchmarks.data import gen_transactions
+
+PAGE_SIZE = 50
+
+
+@dataclass
+class SeededOwner:
+    id: UUID
+    categories: list[UUID]
+    transaction_ct: int
+
+
+@pytest.fixture(scope="module")
+def bench_client(mentha_db: MenthaDB) -> TestClient:
+    # Doesn't cache reports, so each call computes them:
+    app = create_app(
+        mentha_db, cache_backend=LRUCacheBackend(max_size=0), query_budgets="raise"
+    )
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module", params=[100, 1_000, 10_000])
+def seeded_owner(
+    request: pytest.FixtureRequest, bench_client: TestClient
+) -> SeededOwner:
+    """
+    An owner with ten categories, a budget for each, and the param's number of
+    transactions in them over 2024.
+    """
+    owner = uuid4()
+    categories = [{"name": f"Category {i}", "owner": str(owner)} for i in range(10)]
+    resp = bench_client.post("/categories/bulk", json={"create": categories})
+    assert resp.status_code == 200
+    cat_ids = [UUID(result["id"]) for result in resp.json()]
+    budgets = [
+        {
+            "category": str(cat),
+            "amt": 100 * (i + 1),
+            "period": 1 if i % 2 else 3,
+            "createDate": "2024-01-01T00:00:00",
+            "owner": str(owner),
+        }
+        for i, cat in enumerate(cat_ids)
+    ]
+    assert bench_client.post("/budgets/bulk", json={"create": budgets}).is_success
+    # Inputs take datetimes, where the domain models have dates:
+    transactions = [
+        {
+            **json.loads(trn.model_dump_json(exclude={"id"})),
+            "date": f"{trn.date}T00:00:00",
+            "owner": str(owner),
+        }
+        for trn in gen_transactions(request.param, cat_ids)
+    ]
+    resp = bench_client.post("/transactions/bulk", json={"create": transactions})
+    assert resp.status_code == 200
+    return SeededOwner(owner, cat_ids, request.param)
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(group="routes")
+@pytest.mark.parametrize("page", ["first", "last"])
+def test_get_transactions_by_owner(
+    benchmark: BenchmarkFixture,
+    bench_client: TestClient,
+    seeded_owner: SeededOwner,
+    page: str,
+):
+    last = -(-seeded_owner.transaction_ct // PAGE_SIZE)
+    resp = benchmark(
+        bench_client.post,
+        f"/transactions/by-owner/{seeded_owner.id}",
+        params={"page": 1 if page == "first" else last, "pageSize": PAGE_SIZE},
+        json={"sorts": [{"field": "date", "direction": "desc"}], "filters": []},
+    )
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(group="routes")
+def test_get_net_income(
+    benchmark: BenchmarkFixture, bench_client: TestClient, seeded_owner: SeededOwner
+):
+    resp = benchmark(
+        bench_client.get,
+        f"/trends/net-income/{seeded_owner.id}",
+        params={"startDt": "2024-01-01", "endDt": "2024-12-31"},
+    )
+    assert len(resp.json()) == 12
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(group="routes")
+def test_get_category_spending(
+    benchmark: BenchmarkFixture, bench_client: TestClient, seeded_owner: SeededOwner
+):
+    resp = benchmark(
+        bench_client.get,
+        f"/trends/category-spend/{seeded_owner.id}",
+        params={
+            "category": str(seeded_owner.categories[0]),
+            "startDt": "2024-01-01",
+            "endDt": "2024-12-31",
+        },
+    )
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(group="routes")
+def test_get_budget_report(
+    benchmark: BenchmarkFixture, bench_client: TestClient, seeded_owner: SeededOwner
+):
+    resp = benchmark(bench_client.get, f"/budgets/by-owner/{seeded_owner.id}/2024/6")
+    assert resp.status_code == 200
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(group="routes")
+def test_get_budget_range(
+    benchmark: BenchmarkFixture, bench_client: TestClient, seeded_owner: SeededOwner
+):
+    resp = benchmark(
+        bench_client.get,
+        f"/budgets/by-owner/{seeded_owner.id}/range",
+        params={"startDt": "2024-01-01", "endDt": "2024-12-31"},
+    )
+    assert len(resp.json()) == 12
+
+
+@pytest.mark.integration
+@pytest.mark.benchmark(group="routes")
+def test_get_categories(
+    benchmark: BenchmarkFixture, bench_client: TestClient, seeded_owner: SeededOwner
+):
+    resp = benchmark(bench_client.get, f"/categories/by-owner/{seeded_owner.id}/all")
+    # System categories are listed with the owner's:
+    assert len(resp.json()) == 10 + len(SYSTEM_CATEGORIES)
@@ -0,0 +1,36 @@
+from uuid import UUID
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.domain.rule import Rule, check_rule_against_transaction
+from app.domain.transaction import Transaction
+from tests.benchmarks.data import SIZES, category_ids, gen_rules, gen_transactions
+
+
+def categorize(rules: list[Rule[UUID]], transactions: list[Transaction[UUID]]) -> int:
+    """
+    Checks each transaction against the rules until one matches, like applying
+    rules and importing do.
+    """
+    matched = 0
+    for trn in transactions:
+        for rule in rules:
+            if check_rule_against_transaction(rule, trn):
+                matched += 1
+                break
+    return matched
+
+
+@pytest.mark.benchmark(group="check_rule_against_transaction")
+@pytest.mark.parametrize("transactions", SIZES)
+@pytest.mark.parametrize("rules", [1, 10, 100])
+def test_check_rules(benchmark: BenchmarkFixture, rules: int, transactions: int):
+    categories = category_ids(transactions)
+    result = benchmark(
+        categorize,
+        gen_rules(rules, categories),
+        gen_transactions(transactions, categories),
+    )
+    # None match, so every transaction is checked against every rule:
+    assert result == 0
@@ -0,0 +1,27 @@
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.storage.db import MenthaDB, MenthaDBConfig
+from tests.benchmarks.data import SIZES, category_ids, gen_transactions
+
+# Loading and dumping models doesn't touch the db, so it needn't exist:
+DB = MenthaDB(MenthaDBConfig(user="u", pwd="p", host="localhost:1"))
+
+
+@pytest.mark.benchmark(group="MenthaTable.load_row")
+@pytest.mark.parametrize("size", SIZES)
+def test_load_row(benchmark: BenchmarkFixture, size: int):
+    table = DB.transactions
+    transactions = gen_transactions(size, category_ids(size))
+    rows = [table.dump_model(trn) for trn in transactions]
+    result = benchmark(lambda: [table.load_row(row) for row in rows])
+    assert result == transactions
+
+
+@pytest.mark.benchmark(group="MenthaTable.dump_model")
+@pytest.mark.parametrize("size", SIZES)
+def test_dump_model(benchmark: BenchmarkFixture, size: int):
+    table = DB.transactions
+    transactions = gen_transactions(size, category_ids(size))
+    result = benchmark(lambda: [table.dump_model(trn) for trn in transactions])
+    assert len(result) == size
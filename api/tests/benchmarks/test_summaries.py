@@ -0,0 +1,51 @@
+from uuid import uuid4
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.routes.utils import (
+    assemble_primary_categories,
+    summarize_transactions_by_category,
+    summarize_transactions_by_month,
+    summarizer_category_spending,
+    summarizer_net_income,
+)
+from tests.benchmarks.data import SIZES, category_ids, gen_categories, gen_transactions
+
+
+@pytest.mark.benchmark(group="summarize_transactions_by_month")
+@pytest.mark.parametrize("size", SIZES)
+def test_summarize_net_income_by_month(benchmark: BenchmarkFixture, size: int):
+    transactions = gen_transactions(size, category_ids(size))
+    result = benchmark(
+        summarize_transactions_by_month, transactions, summarizer_net_income
+    )
+    assert len(result) == 12
+
+
+@pytest.mark.benchmark(group="summarize_transactions_by_month")
+@pytest.mark.parametrize("size", SIZES)
+def test_summarize_category_spending_by_month(benchmark: BenchmarkFixture, size: int):
+    # Category spending is summarized for one category at a time:
+    transactions = gen_transactions(size, [uuid4()])
+    result = benchmark(
+        summarize_transactions_by_month, transactions, summarizer_category_spending
+    )
+    assert len(result) == 12
+
+
+@pytest.mark.benchmark(group="summarize_transactions_by_category")
+@pytest.mark.parametrize("size", SIZES)
+def test_summarize_by_category(benchmark: BenchmarkFixture, size: int):
+    categories = category_ids(size)
+    result = benchmark(
+        summarize_transactions_by_category, gen_transactions(size, categories)
+    )
+    assert set(result) <= set(categories)
+
+
+@pytest.mark.benchmark(group="assemble_primary_categories")
+@pytest.mark.parametrize("size", SIZES)
+def test_assemble_primary_categories(benchmark: BenchmarkFixture, size: int):
+    result = benchmark(assemble_primary_categories, gen_categories(size, uuid4()))
+    assert len(result) == size // 5
@@ -7,6 +7,7 @@ from fastapi.testclient import TestClient
 
 from app.core import create_app
 from app.storage.db import MenthaDB, MenthaDBConfig
+from app.storage.query_count import QueryCount, count_queries
 
 
 def pytest_addoption(parser: pytest.Parser):
@@ -16,6 +17,17 @@ def pytest_addoption(parser: pytest.Parser):
         default=False,
         help="include integration tests",
     )
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="include benchmarks, which need pytest-benchmark",
+    )
+    parser.addoption(
+        "--replica-host",
+        default=None,
+        help="host of a read replica of the test db's server, for replica tests",
+    )
 
 
 # Integration test marker config
@@ -27,18 +39,22 @@ def pytest_configure(config: pytest.Config):
 
 
 def pytest_collection_modifyitems(config: pytest.Config, items: Iterable[pytest.Item]):
-    if config.getoption("--run-integration-tests"):
-        return
+    run_integration_tests = config.getoption("--run-integration-tests")
     skip_integration_tests = pytest.mark.skip(
         reason="need --run-integration-tests option to run"
     )
+    # Benchmarks are any tests using pytest-benchmark's benchmark fixture:
+    run_benchmarks = config.getoption("--run-benchmarks")
+    skip_benchmarks = pytest.mark.skip(reason="need --run-benchmarks option to run")
     for item in items:
-        if "integration" in item.keywords:
+        if "integration" in item.keywords and not run_integration_tests:
             item.add_marker(skip_integration_tests)
+        if "benchmark" in getattr(item, "fixturenames", ()) and not run_benchmarks:
+            item.add_marker(skip_benchmarks)
 
 
 @pytest.fixture(scope="session")
-def mentha_client() -> Generator[TestClient, None, None]:
+def mentha_db() -> Generator[MenthaDB, None, None]:
     conf = MenthaDBConfig(user="postgres", pwd="test", host="localhost:5432")
     db_url = MenthaDB.construct_db_url(conf)
     test_db_name = "mentha-db-test"
@@ -56,10 +72,7 @@ def mentha_client() -> Generator[TestClient, None, None]:
     md.create_all(bind=test_engine)
 
     db = MenthaDB(conf)
-    app = create_app(db)
-    client = TestClient(app=app)
-    yield client
-    client.close()
+    yield db
     test_engine.dispose()
     db.dispose()
     with src_engine.connect() as conn:
@@ -67,6 +80,46 @@ def mentha_client() -> Generator[TestClient, None, None]:
     src_engine.dispose()
 
 
+@pytest.fixture(scope="session")
+def replica_db(
+    request: pytest.FixtureRequest, mentha_db: MenthaDB
+) -> Generator[MenthaDB, None, None]:
+    host = request.config.getoption("--replica-host")
+    if host is None:
+        pytest.skip("need --replica-host option to run")
+    # Replicas replay the test db created by mentha_db from the primary:
+    db = MenthaDB(
+        MenthaDBConfig(
+            user="postgres",
+            pwd="test",
+            host="localhost:5432",
+            dbname="mentha-db-test",
+            replica_hosts=(host,),
+        )
+    )
+    yield db
+    db.dispose()
+
+
+@pytest.fixture(scope="session")
+def mentha_client(mentha_db: MenthaDB) -> Generator[TestClient, None, None]:
+    # Fails tests of routes going over their query budgets:
+    app = create_app(mentha_db, query_budgets="raise")
+    client = TestClient(app=app)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def query_counts() -> Generator[QueryCount, None, None]:
+    """
+    Counts the statements executed by the test, and by each request it makes,
+    for asserting on with QueryCount.for_request.
+    """
+    with count_queries() as count:
+        yield count
+
+
 @pytest.fixture(scope="session")
 def owner() -> UUID:
     return uuid4()
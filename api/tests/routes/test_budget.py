@@ -0,0 +1,133 @@
+import json
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.budget import BudgetReport, BudgetReportByMonth
+from app.domain.category import INCOME, TRANSFER, UNCATEGORIZED
+from app.storage.query_count import QueryCount
+
+
+def _post(client: TestClient, route: str, body: dict) -> UUID:
+    resp = client.post(route, json=body)
+    assert resp.status_code == 200
+    return UUID(json.loads(resp.content))
+
+
+@pytest.fixture(scope="module")
+def budget_owner(mentha_client: TestClient) -> tuple[UUID, UUID, UUID]:
+    owner = str(uuid4())
+    groceries = _post(
+        mentha_client,
+        "/categories/",
+        {"name": "Groceries", "owner": owner, "parentCategory": None},
+    )
+    salary = _post(
+        mentha_client,
+        "/categories/",
+        {"name": "Salary", "owner": owner, "parentCategory": str(INCOME.id)},
+    )
+    for cat, amt, period, dt in [
+        (groceries, 300, 1, "2024-01-01"),
+        (salary, 1000, 1, "2024-01-01"),
+        (salary, 90, 3, "2023-12-01"),
+    ]:
+        _post(
+            mentha_client,
+            "/budgets/",
+            {
+                "category": str(cat),
+                "amt": amt,
+                "period": period,
+                "createDate": f"{dt}T00:00:00",
+                "owner": owner,
+            },
+        )
+    account = str(uuid4())
+    for cat, amt, type, dt in [
+        (groceries, 100, "debit", "2024-01-02"),
+        (groceries, 50.25, "debit", "2024-01-31"),
+        (groceries, 999, "debit", "2024-02-01"),
+        (salary, 1000, "credit", "2024-01-15"),
+        (UNCATEGORIZED.id, 20, "debit", "2024-01-20"),
+        (UNCATEGORIZED.id, 12.5, "debit", "2024-03-20"),
+        (TRANSFER.id, 500, "debit", "2024-01-20"),
+    ]:
+        _post(
+            mentha_client,
+            "/transactions/",
+            {
+                "fitId": str(uuid4()),
+                "amt": amt,
+                "type": type,
+                "date": f"{dt}T00:00:00",
+                "name": "test",
+                "category": str(cat),
+                "account": account,
+                "owner": owner,
+            },
+        )
+    return UUID(owner), groceries, salary
+
+
+@pytest.mark.integration
+def test_get_allocated_budgets_by_month(
+    mentha_client: TestClient,
+    budget_owner: tuple[UUID, UUID, UUID],
+    query_counts: QueryCount,
+):
+    owner, groceries, salary = budget_owner
+    resp = mentha_client.get(f"/budgets/by-owner/{owner}/2024/1")
+    assert resp.status_code == 200
+    report = BudgetReport.model_validate_json(resp.content)
+    assert [(b.category.id, b.allocatedAmt) for b in report.budgets] == [
+        (groceries, 150.25)
+    ]
+    # Only the oldest budget for a category is allocated its transactions:
+    assert [(b.amt, b.allocatedAmt) for b in report.income] == [(90, 1000), (1000, 0)]
+    assert [(b.category.id, b.allocatedAmt) for b in report.other] == [
+        (UNCATEGORIZED.id, 20)
+    ]
+    assert report.budgetedExpenses == 300
+    assert report.budgetedIncome == 1030
+    assert report.actualExpenses == 170.25
+    assert report.actualIncome == 1000
+    assert report.anticipatedNet == 1620
+    assert query_counts.for_request(
+        "GET /budgets/by-owner/{ownerId}/{year}/{month}"
+    ) == [2]
+
+
+@pytest.mark.integration
+def test_get_allocated_budgets_by_range(
+    mentha_client: TestClient,
+    budget_owner: tuple[UUID, UUID, UUID],
+    query_counts: QueryCount,
+):
+    owner = budget_owner[0]
+    resp = mentha_client.get(
+        f"/budgets/by-owner/{owner}/range",
+        params={"startDt": "2023-12-01", "endDt": "2024-04-30"},
+    )
+    assert resp.status_code == 200
+    # Every month's report is read in the same few queries:
+    assert query_counts.for_request("GET /budgets/by-owner/{ownerId}/range") == [3]
+    reports = [BudgetReportByMonth.model_validate(r) for r in json.loads(resp.content)]
+    assert len(reports) == 5
+    for report in reports:
+        month = report.month
+        resp = mentha_client.get(
+            f"/budgets/by-owner/{owner}/{month.year}/{month.month}"
+        )
+        expected = BudgetReport.model_validate_json(resp.content)
+        # Budgets with no matching transactions get random ids:
+        for bgt in [*expected.other, *report.other]:
+            bgt.id = UNCATEGORIZED.id
+        assert BudgetReport.model_validate(dict(report)) == expected
+
+    resp = mentha_client.get(
+        f"/budgets/by-owner/{owner}/range",
+        params={"startDt": "2024-04-01", "endDt": "2024-01-01"},
+    )
+    assert resp.status_code == 400
@@ -1,13 +1,16 @@
 import json
 import pytest
 from fastapi.testclient import TestClient
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from app.domain.category import Category
+from app.domain.category import SYSTEM_CATEGORIES, Category
+from app.storage.query_count import QueryCount
 
 
 @pytest.mark.integration
-def test_category_crud(mentha_client: TestClient, owner: UUID):
+def test_category_crud(
+    mentha_client: TestClient, owner: UUID, query_counts: QueryCount
+):
     resp = mentha_client.post(
         "/categories/",
         json={"name": "Test", "owner": str(owner), "parentCategory": None},
@@ -19,3 +22,75 @@ def test_category_crud(mentha_client: TestClient, owner: UUID):
     model = Category.model_validate_json(resp.content)
     assert model.name == "Test"
     assert model.owner == owner
+    assert query_counts.for_request("POST /categories/") == [2]
+    assert query_counts.for_request("GET /categories/{id}") == [1]
+
+    resp = mentha_client.get(f"/categories/by-owner/{owner}/flat")
+    assert resp.status_code == 200
+    flat = [Category.model_validate(c) for c in resp.json()]
+    assert model in flat
+    assert flat[-len(SYSTEM_CATEGORIES) :] == SYSTEM_CATEGORIES
+    assert query_counts.for_request("GET /categories/by-owner/{ownerId}/flat") == [2]
+
+
+@pytest.mark.integration
+def test_categories_conditional_get(
+    mentha_client: TestClient, query_counts: QueryCount
+):
+    owner = uuid4()
+    route = f"/categories/by-owner/{owner}/all"
+    resp = mentha_client.get(route)
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    resp = mentha_client.get(route, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    # Writes for other owners don't invalidate the ETag:
+    mentha_client.post(
+        "/categories/",
+        json={"name": "Other", "owner": str(uuid4()), "parentCategory": None},
+    )
+    resp = mentha_client.get(route, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    mentha_client.post(
+        "/categories/",
+        json={"name": "Test", "owner": str(owner), "parentCategory": None},
+    )
+    resp = mentha_client.get(route, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert "Test" in [cat["name"] for cat in resp.json()]
+    # 304s only look up the owner's data version:
+    assert query_counts.for_request("GET /categories/by-owner/{ownerId}/all") == [
+        2,
+        1,
+        1,
+        2,
+    ]
+
+
+@pytest.mark.integration
+def test_update_category(mentha_client: TestClient, query_counts: QueryCount):
+    owner = str(uuid4())
+    body = {"name": "Rent", "owner": owner, "parentCategory": None}
+    resp = mentha_client.post("/categories/", json=body)
+    cat_id = UUID(json.loads(resp.content))
+
+    route = f"/categories/by-owner/{owner}/all"
+    etag = mentha_client.get(route).headers["ETag"]
+    resp = mentha_client.put(f"/categories/{cat_id}", json=body)
+    assert resp.status_code == 200
+    assert Category.model_validate_json(resp.content).name == "Rent"
+    # No-op updates don't write, so the owner's data version doesn't change:
+    assert mentha_client.get(route, headers={"If-None-Match": etag}).status_code == 304
+
+    resp = mentha_client.put(f"/categories/{cat_id}", json={**body, "name": "Housing"})
+    assert resp.status_code == 200
+    assert Category.model_validate_json(resp.content).name == "Housing"
+    resp = mentha_client.get(f"/categories/{cat_id}")
+    assert Category.model_validate_json(resp.content).name == "Housing"
+
+    resp = mentha_client.put(f"/categories/{uuid4()}", json=body)
+    assert resp.status_code == 404
+    # Updates are a single conditional UPDATE, plus the data version if it wrote:
+    assert query_counts.for_request("PUT /categories/{id}") == [1, 2, 1]
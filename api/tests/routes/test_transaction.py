@@ -0,0 +1,261 @@
+import json
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.category import Category, UNCATEGORIZED
+from app.domain.core import BulkResult, PagedResultsModel
+from app.domain.transaction import (
+    ColumnarTransactionResults,
+    CompactTransactionResults,
+    Transaction,
+)
+from app.storage import importer
+from app.storage.query_count import QueryCount
+
+
+@pytest.mark.integration
+def test_get_transactions_by_owner(mentha_client: TestClient, query_counts: QueryCount):
+    owner = uuid4()
+    resp = mentha_client.post(
+        "/categories/",
+        json={"name": "Groceries", "owner": str(owner), "parentCategory": None},
+    )
+    cat_id = UUID(json.loads(resp.content))
+    for name, category in [("Store", str(cat_id)), ("Mystery", None)]:
+        resp = mentha_client.post(
+            "/transactions/",
+            json={
+                "fitId": name,
+                "amt": 12.34,
+                "type": "debit",
+                "date": "2024-01-15T00:00:00",
+                "name": name,
+                "category": category,
+                "account": str(uuid4()),
+                "owner": str(owner),
+            },
+        )
+        assert resp.status_code == 200
+
+    resp = mentha_client.post(
+        f"/transactions/by-owner/{owner}",
+        json={"sorts": [{"field": "name"}], "filters": []},
+    )
+    assert resp.status_code == 200
+    result = PagedResultsModel[Transaction[Category]].model_validate_json(resp.content)
+    assert result.totalHitCount == 2
+    mystery, store = result.results
+    # System categories aren't stored in the db but still need to be joined:
+    assert mystery.category == UNCATEGORIZED
+    assert store.category == Category(id=cat_id, name="Groceries", owner=owner)
+
+    resp = mentha_client.post(
+        f"/transactions/by-owner/{owner}",
+        params={"format": "compact"},
+        json={"sorts": [{"field": "name"}], "filters": []},
+    )
+    compact = CompactTransactionResults.model_validate_json(resp.content)
+    assert [t.category for t in compact.results] == [UNCATEGORIZED.id, cat_id]
+    assert compact.categories == [mystery.category, store.category]
+
+    resp = mentha_client.post(
+        f"/transactions/by-owner/{owner}",
+        params={"format": "columnar"},
+        json={"sorts": [{"field": "name"}], "filters": []},
+    )
+    columnar = ColumnarTransactionResults.model_validate_json(resp.content)
+    assert columnar.results["name"] == ["Mystery", "Store"]
+    assert columnar.categories == compact.categories
+    # Categories are joined in the same query, rather than fetched per transaction:
+    assert query_counts.for_request("POST /transactions/by-owner/{ownerId}") == [2] * 3
+
+
+@pytest.mark.integration
+def test_export_transactions(mentha_client: TestClient, query_counts: QueryCount):
+    owner = uuid4()
+    for i in range(3):
+        resp = mentha_client.post(
+            "/transactions/",
+            json={
+                "fitId": str(i),
+                "amt": i + 1,
+                "type": "debit",
+                "date": f"2024-01-0{i + 1}T00:00:00",
+                "name": f"Export {i}",
+                "category": None,
+                "account": str(uuid4()),
+                "owner": str(owner),
+            },
+        )
+        assert resp.status_code == 200
+
+    resp = mentha_client.post(
+        f"/transactions/export/{owner}",
+        json={"filters": [{"field": "amt", "op": ">", "term": 1}]},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    exported = [
+        Transaction[UUID].model_validate_json(line)
+        for line in resp.content.splitlines()
+    ]
+    assert [t.name for t in exported] == ["Export 1", "Export 2"]
+
+    resp = mentha_client.post(
+        f"/transactions/export/{owner}",
+        params={"format": "csv", "gzip": True},
+        json={},
+    )
+    assert resp.headers["content-encoding"] == "gzip"
+    # The test client decompresses the response:
+    lines = resp.content.decode().splitlines()
+    assert lines[0] == ",".join(Transaction.model_fields)
+    assert len(lines) == 4
+    # Exports are streamed from a single query however many records they have:
+    assert query_counts.for_request("POST /transactions/export/{ownerId}") == [1, 1]
+
+
+@pytest.mark.integration
+def test_bulk_transactions(mentha_client: TestClient, query_counts: QueryCount):
+    owner, account = str(uuid4()), str(uuid4())
+
+    def _input(name: str, id: UUID | None = None) -> dict:
+        return {
+            "id": str(id) if id else None,
+            "fitId": name,
+            "amt": 1,
+            "type": "debit",
+            "date": "2024-01-01T00:00:00",
+            "name": name,
+            "category": None,
+            "account": account,
+            "owner": owner,
+        }
+
+    resp = mentha_client.post(
+        "/transactions/bulk",
+        json={"create": [_input("a"), _input("b"), _input("c")]},
+    )
+    assert resp.status_code == 200
+    created = [BulkResult.model_validate(r) for r in json.loads(resp.content)]
+    assert [r.status for r in created] == ["created"] * 3
+    a, b, c = [r.id for r in created]
+
+    missing = uuid4()
+    resp = mentha_client.post(
+        "/transactions/bulk",
+        json={
+            "create": [_input("d")],
+            "update": [_input("a2", a), _input("b", b), _input("x", missing)],
+            "delete": [str(c), str(missing)],
+        },
+    )
+    assert resp.status_code == 200
+    results = [BulkResult.model_validate(r) for r in json.loads(resp.content)]
+    assert [(r.id, r.status) for r in results[1:]] == [
+        (a, "updated"),
+        (b, "unchanged"),
+        (missing, "notFound"),
+        (c, "deleted"),
+        (missing, "notFound"),
+    ]
+    resp = mentha_client.post(
+        f"/transactions/by-owner/{owner}",
+        json={"sorts": [{"field": "name"}], "filters": []},
+    )
+    result = PagedResultsModel[Transaction[Category]].model_validate_json(resp.content)
+    assert [t.name for t in result.results] == ["a2", "b", "d"]
+
+    resp = mentha_client.post("/transactions/bulk", json={"update": [_input("e")]})
+    assert resp.status_code == 422
+    # Each kind of write is one statement, however many records it has:
+    assert query_counts.for_request("POST /transactions/bulk") == [2, 5, 0]
+
+
+@pytest.mark.integration
+def test_apply_rules(mentha_client: TestClient, query_counts: QueryCount):
+    owner = str(uuid4())
+    resp = mentha_client.post(
+        "/categories/",
+        json={"name": "Groceries", "owner": owner, "parentCategory": None},
+    )
+    cat_id = json.loads(resp.content)
+    mentha_client.post(
+        "/rules/",
+        json={
+            "priority": 1,
+            "resultCategory": cat_id,
+            "owner": owner,
+            "matchName": "Store",
+        },
+    )
+    for i in range(5):
+        mentha_client.post(
+            "/transactions/",
+            json={
+                "fitId": str(i),
+                "amt": 1,
+                "type": "debit",
+                "date": "2024-01-01T00:00:00",
+                "name": "Store" if i % 2 else "Other",
+                "category": None,
+                "account": str(uuid4()),
+                "owner": owner,
+            },
+        )
+    assert query_counts.for_request("POST /transactions/") == [2] * 5
+
+    resp = mentha_client.put(f"/transactions/apply-rules/{owner}")
+    assert resp.status_code == 200
+    # The rules and the owner's transactions are queried, and then the matches are
+    # updated in bulk, with the data version, rather than a statement per transaction:
+    assert query_counts.for_request("PUT /transactions/apply-rules/{ownerId}") == [6]
+    resp = mentha_client.post(
+        f"/transactions/by-owner/{owner}",
+        params={"format": "compact"},
+        json={"sorts": [{"field": "fitId"}], "filters": []},
+    )
+    result = CompactTransactionResults.model_validate_json(resp.content)
+    assert [t.category == UUID(cat_id) for t in result.results] == [
+        False,
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+@pytest.mark.integration
+def test_import_transactions(
+    mentha_client: TestClient,
+    query_counts: QueryCount,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    inbox = tmp_path.joinpath("inbox")
+    monkeypatch.setattr(importer, "INBOX", inbox)
+    monkeypatch.setattr(importer, "COMPLETE", tmp_path.joinpath("complete"))
+    owner, bank_id = uuid4(), str(uuid4())
+    resp = mentha_client.post("/institutions/", json={"name": "Bank", "fitId": bank_id})
+    assert resp.status_code == 200
+    # Two statements for the same account:
+    ofx = Path("tests/samples/acct_trns.ofx").read_text()
+    ofx = ofx.replace("<BANKID>123456", f"<BANKID>{bank_id}")
+    inbox.mkdir()
+
+    def _import() -> str:
+        for name in ["a.ofx", "b.ofx"]:
+            inbox.joinpath(name).write_text(ofx)
+        resp = mentha_client.post(f"/transactions/import/{owner}")
+        assert resp.status_code == 200
+        assert list(inbox.iterdir()) == []
+        return json.loads(resp.content)
+
+    assert _import().endswith("0 transactions already existed.")
+    assert _import().startswith("Imported 0 transactions.")
+    # Files are looked up and written together, rather than a few queries each, and
+    # the second import finds its account and writes nothing:
+    assert query_counts.for_request("POST /transactions/import/{ownerId}") == [11, 7]
@@ -0,0 +1,64 @@
+import json
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.category import UNCATEGORIZED, Category
+from app.domain.trend import CategorySpendingByMonth, NetIncomeByMonth
+from app.storage.query_count import QueryCount
+
+
+@pytest.mark.integration
+def test_trends(mentha_client: TestClient, query_counts: QueryCount):
+    owner, account = str(uuid4()), str(uuid4())
+    resp = mentha_client.post(
+        "/categories/",
+        json={"name": "Groceries", "owner": owner, "parentCategory": None},
+    )
+    groceries = UUID(json.loads(resp.content))
+    for cat, amt, type, dt in [
+        (groceries, 100, "debit", "2024-01-02"),
+        (groceries, 50, "debit", "2024-02-01"),
+        (UNCATEGORIZED.id, 1000, "credit", "2024-01-15"),
+    ]:
+        mentha_client.post(
+            "/transactions/",
+            json={
+                "fitId": str(uuid4()),
+                "amt": amt,
+                "type": type,
+                "date": f"{dt}T00:00:00",
+                "name": "test",
+                "category": str(cat),
+                "account": account,
+                "owner": owner,
+            },
+        )
+    params = {"startDt": "2024-01-01", "endDt": "2024-02-29"}
+
+    route = f"/trends/net-income/{owner}"
+    resp = mentha_client.get(route, params=params)
+    assert resp.status_code == 200
+    net = [NetIncomeByMonth.model_validate(n) for n in resp.json()]
+    assert [n.net for n in net] == [900, -50]
+    # Repeats are answered from the report cache:
+    assert mentha_client.get(route, params=params).json() == resp.json()
+    assert query_counts.for_request("GET /trends/net-income/{ownerId}") == [2, 1]
+
+    route = f"/trends/category-spend/{owner}"
+    resp = mentha_client.get(route, params={**params, "category": str(groceries)})
+    assert resp.status_code == 200
+    spending = [
+        CategorySpendingByMonth[Category].model_validate(s) for s in resp.json()
+    ]
+    assert [(s.category.id, s.amt) for s in spending] == [
+        (groceries, 100),
+        (groceries, 50),
+    ]
+    # System categories aren't looked up:
+    resp = mentha_client.get(
+        route, params={**params, "category": str(UNCATEGORIZED.id)}
+    )
+    assert resp.status_code == 200
+    assert query_counts.for_request("GET /trends/category-spend/{ownerId}") == [3, 2]
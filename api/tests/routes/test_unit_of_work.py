@@ -0,0 +1,54 @@
+import time
+
+import pytest
+import sqlalchemy as sa
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes.unit_of_work import (
+    READ_YOUR_WRITES_HEADER,
+    WRITTEN_AT_COOKIE,
+    ReadYourWrites,
+    RequestUnitOfWork,
+    read_only,
+)
+from app.storage.db import MenthaDB
+
+
+def _create_app(db: MenthaDB) -> FastAPI:
+    app = FastAPI(dependencies=[Depends(RequestUnitOfWork(db))])
+    app.add_middleware(ReadYourWrites)
+    in_recovery = sa.select(sa.func.pg_is_in_recovery().label("in_recovery"))
+
+    # Replicas are in recovery, and the primary isn't:
+    async def reads_replica() -> bool:
+        return (await db.categories.select_async(in_recovery))[0]["in_recovery"]
+
+    app.add_api_route("/reads", reads_replica, methods=["GET"])
+    app.add_api_route("/writes", reads_replica, methods=["POST"])
+    app.add_api_route(
+        "/queries", reads_replica, methods=["POST"], openapi_extra=read_only()
+    )
+    return app
+
+
+@pytest.mark.integration
+def test_request_unit_of_work(replica_db: MenthaDB):
+    client = TestClient(_create_app(replica_db))
+    assert client.get("/reads").json() is True
+    # Routes marked read only run on replicas too, and don't set the cookie:
+    resp = client.post("/queries")
+    assert resp.json() is True
+    assert WRITTEN_AT_COOKIE not in resp.cookies
+    assert client.get("/reads", headers={READ_YOUR_WRITES_HEADER: "1"}).json() is False
+
+    # Clients that wrote read from the primary until replicas catch up:
+    resp = client.post("/writes")
+    assert resp.json() is False
+    assert WRITTEN_AT_COOKIE in resp.cookies
+    assert client.get("/reads").json() is False
+    assert client.post("/queries").json() is False
+    # Whichever worker serves them, and other clients still read from replicas:
+    assert TestClient(_create_app(replica_db)).get("/reads").json() is True
+    client.cookies.set(WRITTEN_AT_COOKIE, str(time.time() - 60))
+    assert client.get("/reads").json() is True
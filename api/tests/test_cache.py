@@ -0,0 +1,129 @@
+import asyncio
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.routes.cache import CacheEntry, LRUCacheBackend, ResultCache
+from app.storage.db import MenthaDB, MenthaDBConfig
+
+
+@pytest.mark.integration
+def test_result_cache(mentha_db: MenthaDB, monkeypatch: pytest.MonkeyPatch):
+    versions = mentha_db.versions
+    cache = ResultCache(versions)
+    owner = uuid4()
+    calls = list[int]()
+    concurrent = 5
+    lookups = 0
+    all_in_flight = asyncio.Event()
+    get_version = versions.get_async
+
+    async def _get_version(owner: UUID) -> str:
+        nonlocal lookups
+        version = await get_version(owner)
+        lookups += 1
+        # Each caller goes straight from its version to the in flight computation:
+        if lookups == concurrent:
+            all_in_flight.set()
+        return version
+
+    monkeypatch.setattr(versions, "get_async", _get_version)
+
+    async def _compute() -> int:
+        calls.append(1)
+        await all_in_flight.wait()
+        return len(calls)
+
+    async def _run() -> None:
+        # Concurrent identical requests only compute once:
+        results = await asyncio.gather(
+            *[
+                cache.get_or_compute(owner, ("test", 1), _compute)
+                for _ in range(concurrent)
+            ]
+        )
+        assert results == [1] * 5
+        assert await cache.get_or_compute(owner, ("test", 1), _compute) == 1
+        assert await cache.get_or_compute(owner, ("test", 2), _compute) == 2
+        assert await cache.get_or_compute(uuid4(), ("test", 1), _compute) == 3
+        async with mentha_db.unit_of_work() as uow:
+            await versions.bump_async(await uow.connection(), [owner])
+        assert await cache.get_or_compute(owner, ("test", 1), _compute) == 4
+
+    asyncio.run(_run())
+    stats = asyncio.run(cache.get_stats())
+    assert (stats.hits, stats.coalesced, stats.misses) == (1, 4, 4)
+    assert stats.hitRatio == 5 / 9
+    assert stats.savedSeconds > 0
+
+
+@pytest.mark.integration
+def test_result_cache_shared_backend(mentha_db: MenthaDB):
+    # Two workers, each with their own db and cache, sharing one backend:
+    other_db = MenthaDB(
+        MenthaDBConfig(
+            user="postgres", pwd="test", host="localhost:5432", dbname="mentha-db-test"
+        )
+    )
+    backend = LRUCacheBackend()
+    cache, other_cache = (
+        ResultCache(mentha_db.versions, backend),
+        ResultCache(other_db.versions, backend),
+    )
+    owner = uuid4()
+    calls = list[int]()
+
+    async def _compute() -> int:
+        calls.append(1)
+        return len(calls)
+
+    async def _run() -> None:
+        assert await cache.get_or_compute(owner, ("test",), _compute) == 1
+        assert await other_cache.get_or_compute(owner, ("test",), _compute) == 1
+        # Writes through either worker invalidate both's entries:
+        async with other_db.unit_of_work() as uow:
+            await other_db.versions.bump_async(await uow.connection(), [owner])
+        assert await cache.get_or_compute(owner, ("test",), _compute) == 2
+
+    asyncio.run(_run())
+    other_db.dispose()
+
+
+@pytest.mark.integration
+def test_result_cache_errors(mentha_db: MenthaDB):
+    cache = ResultCache(mentha_db.versions)
+    owner = uuid4()
+
+    async def _fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def _run() -> None:
+        results = await asyncio.gather(
+            *[cache.get_or_compute(owner, ("test",), _fail) for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+        async def _succeed() -> int:
+            return 1
+
+        # Errors aren't cached:
+        assert await cache.get_or_compute(owner, ("test",), _succeed) == 1
+
+    asyncio.run(_run())
+
+
+def test_lru_cache_backend():
+    backend = LRUCacheBackend(max_size=2)
+
+    async def _run() -> None:
+        await backend.set("a", CacheEntry(1, 0))
+        await backend.set("b", CacheEntry(2, 0))
+        assert await backend.get("a") == CacheEntry(1, 0)
+        await backend.set("c", CacheEntry(3, 0))
+        assert await backend.get("b") is None
+        assert await backend.get("a") == CacheEntry(1, 0)
+        assert await backend.get("c") == CacheEntry(3, 0)
+
+    asyncio.run(_run())
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import date, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import conditional
+from app.routes.conditional import ConditionalGet, etag_matches
+from app.storage.db import MenthaDB, MenthaDBConfig
+from app.storage.unit_of_work import detached
+
+
+def test_etag_matches():
+    assert etag_matches('W/"abc.1.2"', 'W/"abc.1.2"')
+    assert etag_matches('"abc.1.2"', 'W/"abc.1.2"')
+    assert etag_matches('W/"xyz.0.0", W/"abc.1.2"', 'W/"abc.1.2"')
+    assert etag_matches("*", 'W/"abc.1.2"')
+    assert not etag_matches('W/"abc.1.3"', 'W/"abc.1.2"')
+    assert not etag_matches("", 'W/"abc.1.2"')
+    assert not etag_matches(None, 'W/"abc.1.2"')
+
+
+@pytest.mark.integration
+def test_data_versions(mentha_db: MenthaDB):
+    versions = mentha_db.versions
+    # Another worker's view of the same db:
+    other_db = MenthaDB(
+        MenthaDBConfig(
+            user="postgres", pwd="test", host="localhost:5432", dbname="mentha-db-test"
+        )
+    )
+    owner1, owner2 = uuid4(), uuid4()
+
+    async def _bump(owners: list[UUID] | None) -> None:
+        async with mentha_db.unit_of_work() as uow:
+            await versions.bump_async(await uow.connection(), owners)
+            # Bumps only show outside the unit of work once it commits:
+            with detached():
+                assert await versions.get_async(owner1) == v1
+
+    async def _run() -> None:
+        nonlocal v1
+        v2 = await versions.get_async(owner2)
+        await _bump([owner1])
+        assert await versions.get_async(owner1) != v1
+        assert await versions.get_async(owner2) == v2
+        v1 = await versions.get_async(owner1)
+        await _bump(None)
+        assert await versions.get_async(owner1) != v1
+        assert await versions.get_async(owner2) != v2
+        # Every worker sees the same versions:
+        for owner in [owner1, owner2]:
+            assert await other_db.versions.get_async(owner) == (
+                await versions.get_async(owner)
+            )
+
+    v1 = asyncio.run(versions.get_async(owner1))
+    asyncio.run(_run())
+    other_db.dispose()
+
+
+class _Tomorrow(date):
+    @classmethod
+    def today(cls) -> date:
+        return date.today() + timedelta(days=1)
+
+
+@pytest.mark.integration
+def test_conditional_get(mentha_db: MenthaDB, monkeypatch: pytest.MonkeyPatch):
+    app = FastAPI(dependencies=[Depends(ConditionalGet(mentha_db.versions))])
+
+    @app.get("/reports/{ownerId}")
+    async def get_report(ownerId: UUID, startDt: date | None = None) -> str:
+        return "report"
+
+    client = TestClient(app)
+    route = f"/reports/{uuid4()}"
+    etag = client.get(route).headers["ETag"]
+    assert client.get(route, headers={"If-None-Match": etag}).status_code == 304
+    # Other query params get other ETags:
+    resp = client.get(
+        route, params={"startDt": "2024-01-01"}, headers={"If-None-Match": etag}
+    )
+    assert resp.status_code == 200
+    # As do requests made on later days, which ranges ending today default to:
+    monkeypatch.setattr(conditional, "date", _Tomorrow)
+    assert client.get(route, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,309 @@
+import asyncio
+from datetime import date
+from typing import Generator
+from uuid import uuid4
+
+import pytest
+import sqlalchemy as sa
+import sqlalchemy.ext.asyncio as sasync
+
+from app.domain.category import UNCATEGORIZED, Category
+from app.domain.core import DomainModel
+from app.domain.transaction import Transaction
+from app.storage import pool, schema
+from app.storage.db import (
+    Between,
+    IsIn,
+    MenthaDB,
+    MenthaDBConfig,
+    MenthaTable,
+    SimpleOp,
+    run_sync,
+)
+from app.storage.replicas import ReplicaSet, read_your_writes
+from app.storage.unit_of_work import detached
+
+
+class _Note(DomainModel):
+    text: str
+    version: int
+
+
+@pytest.fixture
+def notes(mentha_db: MenthaDB) -> Generator[MenthaTable[_Note], None, None]:
+    engine = sa.create_engine(mentha_db.url)
+    md = sa.MetaData()
+    table = sa.Table(
+        "notes",
+        md,
+        sa.Column("id", schema.UUIDString(), primary_key=True),
+        sa.Column("text", sa.String),
+        sa.Column("version", sa.Integer),
+    )
+    md.create_all(engine)
+    async_engine = sasync.create_async_engine(
+        sa.make_url(mentha_db.url).set(drivername="postgresql+asyncpg"),
+        poolclass=sa.pool.NullPool,
+    )
+    yield MenthaTable(_Note, table, async_engine, version_column="version")
+    table.drop(engine)
+    engine.dispose()
+
+
+def test_wait_until_ready_async():
+    # Nothing connects until the db is first used, so no db is needed to build one:
+    db = MenthaDB(
+        MenthaDBConfig(user="postgres", pwd="secret", host="localhost:1"),
+        conn_attempts=1,
+    )
+    with pytest.raises(TimeoutError) as e:
+        asyncio.run(db.wait_until_ready_async())
+    assert "secret" not in str(e.value)
+    assert "*****" in str(e.value)
+    db.dispose()
+
+
+@pytest.mark.integration
+def test_schema(mentha_db: MenthaDB):
+    engine = sa.create_engine(mentha_db.url)
+    md = sa.MetaData()
+    md.reflect(bind=engine, only=list(schema.metadata.tables))
+    engine.dispose()
+    for name, table in schema.metadata.tables.items():
+        reflected = md.tables[name]
+        assert [c.name for c in table.c] == [c.name for c in reflected.c]
+        for col in table.c:
+            db_type = reflected.c[col.name].type
+            assert col.type._type_affinity is db_type._type_affinity, col
+            assert getattr(col.type, "length", None) == getattr(
+                db_type, "length", None
+            ), col
+
+
+@pytest.mark.integration
+def test_uuid_binds(mentha_db: MenthaDB):
+    # UUIDs are passed as-is everywhere, through the sync and async methods alike:
+    transactions = mentha_db.transactions
+    owner, account = uuid4(), uuid4()
+    trans = [
+        Transaction(
+            id=uuid4(),
+            fitId=str(i),
+            amt=i,
+            type="debit",
+            date=date(2024, 1, i + 1),
+            name=f"Trans {i}",
+            category=UNCATEGORIZED.id,
+            account=account,
+            owner=owner,
+        )
+        for i in range(3)
+    ]
+    transactions.insert(trans[0])
+    asyncio.run(transactions.insert_async(*trans[1:]))
+    assert transactions.get(trans[0].id) == trans[0]
+    assert transactions.count(owner=owner) == 3
+    assert transactions.query(owner=owner, account=account).results == trans
+    assert transactions.page_through_query(id=IsIn([t.id for t in trans])) == trans
+    assert transactions.query(id=SimpleOp(trans[1].id, "=")).results == [trans[1]]
+    assert transactions.count(id=Between(trans[0].id, trans[0].id)) == 1
+
+    moved = Transaction(**{**dict(trans[0]), "account": uuid4()})
+    transactions.update(moved)
+    assert transactions.get(moved.id) == moved
+    moved = Transaction(**{**dict(moved), "category": uuid4()})
+    assert asyncio.run(transactions.update_if_changed_async(moved)).status == "updated"
+    result = asyncio.run(
+        transactions.bulk_write_async(updates=[trans[1]], deletes=[trans[2].id])
+    )
+    assert result.unchanged == [trans[1].id]
+    assert result.deleted == [trans[2].id]
+    assert transactions.delete(moved.id) == moved
+    assert transactions.query(owner=owner).results == [trans[1]]
+
+
+def test_run_sync():
+    async def _reads_primary() -> bool:
+        return ReplicaSet(primary, [replica]).reader() is primary
+
+    primary = sasync.create_async_engine("postgresql+asyncpg://u:p@primary/db")
+    replica = sasync.create_async_engine("postgresql+asyncpg://u:p@replica/db")
+    assert not run_sync(_reads_primary())
+    # The caller's context is kept:
+    with read_your_writes():
+        assert run_sync(_reads_primary())
+
+    async def _nested() -> None:
+        coro = _reads_primary()
+        with pytest.raises(RuntimeError):
+            run_sync(coro)
+        coro.close()
+
+    asyncio.run(_nested())
+
+
+@pytest.mark.integration
+def test_update_if_changed_async(notes: MenthaTable[_Note]):
+    note = _Note(id=uuid4(), text="a", version=1)
+    asyncio.run(notes.insert_async(note))
+
+    update = asyncio.run(notes.update_if_changed_async(note))
+    assert update.status == "unchanged"
+    assert update.record == note
+
+    update = asyncio.run(
+        notes.update_if_changed_async(_Note(**{**dict(note), "text": "b"}))
+    )
+    assert update.status == "updated"
+    assert update.record == _Note(id=note.id, text="b", version=2)
+
+    # The stored version has moved on, so the stale model is rejected:
+    update = asyncio.run(
+        notes.update_if_changed_async(_Note(**{**dict(note), "text": "c"}))
+    )
+    assert update.status == "conflict"
+    assert notes.get(note.id) == _Note(id=note.id, text="b", version=2)
+
+    update = asyncio.run(
+        notes.update_if_changed_async(_Note(id=uuid4(), text="a", version=1))
+    )
+    assert update.status == "notFound"
+    assert update.record is None
+
+
+@pytest.mark.integration
+def test_bulk_write_locks_updates(mentha_db: MenthaDB, notes: MenthaTable[_Note]):
+    note = _Note(id=uuid4(), text="a", version=1)
+    asyncio.run(notes.insert_async(note))
+    engine = sa.create_engine(mentha_db.url)
+    update = notes.table.update().where(notes.table.c.id == note.id).values(text="b")
+
+    async def _bulk_write() -> None:
+        async with mentha_db.unit_of_work():
+            result = await notes.bulk_write_async(updates=[note])
+            assert result.unchanged == [note.id]
+            # The records read to compare against can't be written by anyone else
+            # until the bulk write commits:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SET lock_timeout = '100ms'")
+                with pytest.raises(sa.exc.OperationalError, match="lock timeout"):
+                    conn.execute(update)
+
+    asyncio.run(_bulk_write())
+    with engine.begin() as conn:
+        conn.execute(update)
+    assert notes.get(note.id) == _Note(id=note.id, text="b", version=1)
+    engine.dispose()
+
+
+@pytest.mark.integration
+def test_unit_of_work(mentha_db: MenthaDB):
+    owner = uuid4()
+    categories = mentha_db.categories
+    versions = mentha_db.versions
+
+    async def _write(cat: Category, fail: bool) -> None:
+        async with mentha_db.unit_of_work() as uow:
+            await categories.insert_async(cat)
+            # Writes are visible inside the unit of work, but not outside it:
+            assert await categories.get_async(cat.id) == cat
+            with detached():
+                assert await categories.get_async(cat.id) is None
+            # Data versions change along with the data, once the unit of work
+            # commits:
+            with detached():
+                assert await versions.get_async(owner) == version
+            assert (await uow.connection()) is (await uow.connection())
+            if fail:
+                raise ValueError("Rolled back.")
+
+    version = asyncio.run(versions.get_async(owner))
+    rolled_back = Category(id=uuid4(), name="Rolled Back", owner=owner)
+    with pytest.raises(ValueError):
+        asyncio.run(_write(rolled_back, fail=True))
+    assert categories.get(rolled_back.id) is None
+    assert asyncio.run(versions.get_async(owner)) == version
+
+    committed = Category(id=uuid4(), name="Committed", owner=owner)
+    asyncio.run(_write(committed, fail=False))
+    assert categories.get(committed.id) == committed
+    assert asyncio.run(versions.get_async(owner)) != version
+
+
+def test_replica_set():
+    primary = sasync.create_async_engine("postgresql+asyncpg://u:p@primary/db")
+    replicas = [
+        sasync.create_async_engine(f"postgresql+asyncpg://u:p@replica{i}/db")
+        for i in range(2)
+    ]
+    assert ReplicaSet(primary).reader() is primary
+    replica_set = ReplicaSet(primary, replicas)
+    assert [replica_set.reader() for _ in range(3)] == [*replicas, replicas[0]]
+    with read_your_writes():
+        assert replica_set.reader() is primary
+    assert replica_set.engines == [primary, *replicas]
+
+
+@pytest.mark.integration
+def test_replica_routing(replica_db: MenthaDB):
+    categories = replica_db.categories
+    in_recovery = sa.select(sa.func.pg_is_in_recovery().label("in_recovery"))
+
+    async def _reads_replica() -> bool:
+        return (await categories.select_async(in_recovery))[0]["in_recovery"]
+
+    async def _run() -> None:
+        assert await _reads_replica()
+        async with replica_db.unit_of_work(read_only=True):
+            assert await _reads_replica()
+        async with replica_db.unit_of_work():
+            assert not await _reads_replica()
+        with read_your_writes():
+            assert not await _reads_replica()
+
+        # Replicas are read only, so this would fail if it wasn't sent to the
+        # primary:
+        cat = Category(id=uuid4(), name="Replicated", owner=uuid4())
+        await categories.insert_async(cat)
+        with read_your_writes():
+            assert await categories.get_async(cat.id) == cat
+        for _ in range(50):
+            if await categories.get_async(cat.id) == cat:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            pytest.fail("The write never reached the replica.")
+
+    asyncio.run(_run())
+
+
+@pytest.mark.integration
+def test_stream_routing(replica_db: MenthaDB, monkeypatch: pytest.MonkeyPatch):
+    categories = replica_db.categories
+    cat = Category(id=uuid4(), name="Streamed", owner=uuid4())
+    categories.insert(cat)
+    ports = list[int | None]()
+    connect = pool.connect
+
+    async def _connect(engine: sasync.AsyncEngine) -> sasync.AsyncConnection:
+        ports.append(engine.url.port)
+        return await connect(engine)
+
+    monkeypatch.setattr(pool, "connect", _connect)
+
+    async def _run() -> None:
+        # Streams read from the db picked when they're made, like a request's
+        # StreamingResponse is read after its read_your_writes block exits:
+        with read_your_writes():
+            stream = categories.stream_async(id=cat.id)
+        assert [c async for c in stream] == [cat]
+        async with replica_db.unit_of_work(read_only=True) as uow:
+            await uow.connection()
+            stream = categories.stream_async(id=cat.id)
+        [_ async for _ in stream]
+
+    asyncio.run(_run())
+    primary = sa.make_url(replica_db.url).port
+    # The unit of work and the stream it made both read from the replica:
+    assert ports[0] == primary
+    assert ports[1] == ports[2] != primary
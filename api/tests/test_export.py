@@ -0,0 +1,51 @@
+import asyncio
+import gzip
+import json
+from typing import AsyncIterator, Iterable
+
+from pydantic import BaseModel
+
+from app.routes.export import encode_records, gzip_stream
+
+
+class _Record(BaseModel):
+    name: str
+    amt: float
+
+
+async def _aiter(records: Iterable[_Record]) -> AsyncIterator[_Record]:
+    for record in records:
+        yield record
+
+
+async def _collect(chunks: AsyncIterator[bytes]) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+def test_encode_records():
+    records = [_Record(name=f"test, {i}", amt=i / 2) for i in range(100)]
+    fields = list(_Record.model_fields)
+
+    chunks = asyncio.run(
+        _collect(encode_records(_aiter(records), "ndjson", fields, chunk_size=256))
+    )
+    assert len(chunks) > 1
+    lines = b"".join(chunks).decode().splitlines()
+    assert [_Record.model_validate_json(line) for line in lines] == records
+
+    chunks = asyncio.run(_collect(encode_records(_aiter(records), "csv", fields)))
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0] == "name,amt"
+    assert lines[1] == '"test, 0",0.0'
+    assert len(lines) == 101
+
+
+def test_gzip_stream():
+    records = [_Record(name="test", amt=i) for i in range(1000)]
+    chunks = asyncio.run(
+        _collect(
+            gzip_stream(encode_records(_aiter(records), "ndjson", [], chunk_size=1024))
+        )
+    )
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    assert [json.loads(line)["amt"] for line in lines] == list(range(1000))
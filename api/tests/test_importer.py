@@ -0,0 +1,51 @@
+import asyncio
+import shutil
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from app.domain.institution import Institution
+from app.storage import importer
+from app.storage.db import MenthaDB
+from app.storage.importer import Importer
+
+SAMPLE = Path("tests/samples/acct_trns.ofx")
+
+
+@pytest.mark.integration
+def test_import_completes_on_commit(
+    mentha_db: MenthaDB, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    inbox, complete = tmp_path.joinpath("inbox"), tmp_path.joinpath("complete")
+    monkeypatch.setattr(importer, "INBOX", inbox)
+    monkeypatch.setattr(importer, "COMPLETE", complete)
+    owner = uuid4()
+    mentha_db.institutions.insert(Institution(id=uuid4(), name="Bank", fitId="123456"))
+    importer_ = Importer(for_owner=owner, db=mentha_db)
+    shutil.copy(SAMPLE, inbox)
+    inserted = importer.IMPORT_ROWS_INSERTED.labels()
+    inserted_before = inserted.value
+
+    async def _import(fail: bool) -> int:
+        async with mentha_db.unit_of_work():
+            result = await importer_.execute()
+            assert result.import_ct > 0
+            # Files stay in the inbox, and rows uncounted, until the import commits:
+            assert list(inbox.iterdir())
+            assert inserted.value == inserted_before
+            if fail:
+                raise ValueError("Rolled back.")
+        return result.import_ct
+
+    with pytest.raises(ValueError):
+        asyncio.run(_import(fail=True))
+    assert [path.name for path in inbox.iterdir()] == [SAMPLE.name]
+    assert mentha_db.transactions.count(owner=owner) == 0
+    assert inserted.value == inserted_before
+
+    import_ct = asyncio.run(_import(fail=False))
+    assert inserted.value == inserted_before + import_ct
+    assert list(inbox.iterdir()) == []
+    assert [path.name for path in complete.iterdir()] == [SAMPLE.name]
+    assert mentha_db.transactions.count(owner=owner) > 0
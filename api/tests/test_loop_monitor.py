@@ -0,0 +1,89 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import create_app
+from app.loop_monitor import (
+    LOOP_LAG_SECONDS,
+    SLOW_CALLBACK_SECONDS,
+    LoopMonitor,
+    current_request,
+)
+from app.storage.db import MenthaDB
+
+
+async def _block(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_loop_monitor():
+    samples = LOOP_LAG_SECONDS.labels().count
+    route = SimpleNamespace(path="/test-loop-monitor/{id}")
+
+    async def _main() -> None:
+        monitor = LoopMonitor(interval=0.01, slow_callback_threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.02)
+            current_request.set({"method": "GET", "route": route})
+            await asyncio.create_task(_block(0.1))
+            current_request.set(None)
+            await asyncio.create_task(_block(0.1))
+            await asyncio.create_task(_block(0.01))
+            await asyncio.sleep(0.02)
+        finally:
+            await monitor.stop()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(_main())
+    # The loop's debug settings are restored once the monitor stops:
+    assert not loop.get_debug() and loop.slow_callback_duration == 0.1
+    loop.close()
+    request_stalls = SLOW_CALLBACK_SECONDS.labels("GET /test-loop-monitor/{id}")
+    task_stalls = SLOW_CALLBACK_SECONDS.labels("task _block")
+    assert request_stalls.count == 1 and request_stalls.sum >= 0.1
+    assert task_stalls.count == 1
+    assert LOOP_LAG_SECONDS.labels().count > samples
+
+
+@pytest.mark.integration
+def test_loop_monitor_routes(mentha_db: MenthaDB):
+    # Every callback is slow at a threshold of 0:
+    app = create_app(mentha_db, loop_monitor=LoopMonitor(slow_callback_threshold=0))
+    with TestClient(app) as client:
+        # Each request's last callback is timed after it has responded, so it's
+        # the next scrape that shows it:
+        client.get("/metrics")
+        resp = client.get("/metrics")
+    assert (
+        'mentha_event_loop_slow_callback_seconds_count{source="GET /metrics"}'
+        in resp.text
+    )
+
+
+class _UVLoop(asyncio.SelectorEventLoop):
+    pass
+
+
+# Stands in for uvloop's loop, which isn't installed for tests:
+_UVLoop.__module__ = "uvloop.loop"
+
+
+def test_loop_monitor_uvloop(caplog: pytest.LogCaptureFixture):
+    samples = LOOP_LAG_SECONDS.labels().count
+
+    async def _main() -> None:
+        monitor = LoopMonitor(interval=0.01)
+        monitor.start()
+        assert not asyncio.get_running_loop().get_debug()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    with asyncio.Runner(loop_factory=_UVLoop) as runner:
+        runner.run(_main())
+    assert "can't be timed on uvloop" in caplog.text
+    # Loop lag is still sampled:
+    assert LOOP_LAG_SECONDS.labels().count > samples
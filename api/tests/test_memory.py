@@ -0,0 +1,78 @@
+import tracemalloc
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import create_app
+from app.routes.admin import ADMIN_TOKEN_HEADER
+from app.memory import MemoryDiagnostics, SnapshotNotFoundError
+from app.storage.db import MenthaDB, MenthaDBConfig
+
+
+@pytest.fixture
+def diagnostics() -> Generator[MemoryDiagnostics, None, None]:
+    diagnostics = MemoryDiagnostics(max_snapshots=2)
+    yield diagnostics
+    tracemalloc.stop()
+
+
+def test_memory_diagnostics(diagnostics: MemoryDiagnostics):
+    with pytest.raises(RuntimeError):
+        diagnostics.snapshot()
+    diagnostics.start()
+    base = diagnostics.snapshot()
+    hoard = [bytearray(1000) for _ in range(1000)]
+    latest = diagnostics.snapshot()
+    [top] = diagnostics.top(latest, limit=1)
+    assert top.traceback[0].filename == __file__
+    assert top.size >= 1000 * 1000
+    [grown] = diagnostics.diff(latest, base, limit=1)
+    assert grown.traceback[0].filename == __file__
+    assert grown.count_diff >= 1000
+    del hoard
+
+    diagnostics.stop()
+    assert not diagnostics.tracing
+    # Snapshots outlive tracing, until they're evicted by newer ones:
+    assert diagnostics.snapshot_ids == [base, latest]
+    diagnostics.start()
+    diagnostics.snapshot()
+    with pytest.raises(SnapshotNotFoundError):
+        diagnostics.top(base)
+
+
+def test_memory_routes(diagnostics: MemoryDiagnostics):
+    db = MenthaDB(MenthaDBConfig(user="u", pwd="p", host="localhost:1"))
+    app = create_app(db, memory_diagnostics=True, admin_token="secret")
+    client = TestClient(app)
+    # Only clients with the admin token can use the routes:
+    assert client.post("/admin/memory/start").status_code == 401
+    client.headers[ADMIN_TOKEN_HEADER] = "guess"
+    assert client.post("/admin/memory/start").status_code == 403
+    client.headers[ADMIN_TOKEN_HEADER] = "secret"
+    assert client.post("/admin/memory/snapshots").status_code == 409
+
+    assert client.post("/admin/memory/start", params={"frames": 5}).json()["tracing"]
+    base = client.post("/admin/memory/snapshots").json()["id"]
+    latest = client.post("/admin/memory/snapshots").json()["id"]
+    resp = client.get(f"/admin/memory/snapshots/{latest}/top", params={"limit": 3})
+    assert len(resp.json()) == 3
+    resp = client.get(f"/admin/memory/snapshots/{latest}/diff/{base}")
+    assert all("sizeDiffBytes" in site for site in resp.json())
+    assert client.get(f"/admin/memory/snapshots/{latest}/diff/0").status_code == 404
+
+    # Peaks are only recorded while tracing:
+    resp = client.get("/metrics")
+    assert (
+        'mentha_http_request_memory_peak_bytes_count{method="POST",'
+        'route="/admin/memory/snapshots"}'
+    ) in resp.text
+    assert not client.post("/admin/memory/stop").json()["tracing"]
+
+    # Only apps created with memory_diagnostics have the routes:
+    client = TestClient(create_app(db, admin_token="secret"))
+    client.headers[ADMIN_TOKEN_HEADER] = "secret"
+    assert client.post("/admin/memory/start").status_code == 404
+    with pytest.raises(ValueError):
+        create_app(db, memory_diagnostics=True)
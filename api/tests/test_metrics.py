@@ -0,0 +1,96 @@
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import create_app
+from app.metrics import Counter, Gauge, Histogram, Metric, Registry
+from app.routes.metrics import RequestMetrics
+from app.routes.tracing import RequestTracing
+from app.storage.db import MenthaDB, MenthaDBConfig
+
+
+def test_registry_render():
+    registry = Registry()
+    counter = Counter("test_events", "Events seen.", ["kind"], registry=registry)
+    gauge = Gauge("test_level", 'A "level"\nwith two lines.', registry=registry)
+    histogram = Histogram(
+        "test_seconds", "Durations.", ["op"], registry=registry, buckets=[0.1, 1]
+    )
+    counter.labels('say "hi"').inc()
+    counter.labels('say "hi"').inc(2)
+    gauge.inc(5)
+    gauge.dec()
+    for value in [0.05, 0.1, 0.5, 3]:
+        histogram.labels("get").observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_events Events seen.",
+        "# TYPE test_events counter",
+        'test_events_total{kind="say \\"hi\\""} 3.0',
+        '# HELP test_level A "level"\\nwith two lines.',
+        "# TYPE test_level gauge",
+        "test_level 4.0",
+        "# HELP test_seconds Durations.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{op="get",le="0.1"} 2.0',
+        'test_seconds_bucket{op="get",le="1.0"} 3.0',
+        'test_seconds_bucket{op="get",le="+Inf"} 4.0',
+        'test_seconds_sum{op="get"} 3.65',
+        'test_seconds_count{op="get"} 4.0',
+    ]
+    with pytest.raises(ValueError):
+        Counter("test_events", "Duplicate.", registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+    with pytest.raises(ValueError):
+        counter.labels("a").inc(-1)
+
+
+def test_metric_is_abstract():
+    # Metrics have to say how to create and render their children:
+    with pytest.raises(TypeError, match="abstract"):
+        Metric("test_abstract", "Abstract.", registry=None)  # type: ignore[abstract]
+
+
+def test_request_metrics():
+    # No db is needed, since the metrics endpoint never connects:
+    db = MenthaDB(MenthaDBConfig(user="u", pwd="p", host="localhost:1"))
+    client = TestClient(create_app(db))
+    client.get("/metrics")
+    client.get(f"/no-such-route/{uuid4()}")
+    resp = client.get("/metrics")
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'mentha_http_request_duration_seconds_count{method="GET",route="/metrics",'
+        'status="200"}'
+    ) in resp.text
+    assert (
+        'mentha_http_request_duration_seconds_count{method="GET",route="unmatched",'
+        'status="404"} 1.0'
+    ) in resp.text
+
+
+def test_request_metrics_outermost(tmp_path: Path):
+    db = MenthaDB(MenthaDBConfig(user="u", pwd="p", host="localhost:1"))
+    app = create_app(db, server_timing=True, profile_dir=str(tmp_path))
+    # Middleware is listed outermost first:
+    outermost = [m.cls for m in app.user_middleware[:2]]
+    assert outermost == [RequestTracing, RequestMetrics]
+
+
+@pytest.mark.integration
+def test_db_metrics(mentha_client: TestClient):
+    mentha_client.post(f"/categories/by-owner/{uuid4()}", json={})
+    resp = mentha_client.get("/metrics")
+    assert (
+        'mentha_db_operation_seconds_count{table="categories",method="query"}'
+        in resp.text
+    )
+    # Every connection has been returned by the time the metrics are rendered:
+    assert (
+        'mentha_db_pool_connections_in_use{db="localhost:5432/mentha-db-test"} 0.0'
+        in resp.text
+    )
+    assert "mentha_db_pool_checkout_wait_seconds_count" in resp.text
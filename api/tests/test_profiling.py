@@ -0,0 +1,54 @@
+import json
+import pstats
+import time
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import create_app
+from app.profiling import SamplingProfiler
+from app.routes.profiling import PROFILE_FILE_HEADER
+from app.storage.db import MenthaDB
+
+
+def _busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profiler():
+    profiler = SamplingProfiler()
+    profiler.start()
+    _busy(0.2)
+    profiler.stop()
+    profile = profiler.to_speedscope("busy")
+    frames = profile["shared"]["frames"]
+    [sampled] = profile["profiles"]
+    assert len(sampled["samples"]) == len(sampled["weights"]) > 10
+    busy = [i for i, frame in enumerate(frames) if frame["name"] == "_busy"]
+    assert busy and all(busy[0] in stack for stack in sampled["samples"][1:-1])
+    assert sampled["endValue"] >= 0.2
+
+
+@pytest.mark.integration
+def test_request_profiling(
+    mentha_db: MenthaDB, mentha_client: TestClient, tmp_path: Path
+):
+    client = TestClient(create_app(mentha_db, profile_dir=str(tmp_path)))
+    url = f"/categories/by-owner/{uuid4()}"
+
+    resp = client.post(url, json={}, headers={"X-Mentha-Profile": "cprofile"})
+    stats = pstats.Stats(resp.headers[PROFILE_FILE_HEADER])
+    assert any(func == "get_by_owner" for _, _, func in stats.stats)  # type: ignore
+
+    resp = client.post(url, json={}, headers={"X-Mentha-Profile": "sample"})
+    profile = json.loads(Path(resp.headers[PROFILE_FILE_HEADER]).read_text())
+    assert profile["profiles"][0]["type"] == "sampled"
+
+    assert PROFILE_FILE_HEADER not in client.post(url, json={}).headers
+    # Only apps with a profile dir profile requests:
+    resp = mentha_client.post(url, json={}, headers={"X-Mentha-Profile": "cprofile"})
+    assert PROFILE_FILE_HEADER not in resp.headers
@@ -0,0 +1,57 @@
+import logging
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes.query_budget import (
+    QueryBudgetExceededError,
+    QueryBudgetMode,
+    QueryBudgets,
+    query_budget,
+)
+from app.storage.db import MenthaDB
+from app.storage.query_count import count_queries
+
+
+def test_count_queries():
+    with count_queries() as outer:
+        with count_queries() as inner:
+            for statement in ["SELECT a", "SELECT b", "SELECT a"]:
+                inner.record(statement)
+            inner.add_request("GET /things")
+        outer.record("SELECT c")
+    assert inner.count == 3
+    assert inner.most_repeated() == ("SELECT a", 2)
+    # Outer counts include inner ones, and the requests they were for:
+    assert outer.count == 4
+    assert outer.for_request("GET /things") == [3]
+    assert outer.for_request("GET /other-things") == []
+
+
+def _create_app(db: MenthaDB, mode: QueryBudgetMode) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryBudgets, mode=mode)
+
+    # Queries run a count and then a select, which is one more than its budget:
+    async def query_categories() -> None:
+        await db.categories.query_async(owner=uuid4())
+
+    app.add_api_route(
+        "/categories", query_categories, methods=["GET"], openapi_extra=query_budget(1)
+    )
+    return app
+
+
+@pytest.mark.integration
+def test_query_budgets(mentha_db: MenthaDB, caplog: pytest.LogCaptureFixture):
+    client = TestClient(_create_app(mentha_db, "raise"))
+    with pytest.raises(QueryBudgetExceededError, match="over its budget of 1"):
+        client.get("/categories")
+
+    client = TestClient(_create_app(mentha_db, "log"))
+    with count_queries() as count, caplog.at_level(logging.WARNING):
+        assert client.get("/categories").status_code == 200
+    assert count.for_request("GET /categories") == [2]
+    assert "GET /categories executed 2 statements" in caplog.text
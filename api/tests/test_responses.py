@@ -0,0 +1,71 @@
+import json
+from datetime import date
+from uuid import UUID, uuid4
+
+from fastapi import Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.domain.category import UNCATEGORIZED, Category
+from app.domain.core import PagedResultsModel
+from app.domain.transaction import Transaction
+from app.routes.responses import model_json_endpoint
+
+
+def _set_header(response: Response) -> None:
+    response.headers["X-Test"] = "set"
+
+
+def test_model_json_endpoint():
+    trn = Transaction[Category](
+        id=uuid4(),
+        fitId="1",
+        amt=12.34,
+        type="debit",
+        date=date(2024, 1, 2),
+        name="test",
+        category=UNCATEGORIZED,
+        account=uuid4(),
+        owner=uuid4(),
+    )
+
+    async def get_page(
+        ownerId: UUID, page: int = 1
+    ) -> PagedResultsModel[Transaction[Category]]:
+        return PagedResultsModel(
+            results=[trn],
+            hitCount=1,
+            totalHitCount=1,
+            page=page,
+            pageSize=None,
+            hasNext=False,
+            hasPrev=page > 1,
+        )
+
+    app = FastAPI()
+    app.add_api_route(
+        "/{ownerId}",
+        model_json_endpoint(get_page),
+        dependencies=[Depends(_set_header)],
+    )
+    client = TestClient(app)
+
+    resp = client.get(f"/{uuid4()}", params={"page": 2})
+    assert resp.status_code == 200
+    assert resp.headers["X-Test"] == "set"
+    assert resp.headers["content-type"] == "application/json"
+    expected = PagedResultsModel[Transaction[Category]](
+        results=[trn],
+        hitCount=1,
+        totalHitCount=1,
+        page=2,
+        pageSize=None,
+        hasNext=False,
+        hasPrev=True,
+    )
+    assert json.loads(resp.content) == expected.model_dump(mode="json")
+    assert client.get("/not-a-uuid").status_code == 422
+
+    # The endpoint's parameters and response model are still documented:
+    operation = app.openapi()["paths"]["/{ownerId}"]["get"]
+    assert [p["name"] for p in operation["parameters"]] == ["ownerId", "page"]
+    assert "$ref" in str(operation["responses"]["200"])
@@ -100,6 +100,40 @@ def test_calculate_accumulated_budget():
     ) == (40, 40)
 
 
+def test_calculate_accumulated_budgets():
+    # Including days past the end of shorter months:
+    create_dates = [
+        date(2022, 3, 1),
+        date(2023, 1, 13),
+        date(2023, 11, 1),
+        date(2023, 1, 31),
+        date(2024, 2, 29),
+    ]
+    periods = [1, 3, 6, 12]
+    budgets = [(600, p, dt) for p in periods for dt in create_dates]
+    compare_dates = [
+        *utils.gen_month_list(date(2022, 1, 1), date(2025, 6, 1)),
+        date(2023, 12, 21),
+        date(2023, 2, 28),
+        date(2024, 2, 28),
+        date(2024, 4, 30),
+        date(2022, 12, 31),
+    ]
+    result = utils.calculate_accumulated_budgets(
+        [b[0] for b in budgets],
+        [b[1] for b in budgets],
+        [b[2] for b in budgets],
+        compare_dates,
+    )
+    assert result == [
+        [
+            utils.calculate_accumulated_budget(amt, period, create_dt, compare_dt)
+            for compare_dt in compare_dates
+        ]
+        for amt, period, create_dt in budgets
+    ]
+
+
 def test_date_to_datetime():
     assert utils.date_to_datetime(date(2023, 12, 3)) == datetime(2023, 12, 3)
     assert utils.date_to_datetime(date(2023, 12, 3), True) == datetime(
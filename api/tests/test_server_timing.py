@@ -0,0 +1,52 @@
+import re
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import server_timing
+from app.core import create_app
+from app.storage.db import MenthaDB
+
+
+def test_timed():
+    # Nothing is timed outside of requests:
+    with server_timing.timed("db-page"):
+        pass
+
+    timings, token = server_timing.start()
+    try:
+        for _ in range(2):
+            with server_timing.timed("db-page"):
+                pass
+        with server_timing.timed("serialize"):
+            pass
+    finally:
+        server_timing.stop(token)
+    header = server_timing.format_header(timings, total=0.0125)
+    assert re.fullmatch(
+        r'db-page;dur=\d+\.\d{3};desc="2 calls", serialize;dur=\d+\.\d{3}, '
+        r"total;dur=12\.500",
+        header,
+    )
+
+
+@pytest.mark.integration
+def test_server_timing_header(mentha_db: MenthaDB, mentha_client: TestClient):
+    client = TestClient(create_app(mentha_db, server_timing=True))
+    resp = client.post(f"/categories/by-owner/{uuid4()}", json={})
+    phases = [
+        metric.split(";")[0] for metric in resp.headers["server-timing"].split(", ")
+    ]
+    assert phases == [
+        "db-connect",
+        "db-count",
+        "db-page",
+        "load-row",
+        "transform",
+        "serialize",
+        "total",
+    ]
+    # It's off by default:
+    resp = mentha_client.post(f"/categories/by-owner/{uuid4()}", json={})
+    assert "server-timing" not in resp.headers
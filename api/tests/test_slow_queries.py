@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from app.storage.db import MenthaDB, MenthaDBConfig
+from app.storage.slow_queries import SlowQueryLogConfig, fingerprint
+
+
+def test_fingerprint():
+    assert fingerprint("SELECT * FROM t WHERE id IN ($1, $2)") == fingerprint(
+        "SELECT *\n  FROM t WHERE id IN ($1,$2,$3)"
+    )
+    assert fingerprint("SELECT * FROM t") != fingerprint("SELECT * FROM u")
+
+
+@pytest.mark.integration
+def test_slow_query_log(mentha_db: MenthaDB, tmp_path: Path):
+    path = tmp_path.joinpath("slow.jsonl")
+    # Every statement is slow, and explained, at a threshold of 0:
+    db = MenthaDB(
+        MenthaDBConfig(
+            user="postgres", pwd="test", host="localhost:5432", dbname="mentha-db-test"
+        ),
+        slow_query_log=SlowQueryLogConfig(
+            str(path), threshold_ms=0, explain_sample_ratio=1
+        ),
+    )
+    owner = uuid4()
+    try:
+        db.categories.query(owner=owner)
+        db.categories.delete(uuid4())
+    finally:
+        db.dispose()
+
+    # query counts the matching rows before selecting them:
+    count, select, delete = [json.loads(line) for line in path.read_text().splitlines()]
+    assert count["rows"] == 1
+    assert select["statement"].startswith("SELECT categories.id")
+    assert select["params"] == ["str"]
+    assert str(owner) not in path.read_text()
+    assert select["rows"] == 0
+    assert select["analyzed"]
+    assert "Shared Hit Blocks" in select["plan"][0]["Plan"]
+    assert "password" not in select["db"] and "test@" not in select["db"]
+
+    # Writes are only planned, since analyzing them would run them again:
+    assert delete["statement"].startswith("DELETE")
+    assert not delete["analyzed"]
+    assert "Actual Rows" not in delete["plan"][0]["Plan"]
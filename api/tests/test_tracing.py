@@ -0,0 +1,149 @@
+import json
+import threading
+from pathlib import Path
+from typing import Generator, Sequence
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import tracing
+from app.core import create_app
+from app.storage.db import MenthaDB, MenthaDBConfig
+
+
+class _ListExporter(tracing.SpanExporter):
+    def __init__(self) -> None:
+        self.spans = list[tracing.Span]()
+
+    def export(self, spans: Sequence[tracing.Span]) -> None:
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exporter() -> Generator[_ListExporter, None, None]:
+    exporter = _ListExporter()
+    tracing.configure_tracing(exporter)
+    yield exporter
+    tracing.configure_tracing(None)
+
+
+def test_spans(exporter: _ListExporter):
+    with tracing.span("outer", size=2) as outer:
+        with tracing.span("inner", attributes={"db.system": "postgresql"}, rows=1):
+            pass
+        with pytest.raises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("Failed.")
+        assert tracing.current_span() is outer
+    # Spans are exported from a background thread:
+    tracing.force_flush()
+    inner, failing, outer = exporter.spans
+    assert outer.parent_id is None
+    assert inner.parent_id == failing.parent_id == outer.context.span_id
+    assert inner.context.trace_id == outer.context.trace_id
+    assert inner.attributes == {"db.system": "postgresql", "rows": 1}
+    assert failing.status == "error"
+    assert failing.attributes["exception.type"] == "ValueError"
+
+    otlp = outer.to_otlp()
+    assert otlp["traceId"] == f"{outer.context.trace_id:032x}"
+    assert otlp["kind"] == 1
+    assert otlp["attributes"] == [{"key": "size", "value": {"intValue": "2"}}]
+    assert "parentSpanId" not in otlp
+    assert inner.to_otlp()["parentSpanId"] == otlp["spanId"]
+
+
+def test_sampling(exporter: _ListExporter):
+    tracing.configure_tracing(exporter, sample_ratio=0)
+    with tracing.span("unsampled"):
+        # Descendants of unsampled spans aren't recorded either:
+        tracing.configure_tracing(exporter, sample_ratio=1)
+        with tracing.span("child") as child:
+            assert not child.recording
+    tracing.force_flush()
+    assert exporter.spans == []
+
+    # Continued traces follow the sampled flag of their traceparent:
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    sampled = tracing.parse_traceparent(f"00-{trace_id}-00f067aa0ba902b7-01")
+    unsampled = tracing.parse_traceparent(f"00-{trace_id}-00f067aa0ba902b7-00")
+    assert tracing.parse_traceparent("00-not-a-traceparent") is None
+    tracing.configure_tracing(exporter, sample_ratio=0)
+    with tracing.span("continued", parent=sampled):
+        pass
+    with tracing.span("dropped", parent=unsampled):
+        pass
+    tracing.force_flush()
+    [span] = exporter.spans
+    assert span.name == "continued"
+    assert f"{span.context.trace_id:032x}" == trace_id
+    assert span.parent_id == 0x00F067AA0BA902B7
+
+
+def test_batch_span_processor():
+    threads = set[str]()
+    batches = list[int]()
+
+    class _ThreadExporter(tracing.SpanExporter):
+        def export(self, spans: Sequence[tracing.Span]) -> None:
+            threads.add(threading.current_thread().name)
+            batches.append(len(spans))
+
+    processor = tracing.BatchSpanProcessor(
+        _ThreadExporter(), max_queue_size=5, max_batch_size=2, schedule_delay=60
+    )
+    with processor._export_lock:
+        # Spans past the queue's max size are dropped while the exporter is busy:
+        for i in range(6):
+            processor.on_end(tracing.Span(str(i), tracing.SpanContext(1, i, True)))
+    processor.shutdown()
+    assert processor.dropped == 1
+    # Full batches wake the exporter thread without waiting for the delay:
+    assert threads == {"span-exporter"}
+    assert sum(batches) == 5 and max(batches) == 2
+
+
+def test_file_exporter(tmp_path: Path):
+    path = tmp_path.joinpath("traces.jsonl")
+    tracing.configure_tracing(tracing.exporter_from_setting(str(path)))
+    try:
+        with tracing.span("first"):
+            pass
+        with tracing.span("second"):
+            pass
+    finally:
+        # Exports the queued spans:
+        tracing.configure_tracing(None)
+    # Spans ended close together are written in one batch:
+    [line] = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = line["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["first", "second"]
+
+
+def test_request_tracing(exporter: _ListExporter):
+    db = MenthaDB(MenthaDBConfig(user="u", pwd="p", host="localhost:1"))
+    client = TestClient(create_app(db))
+    client.get("/metrics")
+    tracing.force_flush()
+    [span] = exporter.spans
+    assert span.name == "GET /metrics"
+    assert span.kind == "server"
+    assert span.attributes["http.response.status_code"] == 200
+
+
+@pytest.mark.integration
+def test_by_owner_spans(mentha_client: TestClient, exporter: _ListExporter):
+    mentha_client.post(f"/categories/by-owner/{uuid4()}", json={})
+    tracing.force_flush()
+    by_name = {span.name: span for span in exporter.spans}
+    request = by_name["POST /categories/by-owner/{ownerId}"]
+    assert {span.context.trace_id for span in exporter.spans} == {
+        request.context.trace_id
+    }
+    assert by_name["MenthaTable.query"].attributes["db.collection.name"] == (
+        "categories"
+    )
+    statements = [span for span in exporter.spans if span.name == "db.execute"]
+    assert any("FROM categories" in s.attributes["db.query.text"] for s in statements)
+    assert {"MenthaTable.load_rows", "transform", "serialize"} <= set(by_name)
@@ -1,14 +1,72 @@
-from datetime import datetime
-from uuid import uuid4
+from datetime import date, datetime
+from uuid import UUID, uuid4
 
 import pytest
+from pydantic_core import to_json
+
+from app.domain.category import INCOME, UNCATEGORIZED, Category
+from app.domain.core import PagedResultsModel
 from app.domain.transaction import (
+    Transaction,
     TransactionInput,
+    columnar_transaction_results,
+    compact_transaction_results,
     decode_transaction_input_model,
     parse_transaction_fit_id,
 )
 
 
+@pytest.fixture
+def expanded_page() -> PagedResultsModel[Transaction[Category]]:
+    owner, account = uuid4(), uuid4()
+    return PagedResultsModel(
+        results=[
+            Transaction[Category](
+                id=uuid4(),
+                fitId=str(i),
+                amt=i,
+                type="debit",
+                date=date(2024, 1, i + 1),
+                name=f"test {i}",
+                category=cat,
+                account=account,
+                owner=owner,
+            )
+            for i, cat in enumerate([UNCATEGORIZED, INCOME, UNCATEGORIZED])
+        ],
+        hitCount=3,
+        totalHitCount=10,
+        page=1,
+        pageSize=3,
+        hasNext=True,
+        hasPrev=False,
+    )
+
+
+def test_compact_transaction_results(
+    expanded_page: PagedResultsModel[Transaction[Category]],
+):
+    result = compact_transaction_results(expanded_page)
+    assert result.categories == [UNCATEGORIZED, INCOME]
+    assert result.results == [
+        Transaction[UUID](**{**dict(trn), "category": trn.category.id})
+        for trn in expanded_page.results
+    ]
+    assert (result.totalHitCount, result.hasNext) == (10, True)
+    assert len(to_json(result)) < len(to_json(expanded_page))
+
+
+def test_columnar_transaction_results(
+    expanded_page: PagedResultsModel[Transaction[Category]],
+):
+    result = columnar_transaction_results(expanded_page)
+    assert result.categories == [UNCATEGORIZED, INCOME]
+    assert list(result.results) == list(Transaction.model_fields)
+    assert result.results["category"] == [UNCATEGORIZED.id, INCOME.id, UNCATEGORIZED.id]
+    assert result.results["amt"] == [0, 1, 2]
+    assert (result.totalHitCount, result.hasNext) == (10, True)
+
+
 def test_decode_transaction_input_model():
     tran_input = TransactionInput(
         id=None,